@@ -3,7 +3,14 @@ import pandas as pd
 import plotly.express as px
 from datetime import datetime
 import numpy as np
-import pickle
+
+from salestracker import (
+    clustering, cohort, compare, factors, features, markov, metrics, notes, pipeline, quantiles, sampling, scoring,
+    search, shared, rolling, similar, sketches, stalled, timeline, warmup, watcher,
+)
+from salestracker.cache import memoize, memoize_frame
+from salestracker.data import DATA_PATH, filter_key, load_pickle, rows_in_date_range
+from salestracker.executor import Section, run_sections
 
 # Custom soft & elegant CSS
 st.markdown("""
@@ -16,13 +23,19 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Load data
-df = pd.read_csv("sales_visits_finalbgt_enriched.csv")
-df['Tanggal'] = pd.to_datetime(df['Tanggal'])
+# Load data: satu watcher per proses memuat sumber (atau snapshot terakhir bila
+# sumber belum berubah), lalu memantau perubahan di background (muat inkremental +
+# panaskan cache filter default ketujuh halaman, lihat ``warmup``). Dataset kanonik
+# dipetakan dari snapshot Arrow bersama; sesi memakai versi terbaru saat rerun.
+@st.cache_resource
+def data_watcher(path):
+    return watcher.SourceWatcher(path).start()
+
+WATCHER = data_watcher(DATA_PATH)
+df, DATA_VERSION, DATE_INDEX = WATCHER.current()
 
 # Progress mapping
 progress_map = {'Inisiasi': 1, 'Presentasi': 2, 'Penawaran Harga': 3, 'Negosiasi': 4, 'Paska Deal': 5}
-df['Progress_Score'] = df['Progress'].map(progress_map)
 
 # Sidebar filters
 st.sidebar.header("Filter Data")
@@ -30,34 +43,142 @@ date_range = st.sidebar.date_input("Pilih Rentang Tanggal", [df['Tanggal'].min()
 nama_sales = st.sidebar.multiselect("Nama Sales", options=df['Nama_Sales'].unique(), default=df['Nama_Sales'].unique())
 segmen = st.sidebar.multiselect("Segmen", options=df['Segmen'].unique(), default=df['Segmen'].unique())
 status_cust = st.sidebar.multiselect("Status Customer", options=df['Status_Customer'].unique(), default=df['Status_Customer'].unique())
+approx_mode = st.sidebar.toggle(
+    "⚡ Mode Perkiraan (Sketch)", value=False,
+    help="Customer unik (HyperLogLog) dan median/persentil durasi (sketch kuantil) dari sketch "
+         "per sales/segmen/bulan/tahap; rentang tanggal dibulatkan per bulan."
+)
+sample_mode = st.sidebar.toggle(
+    "🎲 Mode Sampel", value=False,
+    help="Semua halaman dihitung dari sampel customer berstrata (per sales & segmen, perjalanan utuh) "
+         "dengan interval kepercayaan 95%; hasil persis dihitung di background lalu menggantikan sampel."
+)
+if sample_mode:
+    sample_fraction = st.sidebar.select_slider(
+        "Ukuran Sampel Customer", options=sampling.FRACTIONS, value=sampling.SAMPLE_FRACTION,
+        format_func=lambda f: f"{f:.0%}"
+    )
+compare_mode = st.sidebar.toggle(
+    "🔁 Mode Perbandingan Periode", value=False,
+    help="KPI, funnel, dan leaderboard rentang tanggal di atas dibandingkan dengan periode pembanding "
+         "(filter lain sama); selisihnya ditampilkan sebagai delta."
+)
+if compare_mode:
+    compare_preset = st.sidebar.selectbox("Bandingkan dengan", compare.PRESETS)
+    compare_range = compare.comparison_range(date_range, compare_preset)
+    if compare_preset == 'Pilih manual':
+        compare_range = st.sidebar.date_input("Rentang Pembanding", [d.date() for d in compare_range])
+    else:
+        st.sidebar.caption(f"Pembanding: {compare_range[0]:%d %b %Y} – {compare_range[1]:%d %b %Y}")
+
+# Filter data sesuai input: rentang tanggal dipotong lewat indeks tanggal,
+# filter lain hanya dievaluasi pada baris di dalam rentang. Hasilnya array posisi
+# baris; frame terfilter dibuat sekali per kunci filter dan dipakai bersama antar sesi.
+FILTER_KEY = filter_key(date_range, nama_sales, segmen, status_cust)
+FILTER_ROWS = shared.filter_rows(
+    df, rows_in_date_range(DATE_INDEX, date_range[0], date_range[1]), nama_sales, segmen, status_cust
+)
+
+# Mode perbandingan: baris periode pembanding (filter sama, rentang lain) digabung dengan
+# periode sekarang dan dihitung dalam satu groupby per tabel dengan kunci ``Periode``
+COMPARISON = None
+if compare_mode and len(compare_range) == 2:
+    compare_key = filter_key(compare_range, nama_sales, segmen, status_cust)
+    compare_rows = shared.filter_rows(
+        df, rows_in_date_range(DATE_INDEX, compare_range[0], compare_range[1]), nama_sales, segmen, status_cust
+    )
+    COMPARISON = compare.period_comparison(df, DATA_VERSION, (FILTER_KEY, compare_key), (FILTER_ROWS, compare_rows))
+
+
+def period_delta(kpi, fmt="{:+,.0f}", scale=1):
+    """Delta tile KPI terhadap periode pembanding (None bila mode perbandingan mati)."""
+    if COMPARISON is None:
+        return None
+    change = COMPARISON['kpi'].at['Sekarang', kpi] - COMPARISON['kpi'].at['Pembanding', kpi]
+    return None if pd.isna(change) else fmt.format(change / scale)   # rata-rata periode kosong = NaN
+
+
+# Mode sampel: halaman memakai sampel customer sampai KPI persis untuk filter ini
+# selesai dihitung di background; setelah itu halaman kembali ke data lengkap.
+SAMPLE_KPI = None
+EXACT_KPI = None   # KPI persis hasil refine (mode sampel) untuk tile Dashboard Utama
+if sample_mode:
+    exact_kpi, exact_ready = sampling.refine(
+        DATA_VERSION, FILTER_KEY, lambda: shared.filtered_frame(df, DATA_VERSION, FILTER_KEY, FILTER_ROWS)
+    )
+    if not exact_ready:
+        customer_sample = memoize('customer_sample', DATA_VERSION, sample_fraction,
+                                  sampling.draw_sample, df, sample_fraction)
+        sample_key = FILTER_KEY + (('sample', sample_fraction),)
+        filtered_df = shared.filtered_frame(
+            df, DATA_VERSION, sample_key, sampling.sample_rows(customer_sample, FILTER_ROWS)
+        )
+        SAMPLE_KPI = memoize('sample_kpi', DATA_VERSION, sample_key,
+                             sampling.kpi_estimates, customer_sample, filtered_df)
+
+        @st.fragment(run_every=2)
+        def wait_for_exact():
+            st.caption(f"🎲 Sampel {sample_fraction:.0%} customer · menghitung hasil persis di background…")
+            if sampling.is_refined(DATA_VERSION, FILTER_KEY):
+                st.rerun()
 
-# Filter data sesuai input
-filtered_df = df[
-    (df['Tanggal'] >= pd.to_datetime(date_range[0])) &
-    (df['Tanggal'] <= pd.to_datetime(date_range[1])) &
-    (df['Nama_Sales'].isin(nama_sales)) &
-    (df['Segmen'].isin(segmen)) &
-    (df['Status_Customer'].isin(status_cust))
-]
+        with st.sidebar:
+            wait_for_exact()
+    else:
+        EXACT_KPI = exact_kpi
+        st.sidebar.caption("✅ Hasil persis sudah siap; halaman memakai data lengkap.")
+if SAMPLE_KPI is None:
+    filtered_df = shared.filtered_frame(df, DATA_VERSION, FILTER_KEY, FILTER_ROWS)
+# Kunci cache untuk hasil yang dihitung dari ``filtered_df``: sampel punya kunci sendiri
+# agar hasilnya tidak tersimpan sebagai hasil persis filter ini
+FRAME_KEY = FILTER_KEY if SAMPLE_KPI is None else sample_key
+
+# Versi data baru dari watcher: sesi yang terbuka dirender ulang otomatis
+@st.fragment(run_every=watcher.POLL_SECONDS * 2)
+def follow_data_version():
+    if WATCHER.version != DATA_VERSION:
+        st.rerun()
+
+with st.sidebar:
+    follow_data_version()
+
+# Pencarian catatan kunjungan / customer (inverted index, dibatasi filter sidebar)
+search_query = st.sidebar.text_input("🔎 Cari Catatan / Customer", placeholder="mis. negosiasi harga")
+if search_query.strip():
+    search_rows, search_scores = search.search_index(df, DATA_VERSION).search(
+        search_query, mask=search.filter_mask(len(df), FILTER_ROWS), limit=100
+    )
+    with st.expander(f"🔎 Hasil pencarian “{search_query}”: {len(search_rows)} kunjungan", expanded=True):
+        if len(search_rows):
+            search_results = df.iloc[search_rows][
+                ['Tanggal', 'Nama_Sales', 'Nama_Customer', 'Progress', 'Status_Kontrak', 'Catatan']
+            ].assign(Skor=search_scores.round(2))
+            st.dataframe(search_results, use_container_width=True, hide_index=True)
+        else:
+            st.info("Tidak ada kunjungan yang cocok dengan kata kunci pada filter ini.")
 
 page = st.sidebar.radio("Pilih Halaman", [
     "🏠 Dashboard Utama", 
     "� Segment Analysis", 
     "🏆 Sales Performance", 
-    "� Progress Analysis",
+    "📈 Progress Analysis",
     "🔍 Factor Analysis",
     "📅 Timeline Analysis",
-    "� Profil Sales"
+    "👤 Profil Sales"
 ])
+# Hitung kunjungan hanya saat halaman berganti (bukan setiap rerun karena widget)
+if st.session_state.get('last_page') != page:
+    st.session_state['last_page'] = page
+    warmup.record_view(page)
 
 if page == "🏠 Dashboard Utama":
     st.title("🏠 Dashboard Aktivitas & Kinerja Tim Sales")
     st.markdown("### 📋 Ringkasan Eksekutif")
+    overview = memoize_frame(metrics.overview, filtered_df, DATA_VERSION, FRAME_KEY)
 
 # Load metrik ringkasan tambahan dari pickle
     try:
-        with open("overview_metrics.pkl", "rb") as f:
-            overview_data = pickle.load(f)
+        overview_data = load_pickle("overview_metrics.pkl")
         kontrak_summary = overview_data.get('nilai_kontrak_breakdown', {
             'pendapatan_riil': 0, 'prospek': 0, 'lost': 0, 'total_project': 0,
             'persen_riil': 0, 'persen_prospek': 0, 'persen_lost': 0
@@ -90,31 +211,81 @@ if page == "🏠 Dashboard Utama":
             'persen_lost': (lost / total_project * 100) if total_project > 0 else 0
         }
 
-    # KPI Ringkasan
+    # Mode perkiraan: customer unik dari gabungan sketch HLL sel yang cocok dengan filter
+    if approx_mode:
+        cust_sketch = sketches.customer_sketches(df, DATA_VERSION)
+        sketch_filter = {'Nama_Sales': nama_sales, 'Segmen': segmen, 'Status_Customer': status_cust}
+        sketch_mask = cust_sketch.select(date_range[0], date_range[1], **sketch_filter)
+        approx_cust = cust_sketch.distinct(sketch_mask)
+        approx_deal = cust_sketch.distinct(
+            cust_sketch.select(date_range[0], date_range[1], Progress='Paska Deal', **sketch_filter)
+        )
+
+    # KPI Ringkasan; nilai persis diambil dari hasil refine mode sampel bila sudah ada
+    if EXACT_KPI is not None:
+        exact_tiles = {name: EXACT_KPI[name].value for name in ('customers', 'visits', 'kontrak')}
+        exact_tiles['deal'] = EXACT_KPI['funnel']['Paska Deal'].value
+    elif SAMPLE_KPI is None:
+        exact_tiles = {
+            'customers': filtered_df['ID_Customer'].nunique(),
+            'visits': filtered_df.shape[0],
+            'kontrak': filtered_df['Nilai_Kontrak'].sum(),
+            'deal': filtered_df[filtered_df['Progress'] == 'Paska Deal']['ID_Customer'].nunique(),
+        }
     col1, col2, col3 = st.columns(3)
     with col1:
-        total_cust = filtered_df['ID_Customer'].nunique()
-        st.metric("Customer Aktif", total_cust)
-        st.caption("Progress rata-rata stagnan di tahap 3")
+        if approx_mode:
+            total_cust = round(approx_cust.value)
+            st.metric("Customer Aktif", f"≈ {total_cust:,}")
+            st.caption(f"± {approx_cust.error:,.0f} (95%) · HyperLogLog")
+        elif SAMPLE_KPI is not None:
+            total_cust = round(SAMPLE_KPI['customers'].value)
+            st.metric("Customer Aktif", f"≈ {total_cust:,}")
+            st.caption(f"± {SAMPLE_KPI['customers'].error:,.0f} (95%) · sampel {sample_fraction:.0%}")
+        else:
+            total_cust = round(exact_tiles['customers'])
+            st.metric("Customer Aktif", total_cust, delta=period_delta('Customer_Aktif'))
+            st.caption("Progress rata-rata stagnan di tahap 3")
     with col2:
-        total_visit = filtered_df.shape[0]
-        st.metric("Total Kunjungan", total_visit)
-        st.caption("Frekuensi kunjungan cukup stabil")
+        if SAMPLE_KPI is not None:
+            st.metric("Total Kunjungan", f"≈ {SAMPLE_KPI['visits'].value:,.0f}")
+            st.caption(f"± {SAMPLE_KPI['visits'].error:,.0f} (95%) · sampel {sample_fraction:.0%}")
+        else:
+            total_visit = round(exact_tiles['visits'])
+            st.metric("Total Kunjungan", total_visit, delta=period_delta('Total_Kunjungan'))
+            st.caption("Frekuensi kunjungan cukup stabil")
     with col3:
-        total_kontrak = filtered_df['Nilai_Kontrak'].sum()
-        st.metric("Total Nilai Kontrak", f"Rp {total_kontrak/1e6:.0f} Juta")
-        st.caption("Nilai potensi proyek")
+        if SAMPLE_KPI is not None:
+            st.metric("Total Nilai Kontrak", f"≈ Rp {SAMPLE_KPI['kontrak'].value/1e6:.0f} Juta")
+            st.caption(f"± Rp {SAMPLE_KPI['kontrak'].error/1e6:,.0f} Juta (95%) · sampel {sample_fraction:.0%}")
+        else:
+            total_kontrak = exact_tiles['kontrak']
+            st.metric("Total Nilai Kontrak", f"Rp {total_kontrak/1e6:.0f} Juta",
+                      delta=period_delta('Total_Nilai_Kontrak', "Rp {:+,.0f} Juta", 1e6))
+            st.caption("Nilai potensi proyek")
 
 # --- Metrik Tambahan (2 kolom tengah) ---
     col_spacer1, col4, col5, col_spacer2 = st.columns([1, 2, 2, 1])  # center alignment
     with col4:
-        deal_count = filtered_df[filtered_df['Progress'] == 'Paska Deal']['ID_Customer'].nunique()
-        deal_percent = (deal_count / total_cust * 100) if total_cust else 0
-        st.metric("Customer Deal", f"{deal_count} ({deal_percent:.0f}%)")
-        st.caption("Konversi ke deal")
+        if approx_mode:
+            deal_count = round(approx_deal.value)
+            deal_percent = (deal_count / total_cust * 100) if total_cust else 0
+            st.metric("Customer Deal", f"≈ {deal_count} ({deal_percent:.0f}%)")
+            st.caption(f"Konversi ke deal · ± {approx_deal.error:,.0f} (95%)")
+        elif SAMPLE_KPI is not None:
+            deal_count = round(SAMPLE_KPI['funnel']['Paska Deal'].value)
+            deal_rate = SAMPLE_KPI['deal_rate']
+            st.metric("Customer Deal", f"≈ {deal_count:,} ({deal_rate.value * 100:.0f}%)")
+            st.caption(f"Konversi ke deal · ± {deal_rate.error * 100:.1f} poin (95%)")
+        else:
+            deal_count = round(exact_tiles['deal'])
+            deal_percent = (deal_count / total_cust * 100) if total_cust else 0
+            st.metric("Customer Deal", f"{deal_count} ({deal_percent:.0f}%)", delta=period_delta('Customer_Deal'))
+            st.caption("Konversi ke deal")
     with col5:
         avg_progress = filtered_df['Progress_Score'].mean()
-        st.metric("Rata-rata Progress", f"{avg_progress:.1f} / 5")
+        st.metric("Rata-rata Progress", f"{avg_progress:.1f} / 5",
+                  delta=period_delta('Rata_Progress', "{:+.1f}") if SAMPLE_KPI is None else None)
         st.caption("Tahapan funnel rata-rata")
     
     # Distribusi Segmen & Status
@@ -186,16 +357,31 @@ if page == "🏠 Dashboard Utama":
     )
     st.plotly_chart(funnel_fig)
 
+    if COMPARISON is not None:
+        st.markdown("**🔁 Funnel: Sekarang vs Pembanding** (customer unik per tahap)")
+        st.dataframe(compare.side_by_side(COMPARISON['funnel']), use_container_width=True, hide_index=True)
+
         # 🎯 Analisis Funnel Lanjutan
     st.subheader("📌 Insight Visual Funnel Sales")
 
     tahapan_funnel = ['Inisiasi', 'Presentasi', 'Penawaran Harga', 'Negosiasi', 'Paska Deal']
 
     # Funnel keseluruhan
-    funnel_overall = {
-        tahap: filtered_df[filtered_df['Progress'] == tahap]['ID_Customer'].nunique()
-        for tahap in tahapan_funnel
-    }
+    if approx_mode:
+        funnel_approx = cust_sketch.distinct_by(sketch_mask, 'Progress').reindex(tahapan_funnel, fill_value=0)
+        funnel_overall = funnel_approx['Nilai'].round().astype(int).to_dict()
+        st.caption(
+            "⚡ Funnel dari sketch HyperLogLog: "
+            + ", ".join(f"{t} ± {funnel_approx.at[t, 'Galat']:.0f}" for t in tahapan_funnel)
+        )
+    elif SAMPLE_KPI is not None:
+        funnel_overall = {tahap: round(SAMPLE_KPI['funnel'][tahap].value) for tahap in tahapan_funnel}
+        st.caption(
+            f"🎲 Funnel dari sampel {sample_fraction:.0%} customer: "
+            + ", ".join(f"{t} ± {SAMPLE_KPI['funnel'][t].error:,.0f}" for t in tahapan_funnel)
+        )
+    else:
+        funnel_overall = overview['funnel']
 
     # Konversi antar tahap
     konversi_tahap = {}
@@ -220,26 +406,23 @@ if page == "🏠 Dashboard Utama":
         'Tahapan': list(konversi_tahap.keys()),
         'Konversi (%)': list(konversi_tahap.values())
     })
+    if SAMPLE_KPI is not None and not approx_mode:
+        # Konversi sebagai estimator rasio dari sampel, dengan interval 95% sebagai error bar
+        konversi_df['Konversi (%)'] = [SAMPLE_KPI['conversion'][t].value * 100 for t in konversi_df['Tahapan']]
+        konversi_df['Galat (%)'] = [SAMPLE_KPI['conversion'][t].error * 100 for t in konversi_df['Tahapan']]
     bar_konversi = px.bar(
         konversi_df, x='Tahapan', y='Konversi (%)',
         title="Tingkat Konversi Antar Tahapan Funnel",
         color='Konversi (%)',
-        color_continuous_scale=px.colors.sequential.Mint
+        color_continuous_scale=px.colors.sequential.Mint,
+        error_y='Galat (%)' if 'Galat (%)' in konversi_df else None
     )
     st.plotly_chart(bar_konversi, use_container_width=True)
 
     # 3️⃣ Stacked Bar - Funnel per Segmen
-    funnel_segmen = {}
-    for seg in filtered_df['Segmen'].dropna().unique():
-        df_seg = filtered_df[filtered_df['Segmen'] == seg]
-        funnel_segmen[seg] = {
-            tahap: df_seg[df_seg['Progress'] == tahap]['ID_Customer'].nunique()
-            for tahap in tahapan_funnel
-        }
-
-    df_segmen_funnel = pd.DataFrame(funnel_segmen).T.fillna(0).astype(int)
-    df_segmen_funnel = df_segmen_funnel.reset_index().melt(id_vars='index', var_name='Tahapan', value_name='Jumlah')
-    df_segmen_funnel = df_segmen_funnel.rename(columns={'index': 'Segmen'})
+    df_segmen_funnel = overview['funnel_segmen'].reset_index().melt(
+        id_vars='Segmen', var_name='Tahapan', value_name='Jumlah'
+    )
 
     fig_stacked = px.bar(
         df_segmen_funnel, x='Segmen', y='Jumlah',
@@ -254,41 +437,82 @@ if page == "🏠 Dashboard Utama":
 
     # Jeda antar kunjungan
     st.subheader("Rata-rata Jeda antar Kunjungan")
-    jeda_df = filtered_df.sort_values(['ID_Customer', 'Tanggal'])
-    jeda_df['Prev'] = jeda_df.groupby('ID_Customer')['Tanggal'].shift()
-    jeda_df['Jeda_Hari'] = (jeda_df['Tanggal'] - jeda_df['Prev']).dt.days
-    jeda_summary = jeda_df.groupby('Nama_Sales')['Jeda_Hari'].mean().reset_index()
+    jeda_summary = overview['jeda_sales']
     bar_jeda = px.bar(jeda_summary, x='Nama_Sales', y='Jeda_Hari', title="Jeda Rata-rata (Hari) per Sales",
                       color='Nama_Sales', color_discrete_sequence=px.colors.sequential.BuGn)
     st.plotly_chart(bar_jeda)
 
+    # Watchlist deal mandek: customer terbuka yang belum dikunjungi lebih lama dari batas tahapnya
+    st.subheader("🚨 Watchlist Deal Mandek")
+    last_visits = stalled.last_visit_index(df, DATA_VERSION)
+    with st.expander("Batas hari tanpa kunjungan per tahap"):
+        batas_cols = st.columns(len(stalled.STAGE_THRESHOLDS))
+        stall_thresholds = {
+            tahap: col.number_input(tahap, min_value=1, value=hari, step=1, key=f"stall_{tahap}")
+            for col, (tahap, hari) in zip(batas_cols, stalled.STAGE_THRESHOLDS.items())
+        }
+    watchlist = last_visits.watchlist(
+        stall_thresholds, Nama_Sales=nama_sales, Segmen=segmen, Status_Customer=status_cust
+    )
+    if watchlist.empty:
+        st.success(f"✅ Tidak ada deal terbuka yang melewati batas per {last_visits.as_of:%d %b %Y}.")
+    else:
+        st.warning(
+            f"⚠️ {len(watchlist)} deal terbuka (Rp {watchlist['Nilai_Kontrak'].sum()/1e6:,.0f} Juta) "
+            f"belum dikunjungi melewati batas tahapnya per {last_visits.as_of:%d %b %Y}."
+        )
+        st.dataframe(
+            watchlist[['Nama_Customer', 'Nama_Sales', 'Segmen', 'Progress', 'Kunjungan_Terakhir',
+                       'Hari_Tanpa_Kunjungan', 'Batas_Hari', 'Nilai_Kontrak', 'Jumlah_Kunjungan']],
+            use_container_width=True, hide_index=True
+        )
+
     # Analisis Durasi & Kunjungan
     st.subheader("⏳ Analisis Durasi & Frekuensi Kunjungan")
     # Durasi per customer
-    customer_duration = filtered_df.groupby('ID_Customer').agg(
-        Durasi_Total=('Tanggal', lambda x: (x.max() - x.min()).days),
-        Progress_Akhir=('Progress', 'last')
-    ).reset_index()
-    deal_duration = customer_duration[customer_duration['Progress_Akhir'] == 'Paska Deal']['Durasi_Total']
-    avg_gap = filtered_df.sort_values(['ID_Customer', 'Tanggal']).groupby('ID_Customer')['Tanggal'].diff().dt.days.dropna().mean()
-    median_gap = filtered_df.sort_values(['ID_Customer', 'Tanggal']).groupby('ID_Customer')['Tanggal'].diff().dt.days.dropna().median()
+    if approx_mode:
+        # Mode perkiraan: median dari gabungan sketch kuantil, tanpa mengurutkan ulang kunjungan
+        dur_sketch = quantiles.duration_sketches(df, DATA_VERSION)
+        siklus, jeda = dur_sketch['siklus'], dur_sketch['jeda']
+        deal_mask = siklus.select(date_range[0], date_range[1], Progress='Paska Deal', **sketch_filter)
+        gap_mask = jeda.select(date_range[0], date_range[1], **sketch_filter)
+        median_deal, median_gap = siklus.quantile(deal_mask), jeda.quantile(gap_mask)
+        mean_deal, avg_gap = siklus.mean(deal_mask), jeda.mean(gap_mask)
+        deal_hist, gap_hist = siklus.histogram(deal_mask), jeda.histogram(gap_mask)
+    else:
+        deal_duration, gaps = overview['durasi_deal'], overview['jeda']
+        mean_deal, avg_gap = deal_duration.mean(), gaps.mean()
+        median_deal, median_gap = deal_duration.median(), gaps.median()
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("Rata-rata Durasi Closing (Paska Deal)", f"{deal_duration.mean():.1f} hari")
-        st.caption(f"Median: {deal_duration.median():.1f} hari")
+        st.metric("Rata-rata Durasi Closing (Paska Deal)", f"{mean_deal:.1f} hari")
+        if approx_mode:
+            st.caption(f"Median: ≈ {median_deal.value:.1f} hari (± {median_deal.error:.1f})")
+        else:
+            st.caption(f"Median: {median_deal:.1f} hari")
     with col2:
         st.metric("Rata-rata Jeda antar Kunjungan", f"{avg_gap:.1f} hari")
-        st.caption(f"Median: {median_gap:.1f} hari")
+        if approx_mode:
+            st.caption(f"Median: ≈ {median_gap.value:.1f} hari (± {median_gap.error:.1f})")
+        else:
+            st.caption(f"Median: {median_gap:.1f} hari")
     # Visualisasi distribusi durasi
     import plotly.graph_objects as go
     fig_durasi = go.Figure()
-    fig_durasi.add_trace(go.Histogram(x=deal_duration, marker_color='#b2dfdb', name='Durasi Closing'))
+    if approx_mode:
+        fig_durasi.add_trace(go.Histogram(x=deal_hist['Hari'], y=deal_hist['Jumlah'], histfunc='sum',
+                                          marker_color='#b2dfdb', name='Durasi Closing'))
+    else:
+        fig_durasi.add_trace(go.Histogram(x=deal_duration, marker_color='#b2dfdb', name='Durasi Closing'))
     fig_durasi.update_layout(title="Distribusi Durasi Mencapai Paska Deal", xaxis_title="Durasi (hari)", yaxis_title="Frekuensi", template="plotly_white")
     st.plotly_chart(fig_durasi)
     # Visualisasi distribusi jeda kunjungan
-    gaps = filtered_df.sort_values(['ID_Customer', 'Tanggal']).groupby('ID_Customer')['Tanggal'].diff().dt.days.dropna()
     fig_gap = go.Figure()
-    fig_gap.add_trace(go.Histogram(x=gaps, marker_color='#80cbc4', name='Jeda Kunjungan'))
+    if approx_mode:
+        fig_gap.add_trace(go.Histogram(x=gap_hist['Hari'], y=gap_hist['Jumlah'], histfunc='sum',
+                                       marker_color='#80cbc4', name='Jeda Kunjungan'))
+    else:
+        fig_gap.add_trace(go.Histogram(x=gaps, marker_color='#80cbc4', name='Jeda Kunjungan'))
     fig_gap.update_layout(title="Distribusi Jeda antar Kunjungan", xaxis_title="Jeda (hari)", yaxis_title="Frekuensi", template="plotly_white")
     st.plotly_chart(fig_gap)
 
@@ -300,47 +524,7 @@ elif page == "� Segment Analysis":
     st.subheader("🔍 1. Segment Performance Overview")
     
     # Hitung metrik per segmen
-    segment_metrics = {}
-    for segmen in filtered_df['Segmen'].dropna().unique():
-        df_seg = filtered_df[filtered_df['Segmen'] == segmen]
-        latest_seg = df_seg.sort_values('Tanggal').groupby('ID_Customer').last()
-        
-        # Metrik dasar
-        total_customer = df_seg['ID_Customer'].nunique()
-        total_visits = len(df_seg)
-        total_deals = len(latest_seg[latest_seg['Progress'] == 'Paska Deal'])
-        
-        # Nilai kontrak - Fixed: Use 'Deal' instead of 'deal'
-        nilai_riil = latest_seg[latest_seg['Status_Kontrak'] == 'Deal']['Nilai_Kontrak'].sum()
-        nilai_prospek = latest_seg[latest_seg['Status_Kontrak'] == 'Berpotensi Deal']['Nilai_Kontrak'].sum()
-        target_total = latest_seg['Target_Sales'].sum()
-        
-        # Performance metrics
-        conversion_rate = (total_deals / total_customer * 100) if total_customer > 0 else 0
-        avg_deal_size = nilai_riil / total_deals if total_deals > 0 else 0
-        target_achievement = (nilai_riil / target_total * 100) if target_total > 0 else 0
-        
-        # Efficiency metrics (replacing ROI)
-        avg_visits_per_customer = total_visits / total_customer if total_customer > 0 else 0
-        revenue_per_visit = nilai_riil / total_visits if total_visits > 0 else 0
-        customer_lifetime_value = nilai_riil / total_customer if total_customer > 0 else 0
-        
-        segment_metrics[segmen] = {
-            'Total_Customer': total_customer,
-            'Total_Visits': total_visits,
-            'Total_Deals': total_deals,
-            'Nilai_Riil': nilai_riil,
-            'Nilai_Prospek': nilai_prospek,
-            'Target_Total': target_total,
-            'Conversion_Rate': conversion_rate,
-            'Avg_Deal_Size': avg_deal_size,
-            'Target_Achievement': target_achievement,
-            'Avg_Visits_per_Customer': avg_visits_per_customer,
-            'Revenue_per_Visit': revenue_per_visit,
-            'Customer_LTV': customer_lifetime_value
-        }
-    
-    segment_df = pd.DataFrame(segment_metrics).T
+    segment_df = memoize_frame(metrics.segment_report, filtered_df, DATA_VERSION, FRAME_KEY)
     
     # Display segment metrics table
     st.dataframe(segment_df.round(2), use_container_width=True)
@@ -350,7 +534,7 @@ elif page == "� Segment Analysis":
     
     with col1:
         fig_conversion = px.bar(
-            segment_df.reset_index(), x='index', y='Conversion_Rate',
+            segment_df.reset_index(), x='Segmen', y='Conversion_Rate',
             title='Conversion Rate per Segmen (%)',
             color='Conversion_Rate', color_continuous_scale='Viridis'
         )
@@ -359,7 +543,7 @@ elif page == "� Segment Analysis":
     
     with col2:
         fig_deal_size = px.bar(
-            segment_df.reset_index(), x='index', y='Avg_Deal_Size',
+            segment_df.reset_index(), x='Segmen', y='Avg_Deal_Size',
             title='Average Deal Size per Segmen (Rp)',
             color='Avg_Deal_Size', color_continuous_scale='Plasma'
         )
@@ -375,7 +559,7 @@ elif page == "� Segment Analysis":
         fig_efficiency = px.scatter(
             segment_df.reset_index(), x='Avg_Visits_per_Customer', y='Revenue_per_Visit',
             size='Total_Customer', color='Conversion_Rate',
-            hover_name='index', title='Segment Efficiency Matrix',
+            hover_name='Segmen', title='Segment Efficiency Matrix',
             labels={'Avg_Visits_per_Customer': 'Avg Visits per Customer', 
                    'Revenue_per_Visit': 'Revenue per Visit (Rp)'}
         )
@@ -383,7 +567,7 @@ elif page == "� Segment Analysis":
     
     with col2:
         fig_target = px.bar(
-            segment_df.reset_index(), x='index', y='Target_Achievement',
+            segment_df.reset_index(), x='Segmen', y='Target_Achievement',
             title='Target Achievement per Segmen (%)',
             color='Target_Achievement', color_continuous_scale='RdYlGn'
         )
@@ -397,20 +581,12 @@ elif page == "� Segment Analysis":
     tahapan_funnel = ['Inisiasi', 'Presentasi', 'Penawaran Harga', 'Negosiasi', 'Paska Deal']
     
     # Hitung funnel per segmen
-    funnel_segmen = {}
-    for segmen in filtered_df['Segmen'].dropna().unique():
-        df_seg = filtered_df[filtered_df['Segmen'] == segmen]
-        funnel_segmen[segmen] = {
-            tahap: df_seg[df_seg['Progress'] == tahap]['ID_Customer'].nunique()
-            for tahap in tahapan_funnel
-        }
-    
-    funnel_seg_df = pd.DataFrame(funnel_segmen).T.fillna(0)
+    funnel_seg_df = memoize_frame(metrics.funnel_counts, filtered_df, DATA_VERSION, FRAME_KEY, 'Segmen')
     
     # Stacked funnel chart
     funnel_melt = funnel_seg_df.reset_index().melt(
-        id_vars='index', var_name='Tahapan', value_name='Customer_Count'
-    ).rename(columns={'index': 'Segmen'})
+        id_vars='Segmen', var_name='Tahapan', value_name='Customer_Count'
+    )
     
     fig_funnel_seg = px.bar(
         funnel_melt, x='Segmen', y='Customer_Count',
@@ -460,8 +636,7 @@ elif page == "🏆 Sales Performance":
 
     # Load data performa dari pickle utama
     try:
-        with open("performa_sales.pkl", "rb") as f:
-            performa_data = pickle.load(f)
+        performa_data = load_pickle("performa_sales.pkl")
         sales_perf = performa_data.get('sales_performance', pd.DataFrame())
         low_perf = performa_data.get('low_performers', pd.DataFrame())
         top_sales = performa_data.get('top_performer', 'N/A')
@@ -478,20 +653,10 @@ elif page == "🏆 Sales Performance":
     
     # Hitung funnel per sales
     tahapan_funnel = ['Inisiasi', 'Presentasi', 'Penawaran Harga', 'Negosiasi', 'Paska Deal']
-    funnel_sales = {}
-    
-    for sales in filtered_df['Nama_Sales'].unique():
-        df_sales = filtered_df[filtered_df['Nama_Sales'] == sales]
-        funnel_sales[sales] = {
-            tahap: df_sales[df_sales['Progress'] == tahap]['ID_Customer'].nunique()
-            for tahap in tahapan_funnel
-        }
-    
-    # Convert to DataFrame untuk visualisasi
-    df_funnel_sales = pd.DataFrame(funnel_sales).T.fillna(0).astype(int)
+    df_funnel_sales = memoize_frame(metrics.funnel_counts, filtered_df, DATA_VERSION, FRAME_KEY, 'Nama_Sales')
     df_funnel_melt = df_funnel_sales.reset_index().melt(
-        id_vars='index', var_name='Tahapan', value_name='Jumlah_Customer'
-    ).rename(columns={'index': 'Nama_Sales'})
+        id_vars='Nama_Sales', var_name='Tahapan', value_name='Jumlah_Customer'
+    )
     
     # Stacked bar chart untuk funnel komparatif
     fig_funnel_comp = px.bar(
@@ -528,77 +693,25 @@ elif page == "🏆 Sales Performance":
     st.subheader("🏆 Leaderboard Performa Sales Komprehensif")
     
     # Menghitung metrik lengkap per sales dari filtered data
-    sales_metrics = {}
-    
-    for sales in filtered_df['Nama_Sales'].unique():
-        df_sales = filtered_df[filtered_df['Nama_Sales'] == sales]
-        
-        # Ambil data kontrak terbaru per customer
-        latest_per_customer = df_sales.sort_values('Tanggal').groupby('ID_Customer').last()
-        
-        # Hitung metrik
-        total_kunjungan = len(df_sales)
-        total_customer = df_sales['ID_Customer'].nunique()
-        
-        # Deal berdasarkan Progress = Paska Deal
-        deals = latest_per_customer[latest_per_customer['Progress'] == 'Paska Deal']
-        jumlah_deal = len(deals)
-        
-        # Nilai kontrak berdasarkan logika bisnis yang benar (per customer terbaru)
-        nilai_aktual = latest_per_customer[
-            latest_per_customer['Status_Kontrak'] == 'Deal'
-        ]['Nilai_Kontrak'].sum()
-        
-        nilai_prospek = latest_per_customer[
-            latest_per_customer['Status_Kontrak'] == 'Berpotensi Deal'
-        ]['Nilai_Kontrak'].sum()
-        
-        # Target vs realisasi (per customer terbaru)
-        target_total = latest_per_customer['Target_Sales'].sum()  # Target per customer terbaru
-        realisasi_persen = (nilai_aktual / target_total * 100) if target_total > 0 else 0
-        
-        # Closing rate
-        closing_rate = (jumlah_deal / total_customer * 100) if total_customer > 0 else 0
-        
-        # Average Handling Time (AHT) - rata-rata durasi per customer
-        aht_list = []
-        for customer_id in df_sales['ID_Customer'].unique():
-            cust_data = df_sales[df_sales['ID_Customer'] == customer_id].sort_values('Tanggal')
-            if len(cust_data) > 1:
-                durasi = (cust_data['Tanggal'].max() - cust_data['Tanggal'].min()).days
-                aht_list.append(durasi)
-        
-        avg_handling_time = np.mean(aht_list) if aht_list else 0
-        
-        # Frekuensi kunjungan per customer
-        avg_freq = total_kunjungan / total_customer if total_customer > 0 else 0
-        
-        sales_metrics[sales] = {
-            'Total_Kunjungan': total_kunjungan,
-            'Total_Customer': total_customer,
-            'Jumlah_Deal': jumlah_deal,
-            'Nilai_Aktual': nilai_aktual,
-            'Nilai_Prospek': nilai_prospek,
-            'Target_Total': target_total,
-            'Realisasi_Persen': realisasi_persen,
-            'Closing_Rate': closing_rate,
-            'Avg_Handling_Time': avg_handling_time,
-            'Avg_Freq_Kunjungan': avg_freq
-        }
-    
-    # Convert ke DataFrame
-    performance_df = pd.DataFrame(sales_metrics).T
-    performance_df = performance_df.sort_values('Jumlah_Deal', ascending=False)
+    # Salinan: kolom rasio ditambahkan di bawah, hasil cache bersama tidak boleh diubah
+    performance_df = memoize_frame(metrics.sales_leaderboard, filtered_df, DATA_VERSION, FRAME_KEY).copy()
     
     # Display leaderboard
     st.dataframe(performance_df.round(2), use_container_width=True)
+
+    if COMPARISON is not None:
+        st.markdown("**🔁 Leaderboard: Sekarang vs Pembanding**")
+        st.dataframe(compare.side_by_side(COMPARISON['leaderboard'], compare.KOLOM_LEADERBOARD).round(2),
+                     use_container_width=True)
+        st.markdown("**🔁 Funnel per Sales: Sekarang vs Pembanding**")
+        st.dataframe(compare.side_by_side(COMPARISON['funnel_sales']), use_container_width=True)
     
     # Performance visualizations
     col1, col2 = st.columns(2)
     
     with col1:
         fig_deals = px.bar(
-            performance_df.reset_index(), x='index', y='Jumlah_Deal',
+            performance_df.reset_index(), x='Nama_Sales', y='Jumlah_Deal',
             title='Number of Deals per Sales Person',
             color='Jumlah_Deal', color_continuous_scale='Viridis'
         )
@@ -607,13 +720,44 @@ elif page == "🏆 Sales Performance":
     
     with col2:
         fig_revenue = px.bar(
-            performance_df.reset_index(), x='index', y='Nilai_Aktual',
+            performance_df.reset_index(), x='Nama_Sales', y='Nilai_Aktual',
             title='Actual Revenue per Sales Person (Rp)',
             color='Nilai_Aktual', color_continuous_scale='Plasma'
         )
         fig_revenue.update_xaxes(title='Sales Person', tickangle=45)
         st.plotly_chart(fig_revenue, use_container_width=True)
 
+    # Segmentasi perilaku sales (KMeans, di-cache per versi data + filter)
+    st.subheader("🧩 Sales Archetypes (Clustering)")
+    cluster_feats = features.features_for_filter(df, filtered_df, DATA_VERSION, FRAME_KEY)
+    rep_cluster, cluster_ready = clustering.rep_clusters(cluster_feats, DATA_VERSION, FRAME_KEY)
+    if not cluster_ready:
+        # Cek ulang tanpa menunggu tiap 2 detik; halaman dirender ulang begitu klaster siap
+        @st.fragment(run_every=2)
+        def wait_for_clusters():
+            st.info("⏳ Clustering sales sedang dihitung di background. Hasil akan tampil otomatis setelah selesai.")
+            if clustering.rep_clusters(cluster_feats, DATA_VERSION, FRAME_KEY, wait=0)[1]:
+                st.rerun()
+
+        wait_for_clusters()
+    elif rep_cluster is None:
+        st.info("Jumlah sales pada filter ini terlalu sedikit untuk clustering (minimal 3).")
+    elif isinstance(rep_cluster, clustering.ClusterFailure):
+        st.caption(f"⚠️ Clustering sales gagal untuk filter ini ({rep_cluster.error}).")
+    else:
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            fig_cluster = px.scatter(
+                rep_cluster.metrics.reset_index(), x='Success_Rate', y='Revenue_per_Customer',
+                color='Archetype', size='Total_Customer', hover_name='Nama_Sales',
+                hover_data=['Avg_Kunjungan', 'Avg_Jeda', 'Avg_Tahap'],
+                title='Sales Archetypes: Success Rate vs Revenue per Customer'
+            )
+            st.plotly_chart(fig_cluster, use_container_width=True)
+        with col2:
+            st.dataframe(rep_cluster.centroids.round(1), use_container_width=True)
+            st.caption(f"KMeans dengan {len(rep_cluster.centroids)} klaster (silhouette: {rep_cluster.silhouette:.2f})")
+
     # ==========================
     # 3. AVERAGE HANDLING TIME ANALYSIS
     # ==========================
@@ -624,7 +768,7 @@ elif page == "🏆 Sales Performance":
     with col1:
         # AHT per Sales
         aht_fig = px.bar(
-            performance_df.reset_index(), x='index', y='Avg_Handling_Time',
+            performance_df.reset_index(), x='Nama_Sales', y='Avg_Handling_Time',
             title='Average Handling Time per Sales (Hari)',
             color='Avg_Handling_Time', color_continuous_scale='Oranges'
         )
@@ -635,7 +779,7 @@ elif page == "🏆 Sales Performance":
         # Scatter: AHT vs Closing Rate
         scatter_aht = px.scatter(
             performance_df.reset_index(), x='Avg_Handling_Time', y='Closing_Rate',
-            size='Jumlah_Deal', hover_name='index',
+            size='Jumlah_Deal', hover_name='Nama_Sales',
             title='Korelasi AHT vs Closing Rate',
             color='Closing_Rate', color_continuous_scale='Viridis'
         )
@@ -658,7 +802,7 @@ elif page == "🏆 Sales Performance":
     target_vs_real = target_vs_real.reset_index()
     
     fig_target = px.bar(
-        target_vs_real, x='index', y=['Target_Total', 'Nilai_Aktual'],
+        target_vs_real, x='Nama_Sales', y=['Target_Total', 'Nilai_Aktual'],
         title='Target vs Realisasi per Sales (Nilai Kontrak)',
         barmode='group', color_discrete_sequence=['#ff7f0e', '#2ca02c']
     )
@@ -667,7 +811,7 @@ elif page == "🏆 Sales Performance":
     
     # Achievement percentage
     achievement_fig = px.bar(
-        target_vs_real, x='index', y='Realisasi_Persen',
+        target_vs_real, x='Nama_Sales', y='Realisasi_Persen',
         title='Persentase Pencapaian Target per Sales (%)',
         color='Realisasi_Persen', color_continuous_scale='RdYlGn'
     )
@@ -680,29 +824,8 @@ elif page == "🏆 Sales Performance":
     # ==========================
     st.subheader("📈 Analisis Target vs Realisasi per Segmen")
     
-    # Target vs Realisasi per Segmen
-    segmen_metrics = {}
-    for segmen in filtered_df['Segmen'].dropna().unique():
-        df_segmen = filtered_df[filtered_df['Segmen'] == segmen]
-        latest_segmen = df_segmen.sort_values('Tanggal').groupby('ID_Customer').last()
-        
-        target_segmen = latest_segmen['Target_Sales'].sum()  # Target per customer terbaru
-        realisasi_segmen = latest_segmen[
-            latest_segmen['Status_Kontrak'] == 'Deal'
-        ]['Nilai_Kontrak'].sum()
-        
-        achievement_segmen = (realisasi_segmen / target_segmen * 100) if target_segmen > 0 else 0
-        
-        segmen_metrics[segmen] = {
-            'Target': target_segmen,
-            'Realisasi': realisasi_segmen,
-            'Achievement_Persen': achievement_segmen,
-            'Customer_Count': df_segmen['ID_Customer'].nunique(),
-            'Deal_Count': len(latest_segmen[latest_segmen['Progress'] == 'Paska Deal'])
-        }
-    
-    segmen_df = pd.DataFrame(segmen_metrics).T.reset_index()
-    segmen_df.columns = ['Segmen', 'Target', 'Realisasi', 'Achievement_Persen', 'Customer_Count', 'Deal_Count']
+    # Target vs Realisasi per Segmen (status terbaru per customer)
+    segmen_df = memoize_frame(metrics.segment_targets, filtered_df, DATA_VERSION, FRAME_KEY)
     
     col1, col2 = st.columns(2)
     
@@ -737,7 +860,7 @@ elif page == "🏆 Sales Performance":
     with col1:
         productivity_fig = px.scatter(
             performance_df.reset_index(), x='Total_Kunjungan', y='Jumlah_Deal',
-            size='Nilai_Aktual', hover_name='index',
+            size='Nilai_Aktual', hover_name='Nama_Sales',
             title='Produktivitas: Kunjungan vs Deal',
             color='Closing_Rate', color_continuous_scale='Turbo'
         )
@@ -746,7 +869,7 @@ elif page == "🏆 Sales Performance":
     with col2:
         efficiency_df = performance_df[['Deal_per_Visit', 'Customer_per_Visit']].reset_index()
         efficiency_fig = px.bar(
-            efficiency_df, x='index', y=['Deal_per_Visit', 'Customer_per_Visit'],
+            efficiency_df, x='Nama_Sales', y=['Deal_per_Visit', 'Customer_per_Visit'],
             title='Efisiensi: Deal & Customer per Kunjungan', barmode='group',
             color_discrete_sequence=['#1f77b4', '#ff7f0e']
         )
@@ -758,30 +881,11 @@ elif page == "🏆 Sales Performance":
     # ==========================
     st.subheader("🔮 Pipeline Analysis & Sales Forecasting")
     
-    # Pipeline per Sales
-    pipeline_data = []
-    for sales in filtered_df['Nama_Sales'].unique():
-        df_sales = filtered_df[filtered_df['Nama_Sales'] == sales]
-        latest_sales = df_sales.sort_values('Tanggal').groupby('ID_Customer').last()
-        
-        for tahap in tahapan_funnel:
-            customer_in_stage = latest_sales[latest_sales['Progress'] == tahap]
-            # Hanya ambil nilai kontrak untuk customer yang berpotensi deal (belum close/cancel)
-            nilai_stage = customer_in_stage[
-                customer_in_stage['Status_Kontrak'] == 'Berpotensi Deal'
-            ]['Nilai_Kontrak'].sum()
-            
-            pipeline_data.append({
-                'Sales': sales,
-                'Tahap': tahap,
-                'Nilai_Pipeline': nilai_stage,
-                'Customer_Count': len(customer_in_stage)
-            })
-    
-    pipeline_df = pd.DataFrame(pipeline_data)
+    # Pipeline per Sales (customer terbaru per sales, dihitung dalam satu groupby)
+    pipeline_df = memoize_frame(pipeline.pipeline_by_stage, filtered_df, DATA_VERSION, FRAME_KEY)
     
     # Pipeline value per stage
-    pipeline_summary = pipeline_df.groupby('Tahap')['Nilai_Pipeline'].sum().reset_index()
+    pipeline_summary = pipeline_df.groupby('Tahap', sort=False)['Nilai_Pipeline'].sum().reset_index()
     pipeline_fig = px.funnel(
         pipeline_summary, x='Nilai_Pipeline', y='Tahap',
         title='Pipeline Value per Tahapan (Rp)',
@@ -789,18 +893,54 @@ elif page == "🏆 Sales Performance":
     )
     st.plotly_chart(pipeline_fig, use_container_width=True)
     
-    # Forecasting berdasarkan conversion rate historis
+    # Forecasting Monte Carlo berdasarkan conversion rate historis per tahap
     total_pipeline = pipeline_df[pipeline_df['Tahap'] != 'Paska Deal']['Nilai_Pipeline'].sum()
-    avg_conversion = performance_df['Closing_Rate'].mean() / 100
-    forecasted_revenue = total_pipeline * avg_conversion
+    funnel_overall_chain, _ = markov.funnel_chain(filtered_df, DATA_VERSION, FRAME_KEY)
+    stage_probs = funnel_overall_chain.deal_probabilities()
+    forecast_df = pipeline.monte_carlo_forecast(pipeline.open_deals(filtered_df), stage_probs)
+    forecast_total = forecast_df[forecast_df['Dimensi'] == 'Total']
+    forecast_p10, forecast_p50, forecast_p90 = (
+        forecast_total[['P10', 'P50', 'P90']].iloc[0] if len(forecast_total) else (0, 0, 0)
+    )
     
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("Total Pipeline Value", f"Rp {total_pipeline/1e6:.1f}M")
     with col2:
-        st.metric("Avg Conversion Rate", f"{avg_conversion*100:.1f}%")
+        st.metric("Forecasted Revenue (P50)", f"Rp {forecast_p50/1e6:.1f}M")
+        st.caption(f"P10–P90: Rp {forecast_p10/1e6:.1f}M – Rp {forecast_p90/1e6:.1f}M")
     with col3:
-        st.metric("Forecasted Revenue", f"Rp {forecasted_revenue/1e6:.1f}M")
+        expected_revenue = forecast_total['Expected'].sum()
+        st.metric("Expected Revenue", f"Rp {expected_revenue/1e6:.1f}M")
+        st.caption("Σ nilai deal × peluang deal tahapnya")
+    
+    forecast_sales = forecast_df[forecast_df['Dimensi'] == 'Nama_Sales']
+    fig_forecast = px.bar(
+        forecast_sales, x='Grup', y='P50',
+        error_y=forecast_sales['P90'] - forecast_sales['P50'],
+        error_y_minus=forecast_sales['P50'] - forecast_sales['P10'],
+        title='Forecast Revenue per Sales (P50, rentang P10–P90)',
+        color='P50', color_continuous_scale='Viridis'
+    )
+    fig_forecast.update_xaxes(title='Sales')
+    st.plotly_chart(fig_forecast, use_container_width=True)
+    st.dataframe(forecast_df.round(0), use_container_width=True)
+    
+    # Probabilitas closing per customer dari model prediksi (di-cache per versi data)
+    st.markdown("#### 🎯 Probabilitas Closing per Customer (Model)")
+    deal_model, model_is_current = scoring.ensure_model(df, DATA_VERSION)
+    if deal_model is None:
+        st.info("Model prediksi sedang dilatih di background untuk data ini. Muat ulang halaman sebentar lagi.")
+    else:
+        if not model_is_current:
+            st.caption("Menampilkan model versi sebelumnya; model untuk data terbaru sedang dilatih di background.")
+        deal_scores = scoring.cached_scores(df, DATA_VERSION, deal_model)
+        deal_scores = deal_scores[deal_scores['ID_Customer'].isin(filtered_df['ID_Customer'])]
+        st.caption(f"Model: {deal_model['model_name']} (AUC: {deal_model['auc']:.3f})")
+        st.dataframe(
+            deal_scores.assign(Prob_Deal=(deal_scores['Prob_Deal'] * 100).round(1)),
+            use_container_width=True
+        )
 
     # ==========================
     # 8. EFISIENSI WAKTU & PROSES
@@ -808,35 +948,14 @@ elif page == "🏆 Sales Performance":
     st.subheader("⏱️ Analisis Efisiensi Waktu & Proses")
     
     # Waktu rata-rata per tahap untuk setiap sales
-    stage_time_data = []
-    for sales in filtered_df['Nama_Sales'].unique():
-        df_sales = filtered_df[filtered_df['Nama_Sales'] == sales]
-        
-        for customer_id in df_sales['ID_Customer'].unique():
-            customer_data = df_sales[df_sales['ID_Customer'] == customer_id].sort_values('Tanggal')
-            customer_stages = customer_data['Progress'].unique()
-            
-            for i, stage in enumerate(customer_stages[:-1]):
-                if i < len(customer_stages) - 1:
-                    current_stage_date = customer_data[customer_data['Progress'] == stage]['Tanggal'].min()
-                    next_stage_date = customer_data[customer_data['Progress'] == customer_stages[i+1]]['Tanggal'].min()
-                    
-                    if pd.notnull(current_stage_date) and pd.notnull(next_stage_date):
-                        time_diff = (next_stage_date - current_stage_date).days
-                        if time_diff >= 0:
-                            stage_time_data.append({
-                                'Sales': sales,
-                                'From_Stage': stage,
-                                'To_Stage': customer_stages[i+1],
-                                'Days': time_diff
-                            })
-    
+    stage_time_df = memoize_frame(metrics.stage_transitions, filtered_df, DATA_VERSION, FRAME_KEY, ('Nama_Sales',))
+    stage_time_data = len(stage_time_df) > 0
     if stage_time_data:
-        stage_time_df = pd.DataFrame(stage_time_data)
-        avg_stage_time = stage_time_df.groupby(['Sales', 'From_Stage'])['Days'].mean().reset_index()
+        avg_stage_time = stage_time_df.groupby(['Nama_Sales', 'From_Stage'])['Days'].mean().reset_index()
         
         # Heatmap waktu per tahap per sales
-        heatmap_data = avg_stage_time.pivot(index='Sales', columns='From_Stage', values='Days').fillna(0)
+        heatmap_data = avg_stage_time.pivot(index='Nama_Sales', columns='From_Stage', values='Days').fillna(0)
+        heatmap_data.index.name = 'Sales'
         
         fig_heatmap = px.imshow(
             heatmap_data, 
@@ -908,21 +1027,8 @@ elif page == "🏆 Sales Performance":
     # ==========================
     st.subheader("⏱️ Sales Process Duration Analysis")
     
-    # Existing duration analysis code but enhanced
-    paska_deal_customers = filtered_df[filtered_df["Progress"] == "Paska Deal"]["ID_Customer"].unique()
-    df_paska = filtered_df[filtered_df["ID_Customer"].isin(paska_deal_customers)].copy().sort_values(["ID_Customer", "Tanggal"])
-
-    def get_duration(group):
-        inisiasi_date = group[group["Progress"] == "Inisiasi"]["Tanggal"].min()
-        deal_date = group[group["Progress"] == "Paska Deal"]["Tanggal"].max()
-        if pd.notnull(inisiasi_date) and pd.notnull(deal_date):
-            return pd.Series({
-                "Nama_Sales": group["Nama_Sales"].iloc[0],
-                "Durasi_Proses_Sales (hari)": (deal_date - inisiasi_date).days
-            })
-
-    durasi_per_customer = df_paska.groupby("ID_Customer").apply(get_duration).dropna()
-    durasi_per_sales = durasi_per_customer.groupby("Nama_Sales")["Durasi_Proses_Sales (hari)"].mean()
+    # Inisiasi pertama -> Paska Deal terakhir per customer deal, dirata-rata per sales
+    durasi_per_sales = memoize_frame(metrics.process_duration, filtered_df, DATA_VERSION, FRAME_KEY)
     leaderboard_durasi = durasi_per_sales.reset_index().rename(columns={
         "Nama_Sales": "Sales",
         "Durasi_Proses_Sales (hari)": "Rata-rata Durasi (hari)"
@@ -971,15 +1077,12 @@ elif page == "📈 Progress Analysis":
         st.plotly_chart(fig_current, use_container_width=True)
     
     with col2:
-        # Conversion rates between stages
-        conversion_rates = {}
-        for i in range(len(tahapan_funnel)-1):
-            current_stage = current_progress[tahapan_funnel[i]]
-            next_stage = current_progress[tahapan_funnel[i+1]]
-            conversion = (next_stage / current_stage * 100) if current_stage > 0 else 0
-            conversion_rates[f"{tahapan_funnel[i]} → {tahapan_funnel[i+1]}"] = conversion
-        
-        conv_df = pd.DataFrame(list(conversion_rates.items()), columns=['Transition', 'Rate'])
+        # Conversion rates between stages (rantai Markov, dibagi dengan forecast)
+        chain_overall, _ = markov.funnel_chain(filtered_df, DATA_VERSION, FRAME_KEY)
+        conv_df = pd.DataFrame({
+            'Transition': [f"{tahapan_funnel[i]} → {tahapan_funnel[i+1]}" for i in range(len(tahapan_funnel)-1)],
+            'Rate': chain_overall.advance_rates() * 100
+        })
         fig_conv = px.bar(
             conv_df, x='Transition', y='Rate',
             title='Stage Conversion Rates (%)',
@@ -987,37 +1090,56 @@ elif page == "📈 Progress Analysis":
         )
         fig_conv.update_xaxes(tickangle=45)
         st.plotly_chart(fig_conv, use_container_width=True)
+        st.caption("Peluang lanjut ke tahap berikutnya saat customer meninggalkan sebuah tahap")
+    
+    # Absorbing Markov chain: peluang deal & waktu ke closing
+    st.subheader("🔗 Markov Chain: Peluang Deal & Waktu ke Closing")
+    
+    absorption_df = chain_overall.absorption_frame()
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig_absorb = px.bar(
+            absorption_df, x='Tahap', y=['Prob_Deal', 'Prob_Drop'],
+            title='Peluang Akhir dari Setiap Tahap', barmode='stack',
+            color_discrete_sequence=['#26a69a', '#ef9a9a']
+        )
+        st.plotly_chart(fig_absorb, use_container_width=True)
+    
+    with col2:
+        fig_ttc = px.bar(
+            absorption_df, x='Tahap', y='Hari_ke_Deal',
+            title='Ekspektasi Hari hingga Deal (jika deal)',
+            color='Hari_ke_Deal', color_continuous_scale='Oranges'
+        )
+        st.plotly_chart(fig_ttc, use_container_width=True)
+    
+    chain_by = st.radio("Rincian per", ['Nama_Sales', 'Segmen'], horizontal=True)
+    _, chain_groups = markov.funnel_chain(filtered_df, DATA_VERSION, FRAME_KEY, by=chain_by)
+    st.dataframe(markov.group_absorption_frame(chain_groups, chain_by).round(3), use_container_width=True)
     
     # Progress Velocity Analysis
     st.subheader("⚡ 2. Progress Velocity & Time Analysis")
     
     # Calculate average time per stage
-    stage_durations = []
-    for customer_id in filtered_df['ID_Customer'].unique():
-        customer_data = filtered_df[filtered_df['ID_Customer'] == customer_id].sort_values('Tanggal')
-        stages = customer_data['Progress'].unique()
-        
-        for i in range(len(stages)-1):
-            current_stage = stages[i]
-            next_stage = stages[i+1]
-            
-            current_date = customer_data[customer_data['Progress'] == current_stage]['Tanggal'].min()
-            next_date = customer_data[customer_data['Progress'] == next_stage]['Tanggal'].min()
-            
-            if pd.notnull(current_date) and pd.notnull(next_date):
-                duration = (next_date - current_date).days
-                if duration >= 0:
-                    stage_durations.append({
-                        'From_Stage': current_stage,
-                        'To_Stage': next_stage,
-                        'Duration_Days': duration,
-                        'Customer_ID': customer_id
-                    })
-    
-    if stage_durations:
-        duration_df = pd.DataFrame(stage_durations)
-        avg_durations = duration_df.groupby(['From_Stage', 'To_Stage'])['Duration_Days'].agg(['mean', 'median', 'std']).reset_index()
-        
+    avg_durations = None
+    if approx_mode:
+        # Mode perkiraan: rata-rata persis + median dari sketch 'transisi' per tahap tujuan funnel
+        transisi = quantiles.duration_sketches(df, DATA_VERSION)['transisi']
+        sketch_filter = {'Nama_Sales': nama_sales, 'Segmen': segmen, 'Status_Customer': status_cust}
+        rows = []
+        for prev_stage, next_stage in zip(tahapan_funnel, tahapan_funnel[1:]):
+            mask = transisi.select(date_range[0], date_range[1], Progress=next_stage, **sketch_filter)
+            if transisi.count(mask):
+                rows.append({'From_Stage': prev_stage, 'To_Stage': next_stage,
+                             'mean': transisi.mean(mask), 'median': transisi.quantile(mask).value})
+        avg_durations = pd.DataFrame(rows) if rows else None
+    else:
+        duration_df = memoize_frame(metrics.stage_transitions, filtered_df, DATA_VERSION, FRAME_KEY)
+        if len(duration_df):
+            avg_durations = duration_df.groupby(['From_Stage', 'To_Stage'])['Days'].agg(['mean', 'median', 'std']).reset_index()
+
+    if avg_durations is not None:
         col1, col2 = st.columns(2)
         
         with col1:
@@ -1046,21 +1168,11 @@ elif page == "📈 Progress Analysis":
     # Analyze successful vs unsuccessful patterns
     successful_customers = filtered_df[filtered_df['Progress'] == 'Paska Deal']['ID_Customer'].unique()
     
-    success_patterns = {}
-    unsuccessful_patterns = {}
-    
-    for customer_id in filtered_df['ID_Customer'].unique():
-        customer_journey = filtered_df[filtered_df['ID_Customer'] == customer_id].sort_values('Tanggal')['Progress'].tolist()
-        journey_str = ' → '.join(customer_journey)
-        
-        if customer_id in successful_customers:
-            success_patterns[journey_str] = success_patterns.get(journey_str, 0) + 1
-        else:
-            unsuccessful_patterns[journey_str] = unsuccessful_patterns.get(journey_str, 0) + 1
-    
-    # Top success patterns
-    top_success = sorted(success_patterns.items(), key=lambda x: x[1], reverse=True)[:5]
-    top_unsuccessful = sorted(unsuccessful_patterns.items(), key=lambda x: x[1], reverse=True)[:5]
+    journeys = memoize_frame(metrics.journey_patterns, filtered_df, DATA_VERSION, FRAME_KEY)
+    top_success, top_unsuccessful = (
+        list(journeys[journeys['Sukses'] == sukses].head(5)[['Journey', 'Customers']].itertuples(index=False, name=None))
+        for sukses in (True, False)
+    )
     
     col1, col2 = st.columns(2)
     
@@ -1082,7 +1194,8 @@ elif page == "📈 Progress Analysis":
     successful_customers_count = len(successful_customers)
     overall_success_rate = (successful_customers_count / total_customers * 100) if total_customers > 0 else 0
     
-    if stage_durations:
+    # Sumber durasi sama dengan grafik di atas (persis atau sketch di mode perkiraan)
+    if avg_durations is not None and not avg_durations.empty:
         longest_stage = avg_durations.loc[avg_durations['mean'].idxmax(), 'From_Stage']
         avg_longest_duration = avg_durations['mean'].max()
     else:
@@ -1112,6 +1225,28 @@ elif page == "📈 Progress Analysis":
     </div>
     """, unsafe_allow_html=True)
 
+    # Kohort bulan kunjungan pertama: offset bulan per kunjungan, tanpa loop per customer
+    st.subheader("🧭 Kohort Customer per Bulan Kunjungan Pertama")
+    cohorts = memoize_frame(cohort.cohort_matrix, filtered_df, DATA_VERSION, FRAME_KEY)
+    if len(cohorts.cohorts) == 0:
+        st.info("Tidak ada customer yang kunjungan pertamanya (Kunjungan_Ke = 1) berada di rentang filter ini.")
+    else:
+        cohort_labels = {t: f"Mencapai {t}" for t in cohort.TAHAPAN_FUNNEL[1:]}
+        cohort_labels[cohort.CLOSED] = "Closed (Status Kontrak Deal)"
+        cohort_measure = st.selectbox("Ukuran Kohort", list(cohort_labels), format_func=cohort_labels.get,
+                                      index=len(cohort_labels) - 1, key="cohort_measure")
+        cohort_share = cohorts.share(cohort_measure)
+        cohort_share = cohort_share.loc[:, cohort_share.notna().any()]
+        fig_cohort = px.imshow(
+            cohort_share.set_axis(cohort_share.index.astype(str)),
+            title=f'% Kohort {cohort_labels[cohort_measure]} per Bulan sejak Kontak Pertama',
+            color_continuous_scale='Teal', aspect='auto', text_auto='.0f', range_color=[0, 100]
+        )
+        st.plotly_chart(fig_cohort, use_container_width=True)
+        st.dataframe(cohorts.summary().set_axis(cohorts.cohorts.astype(str)).round(1), use_container_width=True)
+        st.caption("Persentase kumulatif customer kohort; mencapai tahap = berkunjung di tahap itu atau sesudahnya. "
+                   "Sel kosong belum bisa diamati (melewati bulan data terakhir).")
+
 elif page == "🔍 Factor Analysis":
     st.title("🔍 Factor Analysis - Deep Dive Success Drivers")
     st.markdown("### 🎯 Insight: Identifikasi Faktor Kunci Keberhasilan Sales")
@@ -1119,22 +1254,16 @@ elif page == "🔍 Factor Analysis":
     # Customer Profile Analysis
     st.subheader("👤 1. Customer Profile Success Factors")
     
-    # Analyze success by customer characteristics
-    latest_customer_data = filtered_df.sort_values('Tanggal').groupby('ID_Customer').last()
-    
-    # Success by Status Customer
-    status_success = latest_customer_data.groupby('Status_Customer').agg({
-        'ID_Customer': 'count',
-        'Progress': lambda x: (x == 'Paska Deal').sum()
-    }).rename(columns={'ID_Customer': 'Total', 'Progress': 'Success'})
-    status_success['Success_Rate'] = (status_success['Success'] / status_success['Total'] * 100)
-    
-    # Success by Segmen
-    segmen_success = latest_customer_data.groupby('Segmen').agg({
-        'ID_Customer': 'count',
-        'Progress': lambda x: (x == 'Paska Deal').sum()
-    }).rename(columns={'ID_Customer': 'Total', 'Progress': 'Success'})
-    segmen_success['Success_Rate'] = (segmen_success['Success'] / segmen_success['Total'] * 100)
+    # Section di halaman ini saling independen -> hitung paralel, render berurutan
+    customer_feats = features.features_for_filter(df, filtered_df, DATA_VERSION, FRAME_KEY)
+    factor_results = run_sections([
+        Section(name, memoize_frame, (func, customer_feats, DATA_VERSION, FRAME_KEY))
+        for name, func in [('profile', factors.customer_profile_factors), ('activity', factors.activity_factors),
+                           ('team', factors.team_factors)]
+    ])
+    status_success, segmen_success = factor_results['profile']
+    freq_analysis, visit_type_df = factor_results['activity']
+    sales_performance, level_performance = factor_results['team']
     
     col1, col2 = st.columns(2)
     
@@ -1157,42 +1286,6 @@ elif page == "🔍 Factor Analysis":
     # Sales Activity Factors
     st.subheader("📊 2. Sales Activity Success Factors")
     
-    # Visit frequency analysis
-    visit_frequency = filtered_df.groupby('ID_Customer').size()
-    customer_success = filtered_df.groupby('ID_Customer')['Progress'].last() == 'Paska Deal'
-    
-    frequency_success = pd.DataFrame({
-        'Visit_Count': visit_frequency,
-        'Success': customer_success
-    })
-    
-    # Categorize visit frequency
-    frequency_success['Frequency_Category'] = pd.cut(
-        frequency_success['Visit_Count'], 
-        bins=[0, 2, 4, 6, float('inf')], 
-        labels=['Low (1-2)', 'Medium (3-4)', 'High (5-6)', 'Very High (7+)']
-    )
-    
-    freq_analysis = frequency_success.groupby('Frequency_Category').agg({
-        'Visit_Count': 'count',
-        'Success': 'sum'
-    }).rename(columns={'Visit_Count': 'Total_Customers', 'Success': 'Successful_Customers'})
-    freq_analysis['Success_Rate'] = (freq_analysis['Successful_Customers'] / freq_analysis['Total_Customers'] * 100)
-    
-    # Visit type analysis
-    visit_type_success = {}
-    for visit_type in filtered_df['Jenis_Kunjungan'].unique():
-        customers_with_type = filtered_df[filtered_df['Jenis_Kunjungan'] == visit_type]['ID_Customer'].unique()
-        success_count = len([c for c in customers_with_type if customer_success.get(c, False)])
-        total_count = len(customers_with_type)
-        visit_type_success[visit_type] = {
-            'Total': total_count,
-            'Success': success_count,
-            'Success_Rate': (success_count / total_count * 100) if total_count > 0 else 0
-        }
-    
-    visit_type_df = pd.DataFrame(visit_type_success).T
-    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -1215,29 +1308,6 @@ elif page == "🔍 Factor Analysis":
     # Sales Performance Factors
     st.subheader("🏅 3. Sales Team Performance Factors")
     
-    # Success rate by sales level
-    sales_level_success = filtered_df.groupby(['Nama_Sales', 'Level_Sales']).agg({
-        'ID_Customer': 'nunique'
-    }).reset_index()
-    
-    # Get success count per sales
-    sales_success_count = latest_customer_data[latest_customer_data['Progress'] == 'Paska Deal'].groupby('Nama_Sales').size()
-    sales_total_count = latest_customer_data.groupby('Nama_Sales').size()
-    sales_success_rate = (sales_success_count / sales_total_count * 100).fillna(0)
-    
-    # Merge with level data
-    sales_performance = pd.DataFrame({
-        'Nama_Sales': sales_success_rate.index,
-        'Success_Rate': sales_success_rate.values
-    })
-    
-    level_mapping = filtered_df.groupby('Nama_Sales')['Level_Sales'].first()
-    sales_performance['Level_Sales'] = sales_performance['Nama_Sales'].map(level_mapping)
-    
-    # Level performance analysis
-    level_performance = sales_performance.groupby('Level_Sales')['Success_Rate'].agg(['mean', 'count']).reset_index()
-    level_performance.columns = ['Level_Sales', 'Avg_Success_Rate', 'Count']
-    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -1299,18 +1369,16 @@ elif page == "📅 Timeline Analysis":
     # Time-based Performance Analysis
     st.subheader("📈 1. Sales Performance Over Time")
     
-    # Daily/Weekly/Monthly trends
-    filtered_df['Week'] = filtered_df['Tanggal'].dt.to_period('W')
-    filtered_df['Month'] = filtered_df['Tanggal'].dt.to_period('M')
-    filtered_df['DayOfWeek'] = filtered_df['Tanggal'].dt.day_name()
-    filtered_df['Hour'] = filtered_df['Tanggal'].dt.hour
-    
-    # Weekly visits trend
-    weekly_visits = filtered_df.groupby('Week').size()
-    weekly_deals = filtered_df[filtered_df['Progress'] == 'Paska Deal'].groupby('Week').size()
-    
-    # Monthly revenue trend
-    monthly_revenue = filtered_df.groupby(['Month', 'ID_Customer'])['Nilai_Kontrak'].last().groupby('Month').sum()
+    # Section di halaman ini saling independen -> hitung paralel, render berurutan
+    timeline_results = run_sections([
+        Section(name, memoize_frame, (func, filtered_df, DATA_VERSION, FRAME_KEY))
+        for name, func in [('weekly', timeline.weekly_trend), ('dow', timeline.day_of_week_stats),
+                           ('cycles', timeline.sales_cycles), ('monthly', timeline.monthly_efficiency)]
+    ])
+    weekly_visits, monthly_revenue = timeline_results['weekly']
+    dow_analysis = timeline_results['dow']
+    cycles_df, successful_cycles, unsuccessful_cycles = timeline_results['cycles']
+    monthly_performance = timeline_results['monthly']
     
     col1, col2 = st.columns(2)
     
@@ -1330,22 +1398,49 @@ elif page == "📅 Timeline Analysis":
             labels={'x': 'Month', 'y': 'Revenue'}
         )
         st.plotly_chart(fig_monthly, use_container_width=True)
-    
+
+    # KPI jendela bergulir: prefix sum kubus harian, tiap jendela O(1) per sales/segmen
+    st.subheader("📊 KPI Rolling per Sales & Segmen")
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        rolling_by = st.radio("Rincian per", ['Nama_Sales', 'Segmen'], horizontal=True, key="rolling_by")
+    with col2:
+        rolling_window = st.slider("Jendela (hari)", min_value=1, max_value=180, value=30, key="rolling_window")
+    cube = memoize_frame(rolling.rolling_cube, filtered_df, DATA_VERSION, FRAME_KEY, rolling_by)
+    if not len(cube.days):
+        st.info("Tidak ada kunjungan pada filter ini untuk KPI rolling.")
+    else:
+        rolling_now = cube.window(rolling_window)
+        rolling_prev = cube.window(rolling_window, end=cube.days[-1] - pd.Timedelta(days=rolling_window))
+        tiles = st.columns(len(rolling.KPI))
+        for tile, kpi in zip(tiles, rolling.KPI):
+            now, prev = rolling_now.at['Total', kpi], rolling_prev.at['Total', kpi]
+            if kpi == 'Revenue':
+                tile.metric(f"Revenue {rolling_window} hari", f"Rp {now/1e6:,.0f} Juta", f"{(now - prev)/1e6:+,.0f} Juta")
+            elif kpi == 'Konversi':
+                tile.metric(f"Konversi {rolling_window} hari", f"{now:.1f}%", f"{now - prev:+.1f} poin")
+            else:
+                tile.metric(f"{kpi.replace('_', ' ')} {rolling_window} hari", f"{now:,.0f}", f"{now - prev:+,.0f}")
+        st.caption(f"Delta dibanding {rolling_window} hari sebelumnya · per {cube.days[-1]:%d %b %Y} · "
+                   "Konversi = deal / kunjungan dalam jendela yang sama")
+
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            rolling_measure = st.selectbox("Ukuran", rolling.KPI, index=0, key="rolling_measure")
+            rolling_series = cube.series(rolling_window, rolling_measure)
+            fig_rolling = px.line(
+                rolling_series.reset_index().melt(id_vars='Tanggal', var_name=rolling_by, value_name=rolling_measure),
+                x='Tanggal', y=rolling_measure, color=rolling_by,
+                title=f'{rolling_measure} Rolling {rolling_window} Hari per {rolling_by}'
+            )
+            st.plotly_chart(fig_rolling, use_container_width=True)
+        with col2:
+            st.dataframe(rolling.standard_windows(cube).round(1), use_container_width=True)
+            st.dataframe(rolling_now.round(1), use_container_width=True)
+
     # Day of Week Analysis
     st.subheader("📅 2. Day-of-Week Performance Patterns")
     
-    dow_analysis = filtered_df.groupby('DayOfWeek').agg({
-        'ID_Customer': 'count',
-        'Progress': lambda x: (x == 'Paska Deal').sum(),
-        'Nilai_Kontrak': 'sum'
-    }).rename(columns={'ID_Customer': 'Total_Visits', 'Progress': 'Deals'})
-    
-    dow_analysis['Success_Rate'] = (dow_analysis['Deals'] / dow_analysis['Total_Visits'] * 100)
-    
-    # Reorder days
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    dow_analysis = dow_analysis.reindex(day_order)
-    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -1369,29 +1464,6 @@ elif page == "📅 Timeline Analysis":
     # Sales Cycle Analysis
     st.subheader("🔄 3. Sales Cycle Timeline Analysis")
     
-    # Calculate average sales cycle duration
-    sales_cycles = []
-    for customer_id in filtered_df['ID_Customer'].unique():
-        customer_data = filtered_df[filtered_df['ID_Customer'] == customer_id].sort_values('Tanggal')
-        first_contact = customer_data['Tanggal'].min()
-        last_activity = customer_data['Tanggal'].max()
-        final_status = customer_data['Progress'].iloc[-1]
-        
-        cycle_duration = (last_activity - first_contact).days
-        sales_cycles.append({
-            'Customer_ID': customer_id,
-            'Cycle_Duration': cycle_duration,
-            'Final_Status': final_status,
-            'First_Contact': first_contact,
-            'Last_Activity': last_activity
-        })
-    
-    cycles_df = pd.DataFrame(sales_cycles)
-    
-    # Successful vs unsuccessful cycle durations
-    successful_cycles = cycles_df[cycles_df['Final_Status'] == 'Paska Deal']['Cycle_Duration']
-    unsuccessful_cycles = cycles_df[cycles_df['Final_Status'] != 'Paska Deal']['Cycle_Duration']
-    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -1404,13 +1476,24 @@ elif page == "📅 Timeline Analysis":
         st.plotly_chart(fig_cycle_hist, use_container_width=True)
     
     with col2:
+        if approx_mode:
+            # Median dari sketch kuantil 'siklus' (status akhir deal vs bukan deal)
+            siklus = quantiles.duration_sketches(df, DATA_VERSION)['siklus']
+            sketch_filter = {'Nama_Sales': nama_sales, 'Segmen': segmen, 'Status_Customer': status_cust}
+            in_range = siklus.select(date_range[0], date_range[1], **sketch_filter)
+            deal_cells = siklus.select(Progress='Paska Deal')
+            median_success = siklus.quantile(in_range & deal_cells).value
+            median_fail = siklus.quantile(in_range & ~deal_cells).value
+        else:
+            median_success = successful_cycles.median() if len(successful_cycles) > 0 else 0
+            median_fail = unsuccessful_cycles.median() if len(unsuccessful_cycles) > 0 else 0
         cycle_stats = pd.DataFrame({
             'Metric': ['Successful Avg', 'Unsuccessful Avg', 'Successful Median', 'Unsuccessful Median'],
             'Value': [
                 successful_cycles.mean() if len(successful_cycles) > 0 else 0,
                 unsuccessful_cycles.mean() if len(unsuccessful_cycles) > 0 else 0,
-                successful_cycles.median() if len(successful_cycles) > 0 else 0,
-                unsuccessful_cycles.median() if len(unsuccessful_cycles) > 0 else 0
+                np.nan_to_num(median_success),
+                np.nan_to_num(median_fail),
             ]
         })
         
@@ -1425,18 +1508,8 @@ elif page == "📅 Timeline Analysis":
     # Seasonal Analysis
     st.subheader("🌊 4. Seasonal & Temporal Insights")
     
-    # Monthly performance comparison
-    monthly_performance = filtered_df.groupby('Month').agg({
-        'ID_Customer': 'nunique',
-        'Progress': lambda x: (x == 'Paska Deal').sum(),
-        'Nilai_Kontrak': 'sum'
-    }).rename(columns={'ID_Customer': 'Unique_Customers', 'Progress': 'Deals'})
-    
-    monthly_performance['Deals_per_Customer'] = monthly_performance['Deals'] / monthly_performance['Unique_Customers']
-    monthly_performance['Revenue_per_Customer'] = monthly_performance['Nilai_Kontrak'] / monthly_performance['Unique_Customers']
-    
     fig_seasonal = px.line(
-        monthly_performance.reset_index(), x='Month', y=['Deals_per_Customer', 'Revenue_per_Customer'],
+        monthly_performance.reset_index().astype({'Month': str}), x='Month', y=['Deals_per_Customer', 'Revenue_per_Customer'],
         title='Monthly Performance Efficiency Trends'
     )
     fig_seasonal.update_xaxes(title='Month')
@@ -1490,6 +1563,11 @@ elif page == "👤 Profil Sales":
     )
     
     sales_data = filtered_df[filtered_df['Nama_Sales'] == selected_sales]
+    team_metrics = memoize_frame(metrics.team_metrics, filtered_df, DATA_VERSION, FRAME_KEY)
+    individual_stats = team_metrics.loc[selected_sales]
+    team_avg = team_metrics.mean()
+    profile = memoize_frame(metrics.rep_profile, filtered_df, DATA_VERSION, FRAME_KEY, selected_sales)
+    ringkasan = profile['ringkasan'].iloc[0]
     
     # Sales Profile Overview
     st.subheader(f"📊 Profile Overview - {selected_sales}")
@@ -1497,27 +1575,23 @@ elif page == "👤 Profil Sales":
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_customers = sales_data['ID_Customer'].nunique()
-        st.metric("Total Customers", total_customers)
+        st.metric("Total Customers", int(ringkasan['Total_Customers']))
     
     with col2:
-        total_visits = len(sales_data)
-        st.metric("Total Visits", total_visits)
+        st.metric("Total Visits", int(ringkasan['Total_Visits']))
     
     with col3:
-        avg_visits_per_customer = total_visits / total_customers if total_customers > 0 else 0
-        st.metric("Avg Visits/Customer", f"{avg_visits_per_customer:.1f}")
+        st.metric("Avg Visits/Customer", f"{ringkasan['Avg_Visits_per_Customer']:.1f}")
     
     with col4:
-        success_rate = (sales_data.groupby('ID_Customer')['Progress'].last() == 'Paska Deal').mean() * 100
-        st.metric("Success Rate", f"{success_rate:.1f}%")
+        st.metric("Success Rate", f"{ringkasan['Success_Rate']:.1f}%")
     
     # Individual Performance Metrics
     st.subheader("🏅 Individual Performance Metrics")
     
     # Sales activity distribution
-    activity_dist = sales_data['Jenis_Kunjungan'].value_counts()
-    progress_dist = sales_data.groupby('ID_Customer')['Progress'].last().value_counts()
+    activity_dist = profile['aktivitas']['Jumlah']
+    progress_dist = profile['progress_akhir']['Jumlah']
     
     col1, col2 = st.columns(2)
     
@@ -1525,7 +1599,7 @@ elif page == "👤 Profil Sales":
         fig_activity = px.pie(
             values=activity_dist.values, names=activity_dist.index,
             title=f'{selected_sales} - Activity Distribution',
-            color_discrete_sequence=px.colors.sequential.Set3
+            color_discrete_sequence=px.colors.qualitative.Set3
         )
         st.plotly_chart(fig_activity, use_container_width=True)
     
@@ -1533,50 +1607,15 @@ elif page == "👤 Profil Sales":
         fig_progress = px.pie(
             values=progress_dist.values, names=progress_dist.index,
             title=f'{selected_sales} - Customer Progress Distribution',
-            color_discrete_sequence=px.colors.sequential.Pastel1
+            color_discrete_sequence=px.colors.qualitative.Pastel1
         )
         st.plotly_chart(fig_progress, use_container_width=True)
     
     # Performance vs Team Comparison
     st.subheader("📈 Performance vs Team Comparison")
     
-    # Calculate team benchmarks
-    team_metrics = filtered_df.groupby('Nama_Sales').agg({
-        'ID_Customer': 'nunique',
-        'Nilai_Kontrak': 'sum'
-    }).rename(columns={'ID_Customer': 'Total_Customers', 'Nilai_Kontrak': 'Total_Revenue'})
-    
-    # Success rate calculation
-    team_success_rates = []
-    for sales in team_metrics.index:
-        sales_customer_data = filtered_df[filtered_df['Nama_Sales'] == sales]
-        success_rate = (sales_customer_data.groupby('ID_Customer')['Progress'].last() == 'Paska Deal').mean() * 100
-        team_success_rates.append(success_rate)
-    
-    team_metrics['Success_Rate'] = team_success_rates
-    team_metrics['Revenue_per_Customer'] = team_metrics['Total_Revenue'] / team_metrics['Total_Customers']
-    
     # Individual vs team comparison
-    individual_stats = team_metrics.loc[selected_sales]
-    team_avg = team_metrics.mean()
-    
-    comparison_data = pd.DataFrame({
-        'Metric': ['Total Customers', 'Success Rate (%)', 'Revenue per Customer (Rp)', 'Total Revenue (Rp)'],
-        'Individual': [
-            individual_stats['Total_Customers'],
-            individual_stats['Success_Rate'],
-            individual_stats['Revenue_per_Customer'],
-            individual_stats['Total_Revenue']
-        ],
-        'Team Average': [
-            team_avg['Total_Customers'],
-            team_avg['Success_Rate'],
-            team_avg['Revenue_per_Customer'],
-            team_avg['Total_Revenue']
-        ]
-    })
-    
-    comparison_data['Performance_Ratio'] = comparison_data['Individual'] / comparison_data['Team Average']
+    comparison_data = profile['vs_tim']
     
     col1, col2 = st.columns(2)
     
@@ -1603,11 +1642,7 @@ elif page == "👤 Profil Sales":
     st.subheader("📅 Time-based Performance Analysis")
     
     # Daily/weekly performance
-    sales_data['Week'] = sales_data['Tanggal'].dt.to_period('W')
-    weekly_performance = sales_data.groupby('Week').agg({
-        'ID_Customer': 'nunique',
-        'Jenis_Kunjungan': 'count'
-    }).rename(columns={'ID_Customer': 'Unique_Customers', 'Jenis_Kunjungan': 'Total_Activities'})
+    weekly_performance = profile['mingguan']
     
     col1, col2 = st.columns(2)
     
@@ -1632,36 +1667,63 @@ elif page == "👤 Profil Sales":
     # Customer Journey Analysis
     st.subheader("🛤️ Customer Journey Analysis")
     
-    # Successful customer journeys
-    successful_customers = sales_data[sales_data['Progress'] == 'Paska Deal']['ID_Customer'].unique()
-    
-    journey_patterns = {}
-    for customer_id in sales_data['ID_Customer'].unique():
-        customer_journey = sales_data[sales_data['ID_Customer'] == customer_id].sort_values('Tanggal')
-        journey_steps = customer_journey['Progress'].unique()
-        journey_str = ' → '.join(journey_steps)
-        
-        is_successful = customer_id in successful_customers
-        if journey_str not in journey_patterns:
-            journey_patterns[journey_str] = {'successful': 0, 'total': 0}
-        
-        journey_patterns[journey_str]['total'] += 1
-        if is_successful:
-            journey_patterns[journey_str]['successful'] += 1
-    
-    # Convert to DataFrame
-    journey_df = pd.DataFrame([
-        {
-            'Journey': journey,
-            'Total_Customers': data['total'],
-            'Successful_Customers': data['successful'],
-            'Success_Rate': (data['successful'] / data['total'] * 100) if data['total'] > 0 else 0
-        }
-        for journey, data in journey_patterns.items()
-    ]).sort_values('Total_Customers', ascending=False)
+    # Urutan tahap berbeda per customer dan success rate-nya
+    journey_df = profile['journey']
     
     st.dataframe(journey_df, use_container_width=True)
     
+    # Similar Past Customers (nearest neighbour dari indeks vektor customer)
+    st.subheader("🧭 Similar Past Customers")
+    customer_names = sales_data.drop_duplicates('ID_Customer').set_index('ID_Customer')['Nama_Customer']
+    selected_customer = st.selectbox(
+        "Pilih Customer:", options=customer_names.index, format_func=lambda c: f"{c} - {customer_names[c]}"
+    )
+    if selected_customer is not None:
+        similar_customers = similar.similarity_index(df, DATA_VERSION).neighbours(selected_customer, k=5)
+        if not similar_customers.empty:
+            n_deal = (similar_customers['Status_Kontrak_Akhir'] == 'Deal').sum()
+            st.info(f"📌 {n_deal} dari {len(similar_customers)} customer paling mirip berakhir **Deal**.")
+            st.dataframe(
+                similar_customers.style.format({'Similarity': '{:.2f}', 'Nilai_Kontrak': 'Rp {:,.0f}'}),
+                use_container_width=True, hide_index=True
+            )
+    
+    # Visit Notes Analysis (dari indeks catatan, tanpa menghitung ulang string mentah)
+    st.subheader("📝 Visit Notes Analysis")
+    notes_idx = notes.notes_for_filter(df, filtered_df, DATA_VERSION, FRAME_KEY)
+    notes_filter = {'Nama_Sales': selected_sales, 'Segmen': segmen, 'Status_Customer': status_cust}
+    sales_top_notes = notes_idx.top_notes(5, **notes_filter)
+    sales_deal_notes = notes_idx.top_notes(1, Status_Kontrak='Deal', **notes_filter)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if not sales_top_notes.empty:
+            fig_notes = px.bar(
+                x=sales_top_notes.values, y=sales_top_notes.index, orientation='h',
+                title=f'{selected_sales} - Top 5 Visit Notes',
+                labels={'x': 'Jumlah', 'y': 'Catatan'}
+            )
+            fig_notes.update_yaxes(autorange='reversed')
+            st.plotly_chart(fig_notes, use_container_width=True)
+        if not sales_deal_notes.empty:
+            st.success(f"✅ Catatan efektif saat Deal: “{sales_deal_notes.index[0]}”")
+        elif not sales_top_notes.empty:
+            st.success(f"✅ Catatan paling umum: “{sales_top_notes.index[0]}”")
+    
+    with col2:
+        wordcloud_scope = st.radio(
+            "Word cloud catatan:", ["Semua", "Deal", "Lost (Cancel/Batal)"], horizontal=True
+        )
+        status_scope = {'Semua': None, 'Deal': 'Deal', 'Lost (Cancel/Batal)': notes.STATUS_LOST}[wordcloud_scope]
+        wordcloud = notes.wordcloud_image(
+            notes_idx, DATA_VERSION, FRAME_KEY, Status_Kontrak=status_scope, **notes_filter
+        )
+        if wordcloud is not None:
+            st.image(wordcloud, caption=f'Word Cloud Catatan - {wordcloud_scope}', use_container_width=True)
+        else:
+            st.info("Tidak ada catatan untuk kategori ini.")
+    
     # Individual Insights & Recommendations
     st.subheader("💡 Individual Insights & Development Recommendations")
     
@@ -1709,7 +1771,7 @@ elif page == "👤 Profil Sales":
     if individual_stats['Total_Customers'] < team_avg['Total_Customers']:
         recommendations.append("Increase prospecting activities and customer outreach")
     
-    if avg_visits_per_customer < 3:
+    if ringkasan['Avg_Visits_per_Customer'] < 3:
         recommendations.append("Increase customer touchpoints and relationship building")
     
     recommendations.append(f"Replicate successful journey pattern: {best_journey}")
@@ -1942,25 +2004,10 @@ elif page == "🟦 Sales Performance":
 
     # Rata-rata durasi closing yang sudah diperbaiki (dari Inisiasi ke Paska Deal)
     st.subheader("⏱️ Durasi Proses Closing (Inisiasi → Deal)")
-    deal_customers = data_sales[data_sales['Progress'] == 'Paska Deal']['ID_Customer'].unique()
-    data_deal = data_sales[data_sales['ID_Customer'].isin(deal_customers)]
-
-    durasi_per_customer = []
-    for cust_id, group in data_deal.groupby('ID_Customer'):
-        group = group.sort_values('Tanggal')
-        tanggal_inisiasi = group[group['Progress'] == 'Inisiasi']['Tanggal'].min()
-        tanggal_deal = group[group['Progress'] == 'Paska Deal']['Tanggal'].max()
-        if pd.notnull(tanggal_inisiasi) and pd.notnull(tanggal_deal):
-            durasi = (tanggal_deal - tanggal_inisiasi).days
-            if durasi >= 0:
-                durasi_per_customer.append(durasi)
-
-    if durasi_per_customer:
-        rata2_durasi = np.mean(durasi_per_customer)
-        median_durasi = np.median(durasi_per_customer)
-    else:
-        rata2_durasi = 0
-        median_durasi = 0
+    durasi_closing = metrics.closing_durations(data_sales)['Days']
+    durasi_closing = durasi_closing[durasi_closing >= 0]
+    rata2_durasi = durasi_closing.mean() if len(durasi_closing) else 0
+    median_durasi = durasi_closing.median() if len(durasi_closing) else 0
 
     col1, col2 = st.columns(2)
     with col1:
@@ -1979,7 +2026,9 @@ elif page == "🟦 Sales Performance":
     timeline = data_sales.groupby('Tanggal').size()
     distrib_jenis = data_sales['Jenis_Kunjungan'].value_counts()
     max_stage = data_sales.groupby('ID_Customer')['Progress_Score'].max().mean()
-    top_notes = data_sales['Catatan'].value_counts().head(5)
+    notes_idx = notes.notes_for_filter(df, filtered_df, DATA_VERSION, FRAME_KEY)
+    notes_filter = {'Nama_Sales': nama, 'Segmen': segmen, 'Status_Customer': status_cust}
+    top_notes = notes_idx.top_notes(5, **notes_filter)
 
     funnel_data = {
         stage: data_sales[data_sales['Progress'] == stage]['ID_Customer'].nunique()
@@ -1988,21 +2037,7 @@ elif page == "🟦 Sales Performance":
     funnel_series = pd.Series(funnel_data)
 
     # Durasi antar tahap
-    stage_durations = []
-    for cust_id, group in data_sales.groupby('ID_Customer'):
-        group = group.sort_values('Tanggal')
-        stage_dates = {}
-        for _, row in group.iterrows():
-            stage = row['Progress']
-            if stage not in stage_dates:
-                stage_dates[stage] = row['Tanggal']
-        for s1, s2 in zip(progress_order[:-1], progress_order[1:]):
-            if s1 in stage_dates and s2 in stage_dates:
-                delta = (stage_dates[s2] - stage_dates[s1]).days
-                if delta >= 0:
-                    stage_durations.append({'From': s1, 'To': s2, 'Days': delta})
-
-    durasi_df = pd.DataFrame(stage_durations)
+    durasi_df = metrics.stage_gaps(data_sales, progress_order)
     avg_durasi = durasi_df.groupby(['From', 'To'])['Days'].mean().reset_index()
 
     # Plotting
@@ -2057,7 +2092,7 @@ elif page == "🟦 Sales Performance":
         st.warning(f"⏱ Transisi terlama rata-rata: {slowest['From']} → {slowest['To']} ({slowest['Days']:.1f} hari)")
 
     top_catatan = top_notes.idxmax()
-    deal_notes = data_sales[data_sales['Status_Kontrak'] == 'Deal']['Catatan'].value_counts()
+    deal_notes = notes_idx.top_notes(1, Status_Kontrak='Deal', **notes_filter)
     if not deal_notes.empty:
         catatan_efektif = deal_notes.idxmax()
         st.success(f"✅ Catatan efektif saat Deal: “{catatan_efektif}”")
@@ -0,0 +1 @@
+"""Lapisan komputasi dashboard sales tracker (tanpa ketergantungan ke Streamlit)."""
@@ -0,0 +1,257 @@
+"""API HTTP/JSON lokal untuk KPI dashboard (ASGI murni, tanpa Streamlit).
+
+Endpoint (``GET``/``HEAD``), semuanya menerima filter yang sama dengan sidebar:
+``start``, ``end`` (YYYY-MM-DD), ``sales``, ``segmen``, ``status`` (nilai ganda
+dipisah koma atau parameter berulang; kosong = semua).
+
+- ``/kpi``          closing rate, nilai pipeline, AHT, funnel, realisasi target
+- ``/leaderboard``  leaderboard per sales
+- ``/segments``     laporan per segmen
+- ``/funnel``       customer per tahap, ``by=Nama_Sales`` (default) atau ``by=Segmen``
+- ``/pipeline``     nilai pipeline per sales per tahap
+- ``/health``       status dan versi data
+- ``/ready``        200 bila cache halaman utama dashboard sudah hangat (``warmup``), selain itu 503
+
+Respons JSON di-cache di ``shared_cache`` per (versi data, endpoint, kunci
+filter) dengan ETag ``"<versi>-<hash kunci>"``; permintaan dengan
+``If-None-Match`` yang cocok dijawab 304 tanpa menghitung. Perhitungan berjalan
+di thread pool sendiri berukuran ``API_WORKERS`` sehingga lonjakan permintaan
+tidak menghabiskan pool dashboard; bila antrean melebihi ``MAX_PENDING``
+permintaan ditolak dengan 503.
+
+Menjalankan (butuh ``uvicorn``)::
+
+    python -m salestracker.api --port 8502
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import numpy as np
+import pandas as pd
+
+from . import metrics, shared
+from .cache import memoize
+from .data import DATA_PATH, data_version, date_index, filter_key, load_visits, rows_in_date_range, source_token
+from .pipeline import pipeline_by_stage
+from .warmup import read_status
+
+API_WORKERS = 2
+MAX_PENDING = 32
+FUNNEL_BY = ('Nama_Sales', 'Segmen')
+
+
+class BadRequest(ValueError):
+    """Parameter permintaan tidak valid (dijawab 400)."""
+
+
+class DataSource:
+    """Dataset kanonik untuk API; dimuat ulang bila token sumber (mtime/COUNT SQL) berubah."""
+
+    def __init__(self, path=DATA_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._token = None
+        self._state = None
+
+    def current(self):
+        """``(df, versi, indeks tanggal)`` terbaru."""
+        token = source_token(self.path)
+        with self._lock:
+            if self._state is None or token != self._token:
+                df = load_visits(self.path)
+                version = data_version(df)
+                df = shared.shared_frame(df, version)
+                self._state, self._token = (df, version, date_index(df)), token
+            return self._state
+
+
+def _values(params, name, options):
+    """Pilihan filter dari query string; kosong berarti semua ``options``."""
+    raw = [v for item in params.get(name, []) for v in item.split(',') if v.strip()]
+    if not raw:
+        return list(options)
+    unknown = sorted(set(raw) - set(map(str, options)))
+    if unknown:
+        raise BadRequest(f"nilai {name} tidak dikenal: {', '.join(unknown)}")
+    return raw
+
+
+def _date(params, name, default):
+    value = params.get(name, [None])[0]
+    if not value:
+        return default
+    try:
+        return pd.Timestamp(value)
+    except ValueError:
+        raise BadRequest(f"tanggal {name} tidak valid: {value}") from None
+
+
+def parse_filters(df, params):
+    """Filter sidebar dari query string: ``(date_range, nama_sales, segmen, status_cust)``."""
+    date_range = (_date(params, 'start', df['Tanggal'].min()), _date(params, 'end', df['Tanggal'].max()))
+    return (
+        date_range,
+        _values(params, 'sales', df['Nama_Sales'].unique()),
+        _values(params, 'segmen', df['Segmen'].unique()),
+        _values(params, 'status', df['Status_Customer'].unique()),
+    )
+
+
+def _records(frame):
+    frame = frame.reset_index()
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient='records')
+
+
+def _json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    raise TypeError(f"tidak bisa diserialisasi: {type(value).__name__}")
+
+
+def _funnel(frame, params):
+    by = params.get('by', ['Nama_Sales'])[0]
+    if by not in FUNNEL_BY:
+        raise BadRequest(f"by harus salah satu dari {', '.join(FUNNEL_BY)}")
+    return _records(metrics.funnel_counts(frame, by))
+
+
+ROUTES = {
+    '/kpi': lambda frame, params: metrics.team_kpis(frame),
+    '/leaderboard': lambda frame, params: _records(metrics.sales_leaderboard(frame)),
+    '/segments': lambda frame, params: _records(metrics.segment_report(frame)),
+    '/funnel': _funnel,
+    '/pipeline': lambda frame, params: _records(pipeline_by_stage(frame)),
+}
+# Parameter tambahan (selain filter) yang ikut menentukan isi respons
+EXTRA_PARAMS = {'/funnel': ('by',)}
+
+
+class MetricsAPI:
+    """Aplikasi ASGI; satu instance per proses server."""
+
+    def __init__(self, path=DATA_PATH, workers=API_WORKERS, max_pending=MAX_PENDING):
+        self.source = DataSource(path)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+        self.max_pending = max_pending
+        self._pending = 0
+
+    def _respond(self, route, params, if_none_match):
+        """Hitung (atau ambil dari cache) respons; dijalankan di pool API."""
+        if route == '/health':
+            _, version, _ = self.source.current()
+            return 200, {'status': 'ok', 'data_version': version}, None
+        if route == '/ready':
+            # Status ditulis oleh proses dashboard ke shared_data/warmup.json
+            status = read_status() or {'ready': False}
+            return (200 if status.get('ready') else 503), status, None
+
+        df, version, index = self.source.current()
+        date_range, nama_sales, segmen, status_cust = parse_filters(df, params)
+        key = filter_key(date_range, nama_sales, segmen, status_cust)
+        extra = tuple(params.get(name, [''])[0] for name in EXTRA_PARAMS.get(route, ()))
+        etag = f'"{version}-{hashlib.sha1(repr((route, key, extra)).encode()).hexdigest()[:12]}"'
+        if if_none_match == etag:
+            return 304, None, etag
+
+        def build():
+            rows = shared.filter_rows(
+                df, rows_in_date_range(index, date_range[0], date_range[1]), nama_sales, segmen, status_cust
+            )
+            frame = shared.filtered_frame(df, version, key, rows)
+            payload = {'data_version': version, 'filter': {
+                'start': str(date_range[0].date()), 'end': str(date_range[1].date()),
+                'sales': key[1], 'segmen': key[2], 'status': key[3],
+            }, 'data': ROUTES[route](frame, params)}
+            return json.dumps(payload, default=_json_default).encode()
+
+        return 200, memoize('api', version, (route, key, extra), build), etag
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        route = scope['path'].rstrip('/') or '/'
+        if scope['method'] not in ('GET', 'HEAD'):
+            await _send_json(send, 405, {'error': 'hanya GET/HEAD'})
+            return
+        if route not in ROUTES and route not in ('/health', '/ready'):
+            await _send_json(send, 404, {'error': f'endpoint tidak dikenal: {route}'})
+            return
+        if self._pending >= self.max_pending:
+            await _send_json(send, 503, {'error': 'server sibuk'}, [(b'retry-after', b'1')])
+            return
+
+        params = parse_qs(scope.get('query_string', b'').decode())
+        headers = dict(scope.get('headers', []))
+        if_none_match = headers.get(b'if-none-match', b'').decode() or None
+        self._pending += 1
+        try:
+            status, body, etag = await asyncio.get_running_loop().run_in_executor(
+                self.pool, self._respond, route, params, if_none_match
+            )
+        except BadRequest as exc:
+            await _send_json(send, 400, {'error': str(exc)})
+            return
+        finally:
+            self._pending -= 1
+
+        extra_headers = [(b'etag', etag.encode()), (b'cache-control', b'no-cache')] if etag else []
+        if status == 304:
+            await send({'type': 'http.response.start', 'status': 304, 'headers': extra_headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        await _send_json(send, status, body, extra_headers, head=scope['method'] == 'HEAD')
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+async def _send_json(send, status, body, headers=(), head=False):
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode()
+    await send({'type': 'http.response.start', 'status': status, 'headers': [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode()),
+        *headers,
+    ]})
+    await send({'type': 'http.response.body', 'body': b'' if head else body})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP/JSON lokal untuk KPI sales tracker.")
+    parser.add_argument("--data", default=DATA_PATH,
+                        help="CSV, direktori/glob CSV regional, direktori store, atau URL SQL (default: %(default)s)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="thread perhitungan (default: %(default)s)")
+    args = parser.parse_args(argv)
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("uvicorn belum terpasang: pip install uvicorn")
+    uvicorn.run(MetricsAPI(args.data, args.workers), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
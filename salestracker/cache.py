@@ -0,0 +1,90 @@
+"""Cache hasil perhitungan bersama (lintas sesi) yang dikunci versi data.
+
+Kunci cache selalu diawali nama perhitungan dan versi data, sehingga data baru
+otomatis memakai entri baru dan entri lama tersingkir oleh LRU.
+"""
+import threading
+from collections import OrderedDict
+
+
+class VersionedCache:
+    """LRU thread-safe; perhitungan untuk kunci yang sama hanya jalan sekali.
+
+    Dibatasi jumlah entri (``maxsize``) dan, bila ``maxbytes`` diberikan, total
+    ukuran nilai menurut ``sizeof``; entri terbaru selalu disimpan.
+    """
+
+    def __init__(self, maxsize=256, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+            return default
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def set(self, key, value):
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        with self._lock:
+            self.nbytes += size - self._sizes.get(key, 0)
+            self._data[key] = value
+            self._sizes[key] = size
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize or (
+                self.maxbytes is not None and self.nbytes > self.maxbytes and len(self._data) > 1
+            ):
+                old_key, _ = self._data.popitem(last=False)
+                self.nbytes -= self._sizes.pop(old_key)
+
+    def get_or_compute(self, key, func, *args, **kwargs):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Sesi lain yang meminta kunci sama menunggu hasil, bukan menghitung ulang
+        with key_lock:
+            with self._lock:
+                if key in self._data:
+                    return self._data[key]
+            value = func(*args, **kwargs)
+            self.set(key, value)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+
+shared_cache = VersionedCache()
+
+
+def memoize(name, version, key, func, *args, **kwargs):
+    """Ambil ``func(*args)`` dari cache bersama dengan kunci ``(name, version, key)``."""
+    return shared_cache.get_or_compute((name, version, key), func, *args, **kwargs)
+
+
+def memoize_frame(func, frame, version, key, *args):
+    """``func(frame, *args)`` untuk frame terfilter ber-kunci ``key`` (nama cache dari nama fungsi).
+
+    Dipakai halaman dashboard dan pemanasan cache (``warmup``) agar keduanya
+    memakai entri yang sama; ``args`` harus hashable.
+    """
+    return memoize(f"{func.__module__}.{func.__qualname__}", version, (key, args), func, frame, *args)
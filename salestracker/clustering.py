@@ -0,0 +1,137 @@
+"""Segmentasi sales dengan KMeans atas metrik perilaku per sales.
+
+Metrik per sales diambil dari tabel fitur customer, distandarkan, lalu
+dikelompokkan dengan KMeans (jumlah klaster dipilih dengan silhouette).
+Hasil di-cache per versi data dan kunci filter; fitting berjalan di background
+thread sehingga rerun halaman tidak menunggu dan tiap kunci hanya dihitung sekali.
+"""
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .cache import shared_cache
+from .executor import submit_once
+
+METRIK = {
+    'Total_Customer': 'Jumlah customer',
+    'Success_Rate': 'Success rate',
+    'Revenue_per_Customer': 'Revenue per customer',
+    'Avg_Kunjungan': 'Kunjungan per customer',
+    'Avg_Jeda': 'Jeda antar kunjungan',
+    'Avg_Tahap': 'Tahap tertinggi',
+}
+MAX_CLUSTERS = 5
+
+
+@dataclass
+class RepClusters:
+    """Hasil klaster: metrik + label per sales, centroid, dan model terlatih."""
+    metrics: pd.DataFrame      # index Nama_Sales, kolom METRIK + Cluster + Archetype
+    centroids: pd.DataFrame    # index Archetype, kolom METRIK (satuan asli)
+    silhouette: float
+    model: object
+    scaler: object
+
+
+@dataclass
+class ClusterFailure:
+    """Penanda fit yang gagal; di-cache di kunci yang sama agar tidak di-submit ulang tiap rerun."""
+    error: str
+
+
+def rep_metrics(feats):
+    """Metrik perilaku per sales dari tabel fitur customer."""
+    deal_value = feats['Nilai_Kontrak'].where(feats['Is_Deal'] == 1, 0)
+    by_sales = feats.assign(Deal_Value=deal_value).groupby('Nama_Sales')
+    metrics = pd.DataFrame({
+        'Total_Customer': by_sales.size(),
+        'Success_Rate': by_sales['Is_Success'].mean() * 100,
+        'Revenue_per_Customer': by_sales['Deal_Value'].sum() / by_sales.size(),
+        'Avg_Kunjungan': by_sales['Jumlah_Kunjungan'].mean(),
+        'Avg_Jeda': by_sales['Jeda_Rata2'].mean(),
+        'Avg_Tahap': by_sales['Tahap_Maks'].mean(),
+    })
+    return metrics.fillna(0.0)
+
+
+def _archetype_names(z_centroids):
+    """Nama tiap klaster dari metrik yang paling menonjol (tinggi/rendah) di centroid."""
+    names = []
+    labels = list(METRIK.values())
+    for row in z_centroids:
+        top = int(np.argmax(np.abs(row)))
+        level = 'tinggi' if row[top] >= 0 else 'rendah'
+        names.append(f"{labels[top]} {level}")
+    # Pastikan unik bila dua klaster menonjol di metrik yang sama
+    seen = {}
+    for i, name in enumerate(names):
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            names[i] = f"{name} ({seen[name]})"
+    return [f"K{i + 1}: {name}" for i, name in enumerate(names)]
+
+
+def fit_clusters(feats, max_clusters=MAX_CLUSTERS, seed=42):
+    """Fit KMeans pada metrik per sales; ``None`` bila sales (berbeda) terlalu sedikit."""
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+    from sklearn.preprocessing import StandardScaler
+
+    metrics = rep_metrics(feats)
+    if len(metrics) < 3:
+        return None
+    scaler = StandardScaler()
+    X = scaler.fit_transform(metrics[list(METRIK)])
+
+    best = None
+    # k dibatasi jumlah titik berbeda: baris metrik kembar tidak bisa dipisah
+    distinct = len(np.unique(X, axis=0))
+    for k in range(2, min(max_clusters, len(metrics) - 1, distinct) + 1):
+        model = KMeans(n_clusters=k, n_init=10, random_state=seed).fit(X)
+        # Silhouette butuh 2..n-1 label berbeda
+        n_labels = len(np.unique(model.labels_))
+        if n_labels < 2 or n_labels >= len(X):
+            continue
+        score = silhouette_score(X, model.labels_)
+        if best is None or score > best[0]:
+            best = (score, model)
+    if best is None:
+        return None
+    score, model = best
+
+    names = _archetype_names(model.cluster_centers_)
+    metrics['Cluster'] = model.labels_
+    metrics['Archetype'] = [names[c] for c in model.labels_]
+    centroids = pd.DataFrame(
+        scaler.inverse_transform(model.cluster_centers_), index=names, columns=list(METRIK)
+    )
+    centroids['Jumlah_Sales'] = np.bincount(model.labels_, minlength=len(names))
+    return RepClusters(metrics, centroids, float(score), model, scaler)
+
+
+def _fit_and_store(cache_key, feats):
+    try:
+        result = fit_clusters(feats)
+    except Exception as exc:
+        result = ClusterFailure(f"{type(exc).__name__}: {exc}")
+    shared_cache.set(cache_key, result)
+    return result
+
+
+def rep_clusters(feats, version, key, wait=2.0):
+    """Klaster untuk versi data + filter ini, dihitung di background.
+
+    Menunggu paling lama ``wait`` detik; mengembalikan ``(hasil, siap)``.
+    ``hasil`` berupa ``ClusterFailure`` bila fitting gagal. Bila belum siap, halaman bisa menampilkan status dan hasil muncul pada
+    rerun berikutnya tanpa menghitung ulang.
+    """
+    cache_key = ('rep_clusters', version, key)
+    if cache_key in shared_cache:
+        return shared_cache.get(cache_key), True
+    future = submit_once(cache_key, _fit_and_store, cache_key, feats)
+    try:
+        return future.result(timeout=wait), True
+    except FutureTimeout:
+        return None, False
@@ -0,0 +1,109 @@
+"""Matriks kohort customer per bulan kunjungan pertama.
+
+Customer dikelompokkan menurut bulan kunjungan pertamanya (``Tanggal``
+terawal; kunjungan itu harus ``Kunjungan_Ke == 1``, kalau tidak perjalanannya
+sudah dimulai sebelum rentang filter dan customer tidak dihitung). Sel
+``(kohort, N)`` = persentase customer kohort yang sudah mencapai suatu tahap
+(atau tahap sesudahnya) atau sudah closing paling lambat bulan ke-N sejak
+kontak pertama.
+
+Semua dihitung dari offset bulan per kunjungan tanpa loop per customer:
+offset tercepat per (customer, tahap) lewat ``np.minimum.at``, "tahap ini atau
+sesudahnya" lewat minimum kumulatif dari tahap akhir, lalu ``bincount`` per
+(kohort, offset) dan ``cumsum`` di sepanjang sumbu bulan. Sel yang belum bisa
+diamati (kohort + N melewati bulan data terakhir) bernilai NaN.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .features import STAGE_SCORE, TAHAPAN_FUNNEL
+
+MAX_MONTHS = 12
+CLOSED = 'Closed'
+MEASURES = TAHAPAN_FUNNEL + [CLOSED]
+_NEVER = np.iinfo(np.int64).max
+
+
+def _month_number(dates):
+    """Nomor bulan absolut (tahun × 12 + bulan) untuk array datetime64."""
+    return dates.astype('datetime64[M]').astype(np.int64)
+
+
+@dataclass
+class CohortMatrix:
+    """Jumlah kumulatif customer per kohort; ``reached[ukuran]`` berbentuk (kohort, ``months`` + 1)."""
+    cohorts: pd.PeriodIndex
+    sizes: np.ndarray
+    horizon: np.ndarray
+    reached: dict
+
+    @property
+    def months(self):
+        return next(iter(self.reached.values())).shape[1] - 1 if self.reached else MAX_MONTHS
+
+    @classmethod
+    def build(cls, df, months=MAX_MONTHS):
+        dates = df['Tanggal'].to_numpy().astype('datetime64[D]')
+        month = _month_number(dates)
+        customer, _ = pd.factorize(df['ID_Customer'])
+        n_customer = customer.max() + 1 if len(customer) else 0
+
+        # Kunjungan pertama per customer (urutan tanggal, stabil = urutan file)
+        order = np.argsort(dates, kind='stable')
+        first_rows = order[~pd.Series(customer[order]).duplicated().to_numpy()]
+        first_month = np.empty(n_customer, dtype=np.int64)
+        first_month[customer[first_rows]] = month[first_rows]
+        started = np.ones(n_customer, dtype=bool)
+        if 'Kunjungan_Ke' in df.columns:
+            first_ke = df['Kunjungan_Ke'].to_numpy(dtype=np.float64, na_value=np.nan)[first_rows]
+            started[customer[first_rows]] = np.isnan(first_ke) | (first_ke <= 1)
+
+        offset = month - first_month[customer]
+        # Offset tercepat per (customer, tahap); kolom terakhir = closing (Status_Kontrak 'Deal')
+        stage = df['Progress'].map(STAGE_SCORE).to_numpy(dtype=np.float64, na_value=np.nan)
+        earliest = np.full((n_customer, len(MEASURES)), _NEVER, dtype=np.int64)
+        in_funnel = ~np.isnan(stage)
+        np.minimum.at(earliest, (customer[in_funnel], stage[in_funnel].astype(np.int64) - 1), offset[in_funnel])
+        closed = (df['Status_Kontrak'] == 'Deal').to_numpy(dtype=bool, na_value=False)
+        np.minimum.at(earliest[:, -1], customer[closed], offset[closed])
+        # Mencapai tahap k = kunjungan di tahap k atau tahap sesudahnya
+        stages = len(TAHAPAN_FUNNEL)
+        earliest[:, :stages] = np.minimum.accumulate(earliest[:, stages - 1::-1], axis=1)[:, ::-1]
+
+        cohort_month, cohort = np.unique(first_month[started], return_inverse=True)
+        earliest = earliest[started]
+        last_month = month.max() if len(month) else 0
+        sizes = np.bincount(cohort, minlength=len(cohort_month))
+        reached = {}
+        for i, measure in enumerate(MEASURES):
+            hit = earliest[:, i] <= months
+            cells = cohort[hit] * (months + 1) + earliest[hit, i]
+            counts = np.bincount(cells, minlength=len(cohort_month) * (months + 1))
+            reached[measure] = np.cumsum(counts.reshape(len(cohort_month), months + 1), axis=1)
+        cohorts = pd.PeriodIndex(pd.to_datetime(cohort_month.astype('datetime64[M]')), freq='M', name='Kohort')
+        return cls(cohorts, sizes, last_month - cohort_month, reached)
+
+    def share(self, measure, months=None):
+        """Persentase kohort (baris) yang mencapai ``measure`` paling lambat bulan ke-N (kolom)."""
+        months = self.months if months is None else min(months, self.months)
+        counts = self.reached[measure][:, :months + 1].astype(np.float64)
+        values = np.divide(counts * 100, self.sizes[:, None], out=np.zeros_like(counts), where=self.sizes[:, None] > 0)
+        values[np.arange(months + 1)[None, :] > self.horizon[:, None]] = np.nan
+        return pd.DataFrame(values, index=self.cohorts, columns=[f"Bulan {n}" for n in range(months + 1)])
+
+    def summary(self):
+        """Ukuran kohort dan persentase terakhir yang teramati untuk tiap ukuran."""
+        last = np.minimum(self.horizon, self.months)
+        rows = np.arange(len(self.cohorts))
+        frame = pd.DataFrame({'Customer': self.sizes}, index=self.cohorts)
+        for measure, counts in self.reached.items():
+            frame[measure] = np.divide(counts[rows, last] * 100.0, self.sizes,
+                                       out=np.zeros(len(rows)), where=self.sizes > 0)
+        return frame
+
+
+def cohort_matrix(df, months=MAX_MONTHS):
+    """Matriks kohort bulan kunjungan pertama untuk frame ini."""
+    return CohortMatrix.build(df, months)
@@ -0,0 +1,86 @@
+"""Mode perbandingan periode: KPI, funnel, dan leaderboard dua rentang tanggal sekaligus.
+
+Baris kedua periode (filter sidebar yang sama, rentang tanggal berbeda)
+digabung menjadi satu frame dengan kolom ``Periode``; setiap tabel lalu dihitung
+dengan satu groupby yang menyertakan ``Periode`` sebagai kunci tambahan, bukan
+dua kali menjalankan filter dan perhitungan yang sama. Rentang yang beririsan
+boleh: baris di irisan muncul di kedua periode.
+"""
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+from .features import TAHAPAN_FUNNEL
+from .metrics import sales_leaderboard
+
+PERIODE = ['Sekarang', 'Pembanding']
+PRESETS = ['Periode sebelumnya', 'Periode sama tahun lalu', 'Pilih manual']
+KOLOM_LEADERBOARD = ['Total_Kunjungan', 'Total_Customer', 'Jumlah_Deal', 'Nilai_Aktual', 'Closing_Rate']
+
+
+def comparison_range(date_range, preset):
+    """Rentang pembanding default untuk ``preset`` (panjang sama dengan ``date_range``)."""
+    start, end = (pd.Timestamp(d) for d in date_range)
+    if preset == 'Periode sama tahun lalu':
+        return (start - pd.DateOffset(years=1), end - pd.DateOffset(years=1))
+    length = end - start + pd.Timedelta(days=1)
+    return (start - length, end - length)
+
+
+def tag_periods(df, period_rows):
+    """Satu frame berisi baris setiap periode (urutan ``PERIODE``) dengan kolom ``Periode``."""
+    positions = np.concatenate([np.asarray(rows, dtype=np.int64) for rows in period_rows])
+    labels = np.repeat(PERIODE[:len(period_rows)], [len(rows) for rows in period_rows])
+    frame = df.take(positions).reset_index(drop=True)
+    frame['Periode'] = pd.Categorical(labels, categories=PERIODE)
+    return frame
+
+
+def kpi_by_period(frame):
+    """Nilai tile KPI Dashboard Utama per periode."""
+    deal_customer = frame['ID_Customer'].where(frame['Progress'] == 'Paska Deal')
+    return frame.assign(Customer_Deal=deal_customer).groupby('Periode', observed=False).agg(
+        Customer_Aktif=('ID_Customer', 'nunique'),
+        Total_Kunjungan=('ID_Customer', 'size'),
+        Total_Nilai_Kontrak=('Nilai_Kontrak', 'sum'),
+        Customer_Deal=('Customer_Deal', 'nunique'),
+        Rata_Progress=('Progress_Score', 'mean'),
+    )
+
+
+def funnel_by_period(frame, by=None):
+    """Customer unik per tahap funnel per periode (dan per ``by`` bila diberikan)."""
+    keys = ['Periode'] + ([by] if by else [])
+    in_funnel = frame[frame['Progress'].isin(TAHAPAN_FUNNEL)]
+    counts = in_funnel.groupby(keys + ['Progress'], observed=True)['ID_Customer'].nunique().unstack(fill_value=0)
+    return counts.reindex(columns=TAHAPAN_FUNNEL, fill_value=0).astype(int)
+
+
+def side_by_side(table, columns=None):
+    """``table`` berindeks ``Periode`` (+ kunci lain) -> kolom (metrik, Sekarang/Pembanding/Δ)."""
+    columns = list(table.columns) if columns is None else list(columns)
+    if table.index.nlevels == 1:
+        now, prev = (table.reindex(PERIODE).loc[[p], columns].reset_index(drop=True) for p in PERIODE)
+    else:
+        now, prev = (table[columns].xs(p, level='Periode') if p in table.index.get_level_values('Periode')
+                     else table[columns].iloc[:0].droplevel('Periode') for p in PERIODE)
+        index = now.index.union(prev.index, sort=False)
+        now, prev = now.reindex(index, fill_value=0), prev.reindex(index, fill_value=0)
+    wide = pd.concat({PERIODE[0]: now, PERIODE[1]: prev, 'Δ': now - prev}, axis=1).swaplevel(axis=1)
+    return wide[[(c, p) for c in columns for p in PERIODE + ['Δ']]]
+
+
+def compare_periods(df, period_rows):
+    """KPI, funnel, dan leaderboard untuk semua periode, masing-masing satu groupby dengan kunci ``Periode``."""
+    frame = tag_periods(df, period_rows)
+    return {
+        'kpi': kpi_by_period(frame),
+        'funnel': funnel_by_period(frame),
+        'funnel_sales': funnel_by_period(frame, 'Nama_Sales'),
+        'leaderboard': sales_leaderboard(frame, ('Periode', 'Nama_Sales')),
+    }
+
+
+def period_comparison(df, version, keys, period_rows):
+    """``compare_periods`` yang di-cache per versi data dan kunci filter kedua periode."""
+    return memoize('compare', version, tuple(keys), compare_periods, df, period_rows)
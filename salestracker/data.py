@@ -0,0 +1,124 @@
+"""Pemuatan data kunjungan, versi data, dan kunci filter untuk cache."""
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+CSV_PATH = "sales_visits_finalbgt_enriched.csv"
+# Sumber data dashboard: file CSV, direktori/glob CSV regional (``salestracker.regional``),
+# direktori store hasil ``python -m salestracker.ingest``, atau URL tabel SQL
+# (``sqlite:///visits.db``, lihat ``salestracker.sqlsource``)
+DATA_PATH = os.environ.get("SALESTRACKER_DATA", CSV_PATH)
+PROGRESS_MAP = {'Inisiasi': 1, 'Presentasi': 2, 'Penawaran Harga': 3, 'Negosiasi': 4, 'Paska Deal': 5}
+
+
+def load_visits(path=CSV_PATH, start=None, end=None):
+    """Baca CSV kunjungan dan tambahkan kolom turunan yang dipakai semua halaman.
+
+    Bila ``path`` adalah direktori, dibaca sebagai store Parquet hasil ``ingest``;
+    direktori/glob berisi CSV regional digabung paralel (``regional``); bila URL
+    SQL, diambil dari tabel (tarikan inkremental, lihat ``sqlsource``).
+    ``start``/``end`` membatasi rentang ``Tanggal`` (didorong ke sumber bila bisa).
+    """
+    from .sqlsource import get_source, is_sql_url
+    if is_sql_url(path):
+        source = get_source(path)
+        if start is None and end is None:
+            return source.snapshot()
+        return source.query(start, end)
+    from .regional import is_csv_source, load_files
+    if is_csv_source(path):
+        df = load_files(path)
+    elif os.path.isdir(path):
+        from .store import load_range
+        df = load_range(path, start, end)
+        return df.sort_values(['Tanggal', 'ID_Kunjungan'], kind='stable').reset_index(drop=True)
+    else:
+        df = read_visits_csv(path)
+    if start is not None:
+        df = df[df['Tanggal'] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df['Tanggal'] <= pd.Timestamp(end)]
+    return df.reset_index(drop=True) if start is not None or end is not None else df
+
+
+def read_visits_csv(source):
+    """Parse satu CSV kunjungan (path atau buffer) beserta kolom turunannya."""
+    df = pd.read_csv(source)
+    df['Tanggal'] = pd.to_datetime(df['Tanggal'])
+    df['Progress_Score'] = df['Progress'].map(PROGRESS_MAP)
+    return df
+
+
+def source_token(path=DATA_PATH):
+    """Penanda murah bahwa sumber berubah: mtime file/direktori, stat CSV regional, atau COUNT/MAX tabel SQL."""
+    from .regional import is_csv_source, sources_token
+    from .sqlsource import get_source, is_sql_url
+    if is_sql_url(path):
+        return get_source(path).token()
+    if is_csv_source(path):
+        return sources_token(path)
+    from .store import MANIFEST
+    manifest = os.path.join(path, MANIFEST)
+    if os.path.isdir(path) and os.path.exists(manifest):
+        # Ingest menulis ke subdirektori partisi; manifest selalu diganti di akhir
+        return os.path.getmtime(manifest)
+    return os.path.getmtime(path)
+
+
+def _read_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def load_pickle(path):
+    """Isi file pickle ringkasan; dibaca sekali per mtime file (cache bersama)."""
+    from .cache import memoize
+    return memoize('pickle', os.path.getmtime(path), path, _read_pickle, path)
+
+
+def data_version(df):
+    """Hash isi data; berubah hanya jika ada baris/nilai yang berubah."""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()[:16]
+
+
+def date_index(df):
+    """Urutan baris menurut ``Tanggal``; dibuat sekali per versi data.
+
+    Dipakai ``rows_in_date_range`` untuk memotong rentang tanggal dengan
+    binary search alih-alih membandingkan seluruh baris setiap rerun.
+    """
+    tanggal = df['Tanggal'].to_numpy()
+    order = np.argsort(tanggal, kind='stable')
+    return order, tanggal[order]
+
+
+def rows_in_date_range(index, start, end):
+    """Posisi baris (urutan asli) dengan ``start <= Tanggal <= end``."""
+    order, sorted_dates = index
+    lo = np.searchsorted(sorted_dates, np.datetime64(pd.Timestamp(start)), side='left')
+    hi = np.searchsorted(sorted_dates, np.datetime64(pd.Timestamp(end)), side='right')
+    return np.sort(order[lo:hi])
+
+
+def default_filter(df):
+    """Pilihan awal sidebar: seluruh rentang tanggal dan semua sales/segmen/status."""
+    return (
+        (df['Tanggal'].min(), df['Tanggal'].max()),
+        df['Nama_Sales'].unique(),
+        df['Segmen'].unique(),
+        df['Status_Customer'].unique(),
+    )
+
+
+def filter_key(date_range, nama_sales, segmen, status_cust):
+    """Kunci hashable dari pilihan filter sidebar (urutan pilihan diabaikan)."""
+    return (
+        tuple(str(pd.Timestamp(d).date()) for d in date_range),
+        tuple(sorted(map(str, nama_sales))),
+        tuple(sorted(map(str, segmen))),
+        tuple(sorted(map(str, status_cust))),
+    )
@@ -0,0 +1,107 @@
+"""Eksekusi paralel untuk section halaman yang saling independen.
+
+Setiap section adalah fungsi murni dari ``filtered_df`` ke hasil perhitungan.
+Section dijalankan bersamaan di thread pool (operasi pandas/NumPy yang
+melepas GIL) atau process pool (kode Python murni yang menahan GIL), lalu
+hasilnya dikembalikan sesuai urutan pendaftaran supaya render tetap berurutan.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+_lock = threading.Lock()
+_thread_pool = None
+_process_pool = None
+_pending_lock = threading.Lock()
+_pending = {}
+
+
+@dataclass
+class Section:
+    """Satu unit perhitungan yang independen terhadap section lain."""
+    name: str
+    func: Callable[..., Any]
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    # True untuk kode yang menahan GIL; func harus bisa di-pickle (level modul)
+    use_process: bool = False
+
+
+def _default_workers():
+    return max(2, os.cpu_count() or 1)
+
+
+def get_thread_pool():
+    """Thread pool bersama untuk semua sesi (dibuat sekali per proses)."""
+    global _thread_pool
+    with _lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(
+                max_workers=_default_workers(), thread_name_prefix="section"
+            )
+        return _thread_pool
+
+
+def get_process_pool():
+    """Process pool bersama, dibuat saat pertama kali ada section ``use_process``."""
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=_default_workers())
+        return _process_pool
+
+
+def _reset_process_pool():
+    global _process_pool
+    with _lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def run_sections(sections: List[Section]) -> Dict[str, Any]:
+    """Jalankan semua section bersamaan dan kembalikan ``{name: hasil}`` berurutan.
+
+    Latensi total kira-kira sama dengan section paling lambat. Section tidak
+    boleh memanggil ``run_sections`` lagi dari dalam pool yang sama.
+    """
+    futures = []
+    for section in sections:
+        pool = get_process_pool() if section.use_process else get_thread_pool()
+        futures.append(pool.submit(section.func, *section.args, **section.kwargs))
+
+    results = {}
+    for section, future in zip(sections, futures):
+        try:
+            results[section.name] = future.result()
+        except BrokenProcessPool:
+            # Worker mati (mis. OOM) - buang pool dan hitung ulang di thread ini
+            _reset_process_pool()
+            results[section.name] = section.func(*section.args, **section.kwargs)
+    return results
+
+
+def submit_once(key, func, *args, **kwargs):
+    """Jalankan ``func`` di background thread pool, sekali per ``key`` selama masih berjalan.
+
+    Sesi yang meminta kunci yang sama saat pekerjaan belum selesai mendapat
+    ``Future`` yang sama, jadi biaya tidak bertambah dengan jumlah pengguna.
+    """
+    pool = get_thread_pool()
+    with _pending_lock:
+        future = _pending.get(key)
+        if future is not None:
+            return future
+        future = pool.submit(func, *args, **kwargs)
+        _pending[key] = future
+    future.add_done_callback(lambda done: _forget(key, done))
+    return future
+
+
+def _forget(key, future):
+    with _pending_lock:
+        if _pending.get(key) is future:
+            del _pending[key]
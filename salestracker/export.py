@@ -0,0 +1,220 @@
+"""Ekspor laporan batch tanpa Streamlit: profil setiap sales, leaderboard tim, dan laporan segmen.
+
+Tabel dihitung dengan fungsi yang sama dengan halaman dashboard (``metrics``,
+``timeline``) dan ditulis sebagai Parquet atau CSV; grafik dirender sebagai PNG
+statis dengan matplotlib. Pekerjaan per sales dan per segmen dibagi ke process
+pool; setiap worker membuka snapshot Arrow bersama (``shared``) dengan memory
+mapping sehingga data tidak disalin ke setiap proses.
+
+Pemakaian::
+
+    python -m salestracker.export --out reports --format parquet
+    python -m salestracker.export --start 2025-01-01 --end 2025-03-31 --no-charts
+
+Struktur keluaran::
+
+    <out>/tim/        leaderboard, segmen, target_segmen, durasi_proses, funnel_sales (+ grafik)
+    <out>/sales/<nama>/   ringkasan, aktivitas, progress_akhir, mingguan, vs_tim, journey (+ grafik)
+    <out>/segmen/<nama>/  leaderboard, funnel, durasi_tahap, efisiensi_bulanan (+ grafik)
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from . import metrics, shared, timeline
+from .data import DATA_PATH, data_version, load_visits
+
+OUT_DIR = "reports"
+FORMATS = ('parquet', 'csv')
+
+_frame = None
+_team = None
+
+
+@dataclass
+class ExportReport:
+    """Ringkasan satu kali ekspor."""
+    reps: int = 0
+    segments: int = 0
+    files: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def reports_per_sec(self):
+        return (self.reps + self.segments) / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self):
+        return (f"{self.reps} profil sales + {self.segments} laporan segmen dari {self.rows:,} kunjungan "
+                f"-> {self.files} file, {self.seconds:.2f} s ({self.reports_per_sec:,.1f} laporan/detik)")
+
+
+def slugify(name):
+    return re.sub(r'[^0-9A-Za-z]+', '_', str(name)).strip('_') or 'kosong'
+
+
+def write_table(frame, path, fmt):
+    """Tulis ``frame`` ke ``path`` + ekstensi format; kembalikan path file."""
+    path = f"{path}.{fmt}"
+    if fmt == 'parquet':
+        frame.to_parquet(path)
+    else:
+        frame.to_csv(path)
+    return path
+
+
+def _bar_chart(frame, path, title, ylabel, stacked=False):
+    """Grafik batang PNG dari ``frame`` (index = sumbu x, kolom = seri)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(9, 5))
+    frame.plot.bar(ax=ax, stacked=stacked, legend=frame.shape[1] > 1)
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    ax.set_xlabel('')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    path = f"{path}.png"
+    fig.savefig(path, dpi=100)
+    plt.close(fig)
+    return path
+
+
+def _init_worker(snapshot_path):
+    """Buka snapshot bersama sekali per proses worker."""
+    global _frame, _team
+    _frame = shared.open_snapshot(snapshot_path)
+    _team = metrics.team_metrics(_frame)
+
+
+def export_team(df, out_dir, fmt, charts=True):
+    """Leaderboard tim, laporan segmen, dan funnel per sales."""
+    team_dir = os.path.join(out_dir, 'tim')
+    os.makedirs(team_dir, exist_ok=True)
+    leaderboard = metrics.sales_leaderboard(df)
+    segmen = metrics.segment_report(df)
+    funnel = metrics.funnel_counts(df, 'Nama_Sales')
+    files = [
+        write_table(leaderboard, os.path.join(team_dir, 'leaderboard'), fmt),
+        write_table(segmen, os.path.join(team_dir, 'segmen'), fmt),
+        write_table(metrics.segment_targets(df).set_index('Segmen'), os.path.join(team_dir, 'target_segmen'), fmt),
+        write_table(metrics.process_duration(df).to_frame(), os.path.join(team_dir, 'durasi_proses'), fmt),
+        write_table(funnel, os.path.join(team_dir, 'funnel_sales'), fmt),
+    ]
+    if charts:
+        files += [
+            _bar_chart(leaderboard[['Jumlah_Deal']], os.path.join(team_dir, 'deal_per_sales'),
+                       'Jumlah Deal per Sales', 'Deal'),
+            _bar_chart(segmen[['Conversion_Rate']], os.path.join(team_dir, 'konversi_segmen'),
+                       'Conversion Rate per Segmen (%)', '%'),
+            _bar_chart(funnel, os.path.join(team_dir, 'funnel_sales'),
+                       'Funnel Komparatif per Sales', 'Customer', stacked=True),
+        ]
+    return files
+
+
+def export_rep(sales, out_dir, fmt, charts=True):
+    """Profil satu sales (dijalankan di worker)."""
+    rep_dir = os.path.join(out_dir, 'sales', slugify(sales))
+    os.makedirs(rep_dir, exist_ok=True)
+    profile = metrics.rep_profile(_frame, sales, _team)
+    files = [write_table(table, os.path.join(rep_dir, name), fmt) for name, table in profile.items()]
+    if charts:
+        files += [
+            _bar_chart(profile['mingguan'][['Total_Activities']], os.path.join(rep_dir, 'aktivitas_mingguan'),
+                       f'{sales} - Aktivitas Mingguan', 'Kunjungan'),
+            _bar_chart(profile['vs_tim'].set_index('Metric')[['Performance_Ratio']], os.path.join(rep_dir, 'vs_tim'),
+                       f'{sales} - Rasio terhadap Rata-rata Tim', 'Rasio'),
+        ]
+    return files
+
+
+def export_segment(segmen, out_dir, fmt, charts=True):
+    """Laporan satu segmen (dijalankan di worker)."""
+    seg_dir = os.path.join(out_dir, 'segmen', slugify(segmen))
+    os.makedirs(seg_dir, exist_ok=True)
+    seg_df = _frame[_frame['Segmen'] == segmen]
+    leaderboard = metrics.sales_leaderboard(seg_df)
+    funnel = metrics.funnel_counts(seg_df, 'Nama_Sales')
+    durasi_tahap = metrics.stage_transitions(seg_df).groupby(['From_Stage', 'To_Stage'])['Days'].agg(
+        ['count', 'mean', 'median'])
+    bulanan = timeline.monthly_efficiency(seg_df)
+    bulanan.index = bulanan.index.astype(str)
+    files = [
+        write_table(leaderboard, os.path.join(seg_dir, 'leaderboard'), fmt),
+        write_table(funnel, os.path.join(seg_dir, 'funnel'), fmt),
+        write_table(durasi_tahap, os.path.join(seg_dir, 'durasi_tahap'), fmt),
+        write_table(bulanan, os.path.join(seg_dir, 'efisiensi_bulanan'), fmt),
+    ]
+    if charts:
+        files += [
+            _bar_chart(funnel, os.path.join(seg_dir, 'funnel'), f'{segmen} - Funnel per Sales', 'Customer', stacked=True),
+            _bar_chart(bulanan[['Deals']], os.path.join(seg_dir, 'deal_bulanan'), f'{segmen} - Deal per Bulan', 'Deal'),
+        ]
+    return files
+
+
+def export_all(path=DATA_PATH, out_dir=OUT_DIR, fmt='parquet', charts=True, workers=None,
+               start=None, end=None, on_done=None):
+    """Ekspor laporan tim, semua sales, dan semua segmen; kembalikan ``ExportReport``.
+
+    ``on_done(jenis, nama, files)`` dipanggil setiap satu laporan selesai.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format harus salah satu dari {FORMATS}")
+    report = ExportReport()
+    begin = time.perf_counter()
+
+    # Rentang tanggal didorong ke sumber (partisi store / WHERE SQL); snapshot hanya berisi rentang itu
+    df = load_visits(path, start, end)
+    snapshot_path = shared.write_snapshot(df, data_version(df))
+    df = shared.open_snapshot(snapshot_path)
+    report.rows = len(df)
+    report.files += len(export_team(df, out_dir, fmt, charts))
+
+    tasks = [('sales', name, export_rep) for name in sorted(df['Nama_Sales'].dropna().unique())]
+    tasks += [('segmen', name, export_segment) for name in sorted(df['Segmen'].dropna().unique())]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(snapshot_path,)) as pool:
+        futures = {pool.submit(func, name, out_dir, fmt, charts): (kind, name) for kind, name, func in tasks}
+        for future in as_completed(futures):
+            kind, name = futures[future]
+            files = future.result()
+            report.files += len(files)
+            if kind == 'sales':
+                report.reps += 1
+            else:
+                report.segments += 1
+            if on_done is not None:
+                on_done(kind, name, files)
+
+    report.seconds = time.perf_counter() - begin
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ekspor laporan sales, leaderboard tim, dan segmen ke file.")
+    parser.add_argument("--data", default=DATA_PATH,
+                        help="CSV, direktori/glob CSV regional, direktori store, atau URL SQL (default: %(default)s)")
+    parser.add_argument("--out", default=OUT_DIR, help="direktori keluaran (default: %(default)s)")
+    parser.add_argument("--format", default='parquet', choices=FORMATS, help="format tabel (default: %(default)s)")
+    parser.add_argument("--no-charts", action="store_true", help="lewati pembuatan grafik PNG")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses worker (default: jumlah CPU)")
+    parser.add_argument("--start", default=None, help="tanggal awal (YYYY-MM-DD)")
+    parser.add_argument("--end", default=None, help="tanggal akhir (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    def progress(kind, name, files):
+        print(f"  {kind}/{slugify(name)}: {len(files)} file")
+
+    print(export_all(args.data, args.out, args.format, not args.no_charts, args.workers,
+                     args.start, args.end, on_done=progress))
+
+
+if __name__ == "__main__":
+    main()
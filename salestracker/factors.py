@@ -0,0 +1,54 @@
+"""Perhitungan section halaman Factor Analysis.
+
+Semua fungsi menerima tabel fitur per customer dari ``features`` (satu baris
+per customer), bukan log kunjungan mentah.
+"""
+import pandas as pd
+
+
+def _success_rate_by(feats, column):
+    result = feats.groupby(column)['Is_Success'].agg(['size', 'sum'])
+    result.columns = ['Total', 'Success']
+    result['Success_Rate'] = result['Success'] / result['Total'] * 100
+    return result
+
+
+def customer_profile_factors(feats):
+    """Success rate per Status_Customer dan per Segmen."""
+    return _success_rate_by(feats, 'Status_Customer'), _success_rate_by(feats, 'Segmen')
+
+
+def activity_factors(feats):
+    """Success rate berdasarkan frekuensi kunjungan dan jenis kunjungan."""
+    frequency_category = pd.cut(
+        feats['Jumlah_Kunjungan'],
+        bins=[0, 2, 4, 6, float('inf')],
+        labels=['Low (1-2)', 'Medium (3-4)', 'High (5-6)', 'Very High (7+)']
+    )
+    freq_analysis = feats.groupby(frequency_category, observed=False)['Is_Success'].agg(['size', 'sum'])
+    freq_analysis.columns = ['Total_Customers', 'Successful_Customers']
+    freq_analysis.index.name = 'Frequency_Category'
+    freq_analysis['Success_Rate'] = (freq_analysis['Successful_Customers'] / freq_analysis['Total_Customers'] * 100)
+
+    # Customer yang pernah menerima tiap jenis kunjungan (porsi > 0), lalu yang berhasil deal
+    porsi_cols = [c for c in feats.columns if c.startswith('Porsi_')]
+    received = feats[porsi_cols].fillna(0).to_numpy() > 0
+    visit_type_df = pd.DataFrame({
+        'Total': received.sum(axis=0),
+        'Success': (received & feats[['Is_Success']].to_numpy().astype(bool)).sum(axis=0),
+    }, index=[c[len('Porsi_'):] for c in porsi_cols])
+    visit_type_df['Success_Rate'] = visit_type_df['Success'] / visit_type_df['Total'] * 100
+    return freq_analysis, visit_type_df
+
+
+def team_factors(feats):
+    """Success rate per sales dan rata-ratanya per Level_Sales."""
+    by_sales = feats.groupby('Nama_Sales')
+    sales_performance = pd.DataFrame({
+        'Success_Rate': by_sales['Is_Success'].mean() * 100,
+        'Level_Sales': by_sales['Level_Sales'].first(),
+    }).reset_index()
+
+    level_performance = sales_performance.groupby('Level_Sales')['Success_Rate'].agg(['mean', 'count']).reset_index()
+    level_performance.columns = ['Level_Sales', 'Avg_Success_Rate', 'Count']
+    return sales_performance, level_performance
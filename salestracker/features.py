@@ -0,0 +1,123 @@
+"""Feature store per customer untuk model dan halaman Factor Analysis.
+
+Semua fitur dihitung dengan groupby/pivot vektor (tanpa loop per customer)
+lalu disimpan sebagai Parquet berversi
+``feature_store/customer_features_<data_version>.parquet``. Training, scoring,
+dan Factor Analysis membaca tabel yang sama.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+
+STORE_DIR = "feature_store"
+TAHAPAN_FUNNEL = ['Inisiasi', 'Presentasi', 'Penawaran Harga', 'Negosiasi', 'Paska Deal']
+STAGE_SCORE = {t: i + 1 for i, t in enumerate(TAHAPAN_FUNNEL)}
+KATEGORI_ENCODED = ['Segmen', 'Status_Customer', 'Level_Sales']
+
+# Kolom identitas / label yang tidak dipakai sebagai input model
+META_COLUMNS = [
+    'ID_Customer', 'Nama_Customer', 'Nama_Sales', 'Level_Sales', 'Segmen', 'Status_Customer',
+    'Status_Kontrak_Akhir', 'Progress_Akhir', 'Tanggal_Pertama', 'Tanggal_Terakhir',
+    'Is_Deal', 'Is_Success',
+]
+# Fitur turunan tahap terjauh/terakhir customer: membocorkan label (Paska Deal hampir selalu
+# berarti Deal), jadi hanya dipakai Factor Analysis, bukan input model
+OUTCOME_COLUMNS = ['Tahap_Maks', 'Tahap_Akhir']
+OUTCOME_PREFIXES = ('Durasi_',)
+
+
+def store_path(version, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f"customer_features_{version}.parquet")
+
+
+def build_customer_features(df):
+    """Satu baris fitur per customer dari log kunjungan."""
+    ordered = df.sort_values(['ID_Customer', 'Tanggal'], kind='stable')
+    by_cust = ordered.groupby('ID_Customer', sort=True)
+    last = by_cust.last()
+
+    stage_score = ordered['Progress'].map(STAGE_SCORE)
+    gaps = by_cust['Tanggal'].diff().dt.days
+    gap_stats = gaps.groupby(ordered['ID_Customer']).agg(['mean', 'median', 'max'])
+
+    feats = pd.DataFrame({
+        'Nama_Customer': last['Nama_Customer'],
+        'Nama_Sales': last['Nama_Sales'],
+        'Level_Sales': last['Level_Sales'],
+        'Segmen': last['Segmen'],
+        'Status_Customer': last['Status_Customer'],
+        'Status_Kontrak_Akhir': last['Status_Kontrak'],
+        'Progress_Akhir': last['Progress'],
+        'Tanggal_Pertama': by_cust['Tanggal'].min(),
+        'Tanggal_Terakhir': by_cust['Tanggal'].max(),
+        'Jumlah_Kunjungan': by_cust.size(),
+        'Jeda_Rata2': gap_stats['mean'],
+        'Jeda_Median': gap_stats['median'],
+        'Jeda_Max': gap_stats['max'],
+        'Tahap_Maks': stage_score.groupby(ordered['ID_Customer']).max(),
+        'Tahap_Akhir': last['Progress'].map(STAGE_SCORE),
+        'Nilai_Kontrak': last['Nilai_Kontrak'],
+        'Target_Sales': last['Target_Sales'],
+    })
+    feats['Rentang_Hari'] = (feats['Tanggal_Terakhir'] - feats['Tanggal_Pertama']).dt.days
+    feats['Rasio_Kontrak_vs_Target'] = feats['Nilai_Kontrak'] / feats['Target_Sales']
+
+    # Durasi per tahap: hari dari kunjungan pertama di tahap ini ke tahap berikutnya.
+    # Tahap tanpa kunjungan di rentang filter jadi kolom NaN float; dikembalikan ke tipe tanggal
+    first_in_stage = ordered.pivot_table(
+        index='ID_Customer', columns='Progress', values='Tanggal', aggfunc='min'
+    ).reindex(columns=TAHAPAN_FUNNEL).astype(ordered['Tanggal'].dtype)
+    for s1, s2 in zip(TAHAPAN_FUNNEL[:-1], TAHAPAN_FUNNEL[1:]):
+        durasi = (first_in_stage[s2] - first_in_stage[s1]).dt.days
+        feats[f'Durasi_{s1}'] = durasi.where(durasi >= 0)
+
+    # Komposisi jenis kunjungan
+    mix = pd.crosstab(ordered['ID_Customer'], ordered['Jenis_Kunjungan'], normalize='index')
+    feats = feats.join(mix.add_prefix('Porsi_'))
+
+    # Encoding kategori (one-hot) dari data terakhir per customer
+    feats = feats.join(pd.get_dummies(last[KATEGORI_ENCODED], dtype=np.int8))
+
+    feats['Is_Deal'] = (feats['Status_Kontrak_Akhir'] == 'Deal').astype(np.int8)
+    feats['Is_Success'] = (feats['Progress_Akhir'] == 'Paska Deal').astype(np.int8)
+    return feats.reset_index()
+
+
+def model_columns(features):
+    """Kolom numerik yang dipakai sebagai input model (tanpa identitas, label, dan fitur tahap akhir)."""
+    return [c for c in features.columns
+            if c not in META_COLUMNS and c not in OUTCOME_COLUMNS and not c.startswith(OUTCOME_PREFIXES)]
+
+
+def _read_or_build(df, version, store_dir):
+    path = store_path(version, store_dir)
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    feats = build_customer_features(df)
+    os.makedirs(store_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    feats.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return feats
+
+
+def feature_store(df, version, store_dir=STORE_DIR):
+    """Fitur seluruh data untuk versi ini: dibaca dari Parquet, dibangun bila belum ada."""
+    return memoize('features', version, store_dir, _read_or_build, df, version, store_dir)
+
+
+def features_for_filter(df, filtered_df, version, key):
+    """Fitur untuk customer di filter aktif.
+
+    Bila rentang tanggal mencakup seluruh data, baris diambil dari feature store
+    (filter sales/segmen/status adalah atribut customer). Bila tidak, fitur
+    dihitung dari kunjungan yang terfilter dan di-cache per kunci filter.
+    """
+    start, end = (pd.Timestamp(d) for d in key[0])
+    if start <= df['Tanggal'].min() and end >= df['Tanggal'].max().normalize():
+        store = feature_store(df, version)
+        return store[store['ID_Customer'].isin(filtered_df['ID_Customer'].unique())].reset_index(drop=True)
+    return memoize('features_filtered', version, key, build_customer_features, filtered_df)
@@ -0,0 +1,143 @@
+"""Ingest log kunjungan CSV secara streaming ke store Parquet berpartisi bulan.
+
+CSV dibaca per batch berukuran tetap (``chunksize`` baris) sehingga memori
+puncak sebanding dengan satu batch, bukan seluruh file. Setiap batch:
+tanggal diparse dengan format tetap ``%m/%d/%Y``, kolom kategori di-encode
+sebagai dictionary, lalu ditulis sebagai file baru di partisi
+``<store>/Bulan=YYYY-MM/`` dan dicatat di manifest (lihat ``store``). Skema
+Arrow ditetapkan di awal agar semua file seragam dan bisa dibaca sebagai satu
+dataset.
+
+Pemakaian::
+
+    python -m salestracker.ingest sales_visits.csv --store visit_store
+"""
+import argparse
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .data import PROGRESS_MAP
+from .store import ANGKA, KATEGORI, PARTITION, append_manifest, file_entry
+
+STORE_DIR = "visit_store"
+CHUNK_ROWS = 200_000
+DATE_FORMAT = '%m/%d/%Y'
+TEKS = ['ID_Kunjungan', 'ID_Customer', 'Nama_Customer', 'Catatan']
+
+_DICT = pa.dictionary(pa.int32(), pa.string())
+SCHEMA = pa.schema(
+    [('Tanggal', pa.timestamp('ns'))]
+    + [(c, pa.string()) for c in TEKS]
+    + [(c, _DICT) for c in KATEGORI]
+    + [(c, pa.int64()) for c in ANGKA]
+    + [('Progress_Score', pa.float64())]
+)
+CSV_DTYPES = {**{c: 'string' for c in TEKS + KATEGORI}, **{c: 'Int64' for c in ANGKA}}
+
+
+@dataclass
+class IngestReport:
+    """Ringkasan satu kali ingest."""
+    rows: int = 0
+    chunks: int = 0
+    files: int = 0
+    partitions: int = 0
+    seconds: float = 0.0
+    peak_rss_mb: float = float('nan')
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self):
+        return (f"{self.rows:,} baris dalam {self.chunks} batch -> {self.files} file "
+                f"di {self.partitions} partisi, {self.seconds:.2f} s "
+                f"({self.rows_per_sec:,.0f} baris/detik, puncak RSS {self.peak_rss_mb:,.0f} MB)")
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float('nan')
+    # ru_maxrss dalam KB di Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def prepare_chunk(chunk):
+    """Parse tanggal, hitung Progress_Score, dan encode kategori untuk satu batch."""
+    chunk['Tanggal'] = pd.to_datetime(chunk['Tanggal'], format=DATE_FORMAT)
+    chunk['Progress_Score'] = chunk['Progress'].map(PROGRESS_MAP).astype('float64')
+    for column in KATEGORI:
+        chunk[column] = chunk[column].astype('category')
+    return chunk
+
+
+def _write_partitions(chunk, store_dir, batch_id):
+    """Tulis satu batch sebagai file baru per bulan; kembalikan entri manifest-nya."""
+    # Kunci bulan sebagai angka YYYYMM (jauh lebih cepat dari strftime per baris)
+    months = chunk['Tanggal'].dt.year * 100 + chunk['Tanggal'].dt.month
+    written = []
+    for month, piece in chunk.groupby(months, sort=True):
+        month = f"{month // 100:04d}-{month % 100:02d}"
+        part_dir = os.path.join(store_dir, f"{PARTITION}={month}")
+        os.makedirs(part_dir, exist_ok=True)
+        table = pa.Table.from_pandas(piece[SCHEMA.names], schema=SCHEMA, preserve_index=False)
+        tmp_path = os.path.join(part_dir, f".part-{batch_id}.parquet.tmp")
+        pq.write_table(table, tmp_path)
+        path = os.path.join(part_dir, f"part-{batch_id}.parquet")
+        os.replace(tmp_path, path)
+        written.append(file_entry(store_dir, path, piece, month))
+    return written
+
+
+def ingest_csv(path, store_dir=STORE_DIR, chunksize=CHUNK_ROWS, overwrite=False, on_chunk=None):
+    """Stream ``path`` ke store berpartisi; kembalikan ``IngestReport``.
+
+    ``on_chunk(chunk)`` dipanggil untuk setiap batch yang sudah diproses, mis.
+    untuk menambah baris ke ``search.SearchIndex`` tanpa membaca ulang store.
+    """
+    if overwrite and os.path.isdir(store_dir):
+        shutil.rmtree(store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+
+    report = IngestReport()
+    partitions = set()
+    run_id = uuid.uuid4().hex[:8]
+    start = time.perf_counter()
+    reader = pd.read_csv(path, chunksize=chunksize, dtype=CSV_DTYPES)
+    for i, chunk in enumerate(reader):
+        chunk = prepare_chunk(chunk)
+        written = _write_partitions(chunk, store_dir, f"{run_id}-{i:05d}")
+        append_manifest(store_dir, written)
+        if on_chunk is not None:
+            on_chunk(chunk)
+        report.rows += len(chunk)
+        report.chunks += 1
+        report.files += len(written)
+        partitions.update(entry['partition'] for entry in written)
+    report.seconds = time.perf_counter() - start
+    report.partitions = len(partitions)
+    report.peak_rss_mb = _peak_rss_mb()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest CSV kunjungan ke store Parquet berpartisi bulan.")
+    parser.add_argument("csv", help="path file CSV kunjungan")
+    parser.add_argument("--store", default=STORE_DIR, help="direktori store (default: %(default)s)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="baris per batch (default: %(default)s)")
+    parser.add_argument("--overwrite", action="store_true", help="hapus store lama sebelum ingest")
+    args = parser.parse_args(argv)
+    print(ingest_csv(args.csv, args.store, args.chunksize, args.overwrite))
+
+
+if __name__ == "__main__":
+    main()
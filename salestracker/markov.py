@@ -0,0 +1,177 @@
+"""Model rantai Markov absorbing untuk funnel lima tahap.
+
+State transien adalah empat tahap sebelum deal; state absorbing adalah
+``Paska Deal`` (menang) dan ``Drop`` (customer berakhir Cancel/Batal).
+Transisi diambil dari kunjungan berurutan per customer, termasuk kunjungan
+ulang di tahap yang sama, sehingga matriks fundamental
+``N = (I - Q)^-1`` memberi jumlah kunjungan yang diharapkan di tiap tahap.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+
+TAHAP_TRANSIEN = ['Inisiasi', 'Presentasi', 'Penawaran Harga', 'Negosiasi']
+STATES = TAHAP_TRANSIEN + ['Paska Deal', 'Drop']
+N_TRANSIENT = len(TAHAP_TRANSIEN)
+N_STATES = len(STATES)
+WON, DROP = N_TRANSIENT, N_TRANSIENT + 1
+
+STATUS_MENANG = ['Deal']
+STATUS_KALAH = ['Cancel', 'Batal']
+
+# Pseudo-count ke Drop agar tahap yang hanya punya kunjungan ulang tetap absorbing
+_EPS = 1e-6
+# Bobot prior matriks global saat mengestimasi matriks per grup (shrinkage)
+_PRIOR_WEIGHT = 1.0
+
+
+@dataclass
+class ChainResult:
+    """Matriks transisi dan turunan absorbing untuk satu grup (atau keseluruhan)."""
+    counts: np.ndarray        # (S, S) jumlah transisi teramati
+    transition: np.ndarray    # (S, S) matriks peluang, baris absorbing = identitas
+    absorption: np.ndarray    # (T, 2) peluang berakhir di [Paska Deal, Drop]
+    days_to_close: np.ndarray # (T,) ekspektasi hari hingga deal, bersyarat deal
+    days_to_absorb: np.ndarray  # (T,) ekspektasi hari hingga deal atau drop
+
+    def transition_frame(self):
+        return pd.DataFrame(self.transition, index=STATES, columns=STATES)
+
+    def absorption_frame(self):
+        return pd.DataFrame({
+            'Tahap': TAHAP_TRANSIEN,
+            'Prob_Deal': self.absorption[:, 0],
+            'Prob_Drop': self.absorption[:, 1],
+            'Hari_ke_Deal': self.days_to_close,
+            'Hari_ke_Selesai': self.days_to_absorb,
+        })
+
+    def deal_probabilities(self):
+        """Peluang akhirnya deal per tahap (Paska Deal = 1), untuk forecast."""
+        return pd.Series(
+            np.append(self.absorption[:, 0], 1.0),
+            index=TAHAP_TRANSIEN + ['Paska Deal'], name='Prob_Deal'
+        )
+
+    def advance_rates(self):
+        """Peluang lanjut ke tahap berikutnya saat meninggalkan sebuah tahap."""
+        P = self.transition
+        leave = 1 - np.diag(P)[:N_TRANSIENT]
+        nxt = P[np.arange(N_TRANSIENT), np.arange(1, N_TRANSIENT + 1)]
+        return np.divide(nxt, leave, out=np.zeros(N_TRANSIENT), where=leave > 0)
+
+
+def _transition_events(df):
+    """Kode state asal/tujuan dan jeda hari untuk setiap transisi, dalam satu pass."""
+    ordered = df.sort_values(['ID_Customer', 'Tanggal'], kind='stable')
+    stage = ordered['Progress'].map({s: i for i, s in enumerate(STATES)}).fillna(-1).to_numpy(dtype=np.int64)
+    cust = pd.factorize(ordered['ID_Customer'])[0]
+    tanggal = ordered['Tanggal'].to_numpy()
+
+    same_next = np.zeros(len(ordered), dtype=bool)
+    same_next[:-1] = cust[1:] == cust[:-1]
+    is_last = ~same_next
+
+    # Transisi antar kunjungan berurutan dari tahap transien
+    src = np.flatnonzero(same_next & (stage >= 0) & (stage < N_TRANSIENT))
+    dst = src + 1
+    to_state = stage[dst]
+    gap = (tanggal[dst] - tanggal[src]) / np.timedelta64(1, 'D')
+    valid = to_state >= 0
+
+    # Kunjungan terakhir yang berstatus akhir: Deal -> Paska Deal, Cancel/Batal -> Drop
+    status = ordered['Status_Kontrak'].to_numpy()
+    last_transient = is_last & (stage >= 0) & (stage < N_TRANSIENT)
+    won_end = np.flatnonzero(last_transient & np.isin(status, STATUS_MENANG))
+    lost_end = np.flatnonzero(last_transient & np.isin(status, STATUS_KALAH))
+
+    rows = np.concatenate([src[valid], won_end, lost_end])
+    from_state = stage[rows]
+    to = np.concatenate([to_state[valid], np.full(len(won_end), WON), np.full(len(lost_end), DROP)])
+    days = np.concatenate([gap[valid], np.full(len(won_end) + len(lost_end), np.nan)])
+    return ordered, rows, from_state, to, days
+
+
+def _solve(counts, dwell):
+    """Hitung matriks transisi dan besaran absorbing untuk tumpukan grup ``(G, S, S)``."""
+    G = counts.shape[0]
+    counts = counts.astype(np.float64)
+    counts[:, :N_TRANSIENT, DROP] += _EPS
+    totals = counts.sum(axis=2, keepdims=True)
+    P = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    P[:, N_TRANSIENT:, :] = np.eye(N_STATES)[N_TRANSIENT:]
+
+    Q = P[:, :N_TRANSIENT, :N_TRANSIENT]
+    R = P[:, :N_TRANSIENT, N_TRANSIENT:]
+    I = np.broadcast_to(np.eye(N_TRANSIENT), (G, N_TRANSIENT, N_TRANSIENT))
+    N = np.linalg.solve(I - Q, I)
+    B = N @ R
+
+    # Waktu = kunjungan harapan di tiap tahap x rata-rata jeda dari tahap itu.
+    # Bersyarat deal (h-transform): E[T | deal] = sum_j N_ij b_j d_j / b_i
+    b = B[:, :, 0]
+    days_to_absorb = np.einsum('gij,gj->gi', N, dwell)
+    weighted = np.einsum('gij,gj->gi', N, b * dwell)
+    days_to_close = np.divide(weighted, b, out=np.full_like(b, np.nan), where=b > 1e-12)
+    return P, B, days_to_close, days_to_absorb
+
+
+def _dwell(from_state, days, group_codes, n_groups, fallback=None):
+    valid = ~np.isnan(days)
+    idx = group_codes[valid] * N_TRANSIENT + from_state[valid]
+    total = np.bincount(idx, weights=days[valid], minlength=n_groups * N_TRANSIENT)
+    count = np.bincount(idx, minlength=n_groups * N_TRANSIENT)
+    dwell = np.divide(total, count, out=np.full(total.shape, np.nan), where=count > 0)
+    dwell = dwell.reshape(n_groups, N_TRANSIENT)
+    if fallback is not None:
+        dwell = np.where(np.isnan(dwell), fallback, dwell)
+    return np.nan_to_num(dwell)
+
+
+def fit_chain(df, by=None):
+    """Estimasi rantai keseluruhan, dan bila ``by`` diisi juga per nilai kolom itu.
+
+    Mengembalikan ``(overall, {grup: ChainResult})``. Matriks per grup ditarik
+    ke matriks keseluruhan dengan prior ``_PRIOR_WEIGHT`` agar grup kecil stabil.
+    """
+    ordered, rows, from_state, to_state, days = _transition_events(df)
+    flat = from_state * N_STATES + to_state
+
+    counts = np.bincount(flat, minlength=N_STATES * N_STATES).reshape(1, N_STATES, N_STATES)
+    dwell = _dwell(from_state, days, np.zeros(len(days), dtype=np.int64), 1)
+    P, B, close, absorb = _solve(counts, dwell)
+    overall = ChainResult(counts[0], P[0], B[0], close[0], absorb[0])
+
+    groups = {}
+    if by is not None and len(rows):
+        codes, labels = pd.factorize(ordered[by].to_numpy()[rows])
+        n_groups = len(labels)
+        group_counts = np.bincount(
+            codes * N_STATES * N_STATES + flat, minlength=n_groups * N_STATES * N_STATES
+        ).reshape(n_groups, N_STATES, N_STATES)
+        smoothed = group_counts + _PRIOR_WEIGHT * P[0]
+        group_dwell = _dwell(from_state, days, codes, n_groups, fallback=dwell[0])
+        gP, gB, gclose, gabsorb = _solve(smoothed, group_dwell)
+        for i, label in enumerate(labels):
+            groups[label] = ChainResult(group_counts[i], gP[i], gB[i], gclose[i], gabsorb[i])
+    return overall, groups
+
+
+def group_absorption_frame(groups, by):
+    """Tabel peluang deal dan hari ke deal per grup per tahap."""
+    frames = [
+        result.absorption_frame().assign(**{by: label})
+        for label, result in groups.items()
+    ]
+    if not frames:
+        return pd.DataFrame(columns=[by, 'Tahap', 'Prob_Deal', 'Prob_Drop', 'Hari_ke_Deal', 'Hari_ke_Selesai'])
+    out = pd.concat(frames, ignore_index=True)
+    return out[[by] + [c for c in out.columns if c != by]]
+
+
+def funnel_chain(df, version, key, by=None):
+    """``fit_chain`` yang di-cache per versi data dan kunci filter."""
+    return memoize('markov', version, (key, by), fit_chain, df, by)
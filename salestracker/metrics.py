@@ -0,0 +1,298 @@
+"""Tabel metrik halaman dashboard (leaderboard, segmen, profil sales) tanpa Streamlit.
+
+Fungsi di sini murni: menerima frame kunjungan (biasanya hasil filter) dan
+mengembalikan DataFrame baru, sehingga bisa dipakai bersama oleh dashboard dan
+ekspor batch (``salestracker.export``).
+"""
+import pandas as pd
+
+from .features import TAHAPAN_FUNNEL
+from .pipeline import pipeline_by_stage
+
+
+KOLOM_KONTRAK = ['Progress', 'Status_Kontrak', 'Nilai_Kontrak', 'Target_Sales']
+
+
+def latest_per_customer(df, by=(), columns=None):
+    """Baris terakhir (menurut tanggal) per customer, dikelompokkan juga per ``by``.
+
+    ``columns`` membatasi kolom yang diambil (mis. tanpa kolom teks panjang).
+    """
+    keys = list(by) + ['ID_Customer']
+    if columns is not None:
+        df = df[keys + ['Tanggal'] + [c for c in columns if c not in keys]]
+    return df.sort_values('Tanggal', kind='stable').groupby(keys, observed=True).last().reset_index()
+
+
+def funnel_counts(df, by):
+    """Jumlah customer unik per tahap funnel untuk setiap nilai ``by``."""
+    in_funnel = df[df['Progress'].isin(TAHAPAN_FUNNEL)]
+    counts = in_funnel.groupby([by, 'Progress'], observed=True)['ID_Customer'].nunique().unstack(fill_value=0)
+    return counts.reindex(index=df[by].dropna().unique(), columns=TAHAPAN_FUNNEL, fill_value=0).astype(int)
+
+
+def _contract_totals(latest, by):
+    """Jumlah deal dan nilai kontrak (deal/prospek) dari status terbaru per customer.
+
+    ``by`` satu kolom atau daftar kolom (mis. ``['Periode', 'Nama_Sales']``).
+    """
+    group = latest[by] if isinstance(by, str) else [latest[k] for k in by]
+    return pd.DataFrame({
+        'Deals': (latest['Progress'] == 'Paska Deal').groupby(group).sum(),
+        'Nilai_Riil': latest['Nilai_Kontrak'].where(latest['Status_Kontrak'] == 'Deal', 0).groupby(group).sum(),
+        'Nilai_Prospek': latest['Nilai_Kontrak'].where(latest['Status_Kontrak'] == 'Berpotensi Deal', 0)
+                         .groupby(group).sum(),
+        'Target_Total': latest['Target_Sales'].groupby(group).sum(),
+    })
+
+
+def _ratio(numerator, denominator, scale=1.0):
+    return (numerator / denominator * scale).where(denominator > 0, 0.0)
+
+
+def _handling_days(df, keys=('Nama_Sales',)):
+    """Rentang hari per (sales, customer) yang dikunjungi lebih dari sekali (dasar AHT)."""
+    span = df.groupby(list(keys) + ['ID_Customer'], observed=True)['Tanggal'].agg(['min', 'max', 'size'])
+    return (span['max'] - span['min']).dt.days[span['size'] > 1]
+
+
+def overview(df):
+    """Tabel halaman Dashboard Utama: funnel customer, funnel per segmen, jeda, dan durasi closing."""
+    in_funnel = df[df['Progress'].isin(TAHAPAN_FUNNEL)]
+    funnel = in_funnel.groupby('Progress', observed=True)['ID_Customer'].nunique()
+    ordered = df.sort_values(['ID_Customer', 'Tanggal'], kind='stable')
+    gaps = ordered.groupby('ID_Customer', observed=True)['Tanggal'].diff().dt.days
+    by_customer = df.groupby('ID_Customer', observed=True)
+    durasi = (by_customer['Tanggal'].max() - by_customer['Tanggal'].min()).dt.days
+    return {
+        'funnel': {tahap: int(funnel.get(tahap, 0)) for tahap in TAHAPAN_FUNNEL},
+        'funnel_segmen': funnel_counts(df, 'Segmen'),
+        'jeda_sales': gaps.groupby(ordered['Nama_Sales']).mean().rename('Jeda_Hari').reset_index(),
+        'durasi_deal': durasi[by_customer['Progress'].last() == 'Paska Deal'],
+        'jeda': gaps.dropna(),
+    }
+
+
+def sales_leaderboard(df, keys=('Nama_Sales',)):
+    """Leaderboard per sales (urut jumlah deal), seperti tabel di halaman Sales Performance.
+
+    ``keys`` bisa diawali kolom lain (mis. ``('Periode', 'Nama_Sales')``) untuk
+    menghitung beberapa leaderboard sekaligus dalam satu groupby.
+    """
+    keys = list(keys)
+    by_sales = df.groupby(keys, observed=True)
+    total_kunjungan = by_sales.size()
+    total_customer = by_sales['ID_Customer'].nunique()
+    contracts = _contract_totals(latest_per_customer(df, keys, KOLOM_KONTRAK), keys)
+
+    aht = _handling_days(df, keys).groupby(level=keys).mean().reindex(total_kunjungan.index, fill_value=0.0)
+
+    leaderboard = pd.DataFrame({
+        'Total_Kunjungan': total_kunjungan,
+        'Total_Customer': total_customer,
+        'Jumlah_Deal': contracts['Deals'],
+        'Nilai_Aktual': contracts['Nilai_Riil'],
+        'Nilai_Prospek': contracts['Nilai_Prospek'],
+        'Target_Total': contracts['Target_Total'],
+        'Realisasi_Persen': _ratio(contracts['Nilai_Riil'], contracts['Target_Total'], 100),
+        'Closing_Rate': _ratio(contracts['Deals'], total_customer, 100),
+        'Avg_Handling_Time': aht,
+        'Avg_Freq_Kunjungan': _ratio(total_kunjungan, total_customer),
+    }).astype(float)
+    return leaderboard.sort_values('Jumlah_Deal', ascending=False, kind='stable')
+
+
+def segment_report(df):
+    """Metrik performa dan efisiensi per segmen (halaman Segment Analysis)."""
+    df = df[df['Segmen'].notna()]
+    by_segmen = df.groupby('Segmen', observed=True)
+    total_visits = by_segmen.size()
+    total_customer = by_segmen['ID_Customer'].nunique()
+    contracts = _contract_totals(latest_per_customer(df, ['Segmen'], KOLOM_KONTRAK), 'Segmen')
+    return pd.DataFrame({
+        'Total_Customer': total_customer,
+        'Total_Visits': total_visits,
+        'Total_Deals': contracts['Deals'],
+        'Nilai_Riil': contracts['Nilai_Riil'],
+        'Nilai_Prospek': contracts['Nilai_Prospek'],
+        'Target_Total': contracts['Target_Total'],
+        'Conversion_Rate': _ratio(contracts['Deals'], total_customer, 100),
+        'Avg_Deal_Size': _ratio(contracts['Nilai_Riil'], contracts['Deals']),
+        'Target_Achievement': _ratio(contracts['Nilai_Riil'], contracts['Target_Total'], 100),
+        'Avg_Visits_per_Customer': _ratio(total_visits, total_customer),
+        'Revenue_per_Visit': _ratio(contracts['Nilai_Riil'], total_visits),
+        'Customer_LTV': _ratio(contracts['Nilai_Riil'], total_customer),
+    }).astype(float)
+
+
+def segment_targets(df):
+    """Target vs realisasi per segmen (urutan kemunculan segmen) dari status terbaru customer."""
+    report = segment_report(df).reindex(df['Segmen'].dropna().unique())
+    return pd.DataFrame({
+        'Segmen': report.index,
+        'Target': report['Target_Total'].to_numpy(),
+        'Realisasi': report['Nilai_Riil'].to_numpy(),
+        'Achievement_Persen': report['Target_Achievement'].to_numpy(),
+        'Customer_Count': report['Total_Customer'].to_numpy(),
+        'Deal_Count': report['Total_Deals'].to_numpy(),
+    })
+
+
+def stage_transitions(df, by=()):
+    """Transisi antar tahap berurutan per customer (dan per ``by``) dengan jarak harinya.
+
+    Tahap diurutkan menurut kunjungan pertamanya; ``Days`` = selisih tanggal
+    kunjungan pertama di tahap tujuan dan tahap asal.
+    """
+    keys = list(by) + ['ID_Customer']
+    first = (df[df['Progress'].notna()].sort_values('Tanggal', kind='stable')
+             .drop_duplicates(keys + ['Progress'])[keys + ['Progress', 'Tanggal']])
+    following = first.groupby(keys, observed=True, sort=False)[['Progress', 'Tanggal']].shift(-1)
+    transitions = first.assign(To_Stage=following['Progress'], Days=(following['Tanggal'] - first['Tanggal']).dt.days)
+    transitions = transitions[transitions['To_Stage'].notna()].rename(columns={'Progress': 'From_Stage'})
+    return transitions[keys + ['From_Stage', 'To_Stage', 'Days']].astype({'Days': int}).reset_index(drop=True)
+
+
+def _journeys(df, distinct=False):
+    """``(journey, sukses)`` per customer (urutan kemunculan customer) dari urutan tahap kunjungannya.
+
+    Dengan ``distinct`` setiap tahap hanya muncul sekali, pada kunjungan pertamanya.
+    """
+    ordered = df.sort_values('Tanggal', kind='stable')
+    if distinct:
+        ordered = ordered[ordered['Progress'].notna()].drop_duplicates(['ID_Customer', 'Progress'])
+    customers = df['ID_Customer'].unique()
+    journeys = ordered.groupby('ID_Customer', observed=True)['Progress'].agg(' → '.join).reindex(customers)
+    success = (df['Progress'] == 'Paska Deal').groupby(df['ID_Customer'], observed=True).any().reindex(customers)
+    return pd.DataFrame({'Journey': journeys.fillna('').to_numpy(), 'Sukses': success.to_numpy()})
+
+
+def journey_patterns(df):
+    """Jumlah customer per urutan tahap kunjungan (``A → B → ...``), dipisah sukses (pernah 'Paska Deal') atau tidak.
+
+    Urut jumlah customer menurun; seri mengikuti urutan kemunculan customer.
+    """
+    counts = _journeys(df).groupby(['Sukses', 'Journey'], sort=False).size().rename('Customers').reset_index()
+    return counts.sort_values('Customers', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def journey_success(df):
+    """Customer dan success rate per urutan tahap berbeda (``A → B``, tiap tahap sekali)."""
+    journeys = _journeys(df, distinct=True)
+    table = journeys.groupby('Journey', sort=False).agg(
+        Total_Customers=('Sukses', 'size'), Successful_Customers=('Sukses', 'sum'),
+    ).reset_index()
+    table['Success_Rate'] = table['Successful_Customers'] / table['Total_Customers'] * 100
+    return table.sort_values('Total_Customers', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def stage_gaps(df, stages=TAHAPAN_FUNNEL):
+    """Hari antar tahap funnel berurutan per customer (kunjungan pertama tiap tahap); selisih negatif dibuang."""
+    first = df[df['Progress'].isin(stages)].groupby(['ID_Customer', 'Progress'], observed=True)['Tanggal'].min()
+    first = first.unstack().reindex(columns=stages).astype(df['Tanggal'].dtype)
+    days = pd.DataFrame({(a, b): (first[b] - first[a]).dt.days for a, b in zip(stages, stages[1:])},
+                        index=first.index)
+    days.columns.names = ['From', 'To']
+    gaps = days.stack(['From', 'To'], future_stack=True).dropna().rename('Days').reset_index()
+    return gaps[gaps['Days'] >= 0].astype({'Days': int}).reset_index(drop=True)
+
+
+def closing_durations(df):
+    """Hari dari kunjungan 'Inisiasi' pertama ke 'Paska Deal' terakhir per customer deal, dengan sales-nya.
+
+    Sales customer = sales pada kunjungan pertamanya.
+    """
+    start = df['Tanggal'].where(df['Progress'] == 'Inisiasi').groupby(df['ID_Customer'], observed=True).min()
+    end = df['Tanggal'].where(df['Progress'] == 'Paska Deal').groupby(df['ID_Customer'], observed=True).max()
+    days = (end - start).dt.days.dropna()
+    first = df.sort_values('Tanggal', kind='stable').drop_duplicates('ID_Customer').set_index('ID_Customer')
+    return pd.DataFrame({'Nama_Sales': first['Nama_Sales'].reindex(days.index), 'Days': days})
+
+
+def process_duration(df):
+    """Rata-rata ``closing_durations`` per sales."""
+    durations = closing_durations(df)
+    return durations.groupby('Nama_Sales')['Days'].mean().rename('Durasi_Proses_Sales (hari)')
+
+
+def team_metrics(df):
+    """Customer, revenue, dan success rate per sales untuk perbandingan dengan tim."""
+    by_sales = df.groupby('Nama_Sales', observed=True)
+    last_progress = df.groupby(['Nama_Sales', 'ID_Customer'], observed=True)['Progress'].last()
+    team = pd.DataFrame({
+        'Total_Customers': by_sales['ID_Customer'].nunique(),
+        'Total_Revenue': by_sales['Nilai_Kontrak'].sum(),
+        'Success_Rate': (last_progress == 'Paska Deal').groupby(level='Nama_Sales').mean() * 100,
+    })
+    team['Revenue_per_Customer'] = team['Total_Revenue'] / team['Total_Customers']
+    return team
+
+
+def rep_profile(df, sales, team=None):
+    """Tabel profil satu sales: ringkasan, distribusi, tren mingguan, dan perbandingan tim.
+
+    ``team`` (hasil ``team_metrics(df)``) bisa diberikan agar tidak dihitung ulang
+    saat membuat profil banyak sales sekaligus.
+    """
+    sales_data = df[df['Nama_Sales'] == sales]
+    total_customers = sales_data['ID_Customer'].nunique()
+    total_visits = len(sales_data)
+    last_progress = sales_data.groupby('ID_Customer', observed=True)['Progress'].last()
+    ringkasan = pd.DataFrame([{
+        'Total_Customers': total_customers,
+        'Total_Visits': total_visits,
+        'Avg_Visits_per_Customer': total_visits / total_customers if total_customers > 0 else 0,
+        'Success_Rate': (last_progress == 'Paska Deal').mean() * 100 if len(last_progress) else 0,
+    }], index=pd.Index([sales], name='Nama_Sales'))
+
+    week = sales_data['Tanggal'].dt.to_period('W').astype(str).rename('Week')
+    mingguan = sales_data.groupby(week).agg(
+        Unique_Customers=('ID_Customer', 'nunique'),
+        Total_Activities=('Jenis_Kunjungan', 'count'),
+    )
+
+    team = team_metrics(df) if team is None else team
+    individual, team_avg = team.loc[sales], team.mean()
+    labels = {
+        'Total_Customers': 'Total Customers',
+        'Success_Rate': 'Success Rate (%)',
+        'Revenue_per_Customer': 'Revenue per Customer (Rp)',
+        'Total_Revenue': 'Total Revenue (Rp)',
+    }
+    vs_tim = pd.DataFrame({
+        'Metric': list(labels.values()),
+        'Individual': [individual[c] for c in labels],
+        'Team Average': [team_avg[c] for c in labels],
+    })
+    vs_tim['Performance_Ratio'] = vs_tim['Individual'] / vs_tim['Team Average']
+
+    return {
+        'ringkasan': ringkasan,
+        'aktivitas': sales_data['Jenis_Kunjungan'].value_counts().rename_axis('Jenis_Kunjungan').rename('Jumlah').to_frame(),
+        'progress_akhir': last_progress.value_counts().rename_axis('Progress').rename('Jumlah').to_frame(),
+        'mingguan': mingguan,
+        'vs_tim': vs_tim,
+        'journey': journey_success(sales_data),
+    }
+
+
+def team_kpis(df):
+    """KPI ringkasan tim: closing rate, nilai pipeline, AHT, funnel, dan realisasi target."""
+    leaderboard = sales_leaderboard(df)
+    pipeline_df = pipeline_by_stage(df)
+    handling = _handling_days(df)
+    total_customer = leaderboard['Total_Customer'].sum()
+    target_total = leaderboard['Target_Total'].sum()
+    funnel = df[df['Progress'].isin(TAHAPAN_FUNNEL)].groupby('Progress', observed=True)['ID_Customer'].nunique()
+    return {
+        'Total_Customer': int(df['ID_Customer'].nunique()),
+        'Total_Kunjungan': int(len(df)),
+        'Jumlah_Deal': int(leaderboard['Jumlah_Deal'].sum()),
+        'Closing_Rate': float(leaderboard['Jumlah_Deal'].sum() / total_customer * 100) if total_customer else 0.0,
+        'Nilai_Aktual': float(leaderboard['Nilai_Aktual'].sum()),
+        'Nilai_Pipeline': float(pipeline_df.loc[pipeline_df['Tahap'] != 'Paska Deal', 'Nilai_Pipeline'].sum()),
+        'Avg_Handling_Time': float(handling.mean()) if len(handling) else 0.0,
+        'Target_Total': float(target_total),
+        'Realisasi_Persen': float(leaderboard['Nilai_Aktual'].sum() / target_total * 100) if target_total else 0.0,
+        'Funnel': {tahap: int(funnel.get(tahap, 0)) for tahap in TAHAPAN_FUNNEL},
+    }
@@ -0,0 +1,124 @@
+"""Indeks catatan kunjungan (``Catatan``): frekuensi catatan dan kata per dimensi.
+
+Indeks dibangun sekali per versi data. Tokenisasi dilakukan sekali untuk tiap
+catatan unik (bukan per baris), lalu hitungan disimpan sebagai tabel
+``(catatan/kata x dimensi) -> jumlah``. Top catatan, catatan efektif saat deal,
+dan word cloud cukup menjumlahkan baris tabel yang cocok dengan filter.
+"""
+import re
+from dataclasses import dataclass
+
+import pandas as pd
+
+from .cache import memoize
+
+DIMENSI = ['Nama_Sales', 'Segmen', 'Progress', 'Status_Kontrak', 'Status_Customer']
+STATUS_LOST = ['Cancel', 'Batal']
+
+# Stopword sama dengan notebook analisis alasan lost
+STOPWORDS = frozenset([
+    'yang', 'dan', 'dalam', 'untuk', 'dengan', 'pada', 'di', 'ke', 'dari', 'sebagai', 'ada', 'ini', 'itu',
+    'karena', 'sudah', 'belum', 'tidak', 'jadi', 'akan', 'oleh', 'atau', 'masih', 'saja', 'hanya', 'sangat',
+    'lebih', 'kurang', 'klien',
+])
+_WORD = re.compile(r'\b\w+\b')
+
+
+def normalize(text):
+    """Huruf kecil dan spasi dirapikan; dipakai sebagai kunci catatan."""
+    return ' '.join(str(text).lower().split())
+
+
+def words(text):
+    """Semua kata (huruf kecil) dalam teks, tanpa penyaringan."""
+    return _WORD.findall(normalize(text))
+
+
+def tokenize(text):
+    """Kata bermakna dari satu catatan (tanpa stopword, minimal 3 huruf)."""
+    return [w for w in words(text) if w not in STOPWORDS and len(w) > 2]
+
+
+@dataclass
+class NotesIndex:
+    """Tabel hitungan catatan dan kata per kombinasi dimensi."""
+    note_counts: pd.DataFrame   # kolom DIMENSI + Catatan + Jumlah
+    term_counts: pd.DataFrame   # kolom DIMENSI + Kata + Jumlah
+
+    def _select(self, table, filters):
+        mask = pd.Series(True, index=table.index)
+        for column, value in filters.items():
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) else list(value)
+            mask &= table[column].isin(values)
+        return table[mask]
+
+    def top_notes(self, n=5, **filters):
+        """Catatan paling sering untuk filter dimensi (mis. ``Nama_Sales='Budi'``)."""
+        rows = self._select(self.note_counts, filters)
+        counts = rows.groupby('Catatan', sort=False)['Jumlah'].sum()
+        return counts.sort_values(ascending=False, kind='stable').head(n)
+
+    def term_frequencies(self, **filters):
+        """Frekuensi kata ``{kata: jumlah}`` untuk word cloud."""
+        rows = self._select(self.term_counts, filters)
+        counts = rows.groupby('Kata', sort=False)['Jumlah'].sum()
+        return counts.sort_values(ascending=False, kind='stable')
+
+
+def build_index(df):
+    """Bangun ``NotesIndex`` dari log kunjungan."""
+    notes = df['Catatan'].dropna().astype(str)
+    visits = df.loc[notes.index, DIMENSI].copy()
+    codes, uniques = pd.factorize(notes.map(normalize))
+    # Teks tampilan: bentuk asli pertama dari tiap catatan ternormalisasi
+    display = notes.groupby(codes, sort=True).first().to_numpy()
+    visits['Catatan'] = pd.Categorical.from_codes(codes, categories=display)
+
+    note_counts = visits.groupby(DIMENSI + ['Catatan'], observed=True).size().rename('Jumlah').reset_index()
+
+    # Tokenisasi per catatan unik, lalu gabungkan ke tabel hitungan catatan
+    vocab = pd.Series([tokenize(u) for u in uniques], index=display, name='Kata').explode().dropna()
+    term_counts = (
+        note_counts.merge(vocab.rename_axis('Catatan').reset_index(), on='Catatan')
+        .groupby(DIMENSI + ['Kata'], observed=True)['Jumlah'].sum().reset_index()
+    )
+    note_counts['Catatan'] = note_counts['Catatan'].astype(str)
+    return NotesIndex(note_counts, term_counts)
+
+
+def notes_index(df, version):
+    """``NotesIndex`` seluruh data untuk versi ini (dibangun sekali)."""
+    return memoize('notes', version, None, build_index, df)
+
+
+def notes_for_filter(df, filtered_df, version, key):
+    """Indeks untuk filter aktif; rentang tanggal penuh memakai indeks seluruh data.
+
+    Filter sales/segmen/status customer juga berupa dimensi indeks, jadi indeks
+    terpisah hanya dibangun bila rentang tanggal dipersempit.
+    """
+    start, end = (pd.Timestamp(d) for d in key[0])
+    if start <= df['Tanggal'].min() and end >= df['Tanggal'].max().normalize():
+        return notes_index(df, version)
+    return memoize('notes_filtered', version, key, build_index, filtered_df)
+
+
+def _render_wordcloud(frequencies, colormap):
+    from wordcloud import WordCloud
+
+    wc = WordCloud(width=700, height=300, background_color='white', colormap=colormap)
+    return wc.generate_from_frequencies(frequencies).to_array()
+
+
+def wordcloud_image(index, version, key, colormap='cool', **filters):
+    """Gambar word cloud (array RGB) yang di-cache per versi data dan filter.
+
+    Mengembalikan ``None`` bila tidak ada kata untuk filter ini.
+    """
+    frequencies = index.term_frequencies(**filters)
+    if frequencies.empty:
+        return None
+    cache_key = (key, colormap, tuple(sorted((k, str(v)) for k, v in filters.items())))
+    return memoize('wordcloud', version, cache_key, _render_wordcloud, frequencies.to_dict(), colormap)
@@ -0,0 +1,99 @@
+"""Valuasi pipeline dan forecast revenue Monte Carlo."""
+import numpy as np
+import pandas as pd
+
+TAHAPAN_FUNNEL = ['Inisiasi', 'Presentasi', 'Penawaran Harga', 'Negosiasi', 'Paska Deal']
+
+# Batas elemen matriks simulasi per batch (~16 MB float32)
+_BATCH_ELEMENTS = 1 << 22
+
+
+def latest_per_sales_customer(df):
+    """Baris terakhir per pasangan (sales, customer)."""
+    return (
+        df.sort_values('Tanggal', kind='stable')
+        .drop_duplicates(['Nama_Sales', 'ID_Customer'], keep='last')
+    )
+
+
+def pipeline_by_stage(df):
+    """Nilai pipeline ('Berpotensi Deal') dan jumlah customer per sales per tahap."""
+    latest = latest_per_sales_customer(df)
+    is_open = latest['Status_Kontrak'] == 'Berpotensi Deal'
+    grouped = latest.assign(
+        Nilai_Pipeline=latest['Nilai_Kontrak'].where(is_open, 0)
+    ).groupby(['Nama_Sales', 'Progress'])
+
+    sales_order = df['Nama_Sales'].unique()
+    full_index = pd.MultiIndex.from_product([sales_order, TAHAPAN_FUNNEL], names=['Sales', 'Tahap'])
+    pipeline_df = pd.DataFrame({
+        'Nilai_Pipeline': grouped['Nilai_Pipeline'].sum(),
+        'Customer_Count': grouped.size(),
+    })
+    pipeline_df.index.names = ['Sales', 'Tahap']
+    return pipeline_df.reindex(full_index, fill_value=0).reset_index()
+
+
+def open_deals(df):
+    """Deal terbuka: status 'Berpotensi Deal' dan belum mencapai 'Paska Deal'."""
+    latest = latest_per_sales_customer(df)
+    mask = (latest['Status_Kontrak'] == 'Berpotensi Deal') & (latest['Progress'] != 'Paska Deal')
+    return latest[mask]
+
+
+def monte_carlo_forecast(deals, stage_probs, group_cols=('Nama_Sales', 'Segmen'),
+                         n_sims=20000, percentiles=(10, 50, 90), seed=42):
+    """Simulasi revenue dari deal terbuka; P10/P50/P90 per grup.
+
+    Setiap deal menang dengan peluang ``stage_probs`` sesuai tahapnya (peluang
+    absorbing ke Paska Deal dari ``markov.funnel_chain``). Simulasi dihitung dalam
+    batch matriks (simulasi x deal) sehingga memori tetap terbatas, dan semua
+    dimensi grup diagregasi dari batch yang sama.
+    """
+    columns = ['Dimensi', 'Grup', 'Open_Deals', 'Pipeline', 'Expected'] + [f'P{p}' for p in percentiles]
+    n_deals = len(deals)
+    if n_deals == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Deal diurutkan per sel (kombinasi semua dimensi grup) sehingga tiap batch
+    # cukup dijumlah per sel dengan reduceat, lalu sel dipetakan ke grup tiap dimensi
+    group_cols = list(group_cols)
+    cell_codes, cells = pd.factorize(pd.MultiIndex.from_frame(deals[group_cols]), sort=True)
+    order = np.argsort(cell_codes, kind='stable')
+    values = deals['Nilai_Kontrak'].to_numpy(dtype=np.float64)[order]
+    # float32 cukup untuk nilai per deal dan memotong waktu simulasi hampir separuh
+    values32 = values.astype(np.float32)
+    probs = deals['Progress'].map(stage_probs).fillna(0).to_numpy(dtype=np.float32)[order]
+    cell_codes = cell_codes[order]
+    cell_starts = np.searchsorted(cell_codes, np.arange(len(cells)))
+
+    labels = []
+    membership = []
+    for level, col in enumerate(group_cols):
+        codes, uniques = pd.factorize(cells.get_level_values(level), sort=True)
+        labels += [(col, u) for u in uniques]
+        membership.append(np.eye(len(uniques))[codes])
+    labels.append(('Total', 'Total'))
+    membership.append(np.ones((len(cells), 1)))
+    cell_to_group = np.hstack(membership)
+
+    sims = np.empty((n_sims, len(labels)), dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    batch = max(1, min(n_sims, _BATCH_ELEMENTS // n_deals))
+    for start in range(0, n_sims, batch):
+        stop = min(start + batch, n_sims)
+        revenue = (rng.random((stop - start, n_deals), dtype=np.float32) < probs) * values32
+        sims[start:stop] = np.add.reduceat(revenue, cell_starts, axis=1).astype(np.float64) @ cell_to_group
+
+    per_cell = np.column_stack([
+        np.bincount(cell_codes, minlength=len(cells)),
+        np.bincount(cell_codes, weights=values, minlength=len(cells)),
+        np.bincount(cell_codes, weights=values * probs, minlength=len(cells)),
+    ])
+    result = pd.DataFrame(labels, columns=['Dimensi', 'Grup'])
+    result[['Open_Deals', 'Pipeline', 'Expected']] = cell_to_group.T @ per_cell
+    result['Open_Deals'] = result['Open_Deals'].round().astype(int)
+    pct = np.percentile(sims, percentiles, axis=0)
+    for p, row in zip(percentiles, pct):
+        result[f'P{p}'] = row
+    return result
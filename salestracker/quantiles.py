@@ -0,0 +1,169 @@
+"""Sketch kuantil yang bisa digabung untuk durasi (hari) per sel dimensi x bulan.
+
+Setiap sel ``(Nama_Sales, Segmen, Status_Customer, Progress, Bulan)`` menyimpan
+histogram ber-bucket logaritmik ala DDSketch: nilai ``v > 0`` masuk bucket
+``ceil(log_gamma(v))`` dengan ``gamma = (1 + ALPHA) / (1 - ALPHA)``, sehingga
+kuantil dari bucket mana pun punya galat relatif paling besar ``ALPHA``.
+Penggabungan sel cukup penjumlahan hitungan bucket, jadi median/persentil untuk
+irisan apa pun tidak perlu mengurutkan data lagi. Irisan kecil (paling banyak
+``EXACT_LIMIT`` nilai) dijawab persis dari nilai mentah yang disimpan terurut
+per sel. Jumlah nilai per sel juga disimpan, jadi rata-rata selalu persis.
+
+Metrik:
+
+- ``jeda``: hari sejak kunjungan sebelumnya ke customer yang sama (dicatat
+  pada kunjungan kedua, atribut kunjungan tersebut).
+- ``siklus``: hari dari kontak pertama sampai aktivitas terakhir per customer;
+  ``Progress`` = status akhir, ``Bulan`` = bulan aktivitas terakhir.
+- ``transisi``: hari antara pertama kali mencapai satu tahap funnel dan tahap
+  berikutnya; ``Progress`` = tahap tujuan, ``Bulan`` = bulan tahap tujuan dicapai.
+
+Durasi dihitung pada data penuh lalu dipilih per sel, sehingga bisa sedikit
+berbeda dari perhitungan di frame terfilter (mis. jeda yang melewati batas
+rentang tanggal tetap dihitung).
+"""
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+from .features import TAHAPAN_FUNNEL
+from .sketches import DIMENSI, Estimate, cell_codes, select_cells
+
+ALPHA = 0.01
+GAMMA = (1 + ALPHA) / (1 - ALPHA)
+_LOG_GAMMA = np.log(GAMMA)
+MAX_DAYS = 100_000
+N_BUCKETS = 2 + int(np.ceil(np.log(MAX_DAYS) / _LOG_GAMMA))
+EXACT_LIMIT = 2000
+METRIK = ('jeda', 'siklus', 'transisi')
+
+
+def _bucket(values):
+    """Bucket 0 untuk nol, 1 + ceil(log_gamma(v)) untuk v > 0.
+
+    Nilai pecahan di bawah satu hari masuk bucket 1 (wakil ≈ 1 hari); tanpa
+    batas ini log-nya negatif dan indeks bucket jadi negatif.
+    """
+    values = np.minimum(np.maximum(values, 0), MAX_DAYS)
+    out = np.zeros(len(values), dtype=np.int64)
+    positive = values > 0
+    out[positive] = np.maximum(1 + np.ceil(np.log(values[positive]) / _LOG_GAMMA - 1e-9).astype(np.int64), 1)
+    return out
+
+
+def _bucket_value(bucket):
+    """Nilai wakil bucket (titik tengah relatif rentang ``(gamma^(i-1), gamma^i]``)."""
+    bucket = np.asarray(bucket)
+    return np.where(bucket == 0, 0.0, 2 * GAMMA ** (bucket - 1) / (GAMMA + 1))
+
+
+class DurationSketch:
+    """Histogram log per sel untuk satu metrik durasi, plus nilai mentah untuk jalur persis."""
+
+    def __init__(self, cells, counts, sums, values, offsets):
+        self.cells = cells        # DataFrame DIMENSI + 'Bulan'
+        self.counts = counts      # (n_cells, bucket terpakai) float64, hitungan bulat
+        self.sums = sums          # (n_cells,) float64
+        self.values = values      # nilai mentah, terurut per sel
+        self.offsets = offsets    # (n_cells + 1,) awal tiap sel di ``values``
+
+    @classmethod
+    def build(cls, keys, values):
+        """``keys``: frame DIMENSI + 'Bulan' sebaris dengan ``values`` (hari)."""
+        values = np.maximum(np.asarray(values, dtype=np.float64), 0)
+        cell, cells = cell_codes(keys)
+        order = np.argsort(cell, kind='stable')
+        cell, values = cell[order], values[order]
+        buckets = _bucket(values)
+        # Kolom dipotong sampai bucket terbesar yang terisi; float64 agar penggabungan
+        # sel bisa lewat perkalian matriks (BLAS), tetap persis untuk hitungan < 2**53
+        counts = np.zeros((len(cells), buckets.max() + 1 if len(buckets) else 1))
+        np.add.at(counts, (cell, buckets), 1)
+        sizes = np.bincount(cell, minlength=len(cells))
+        sums = np.bincount(cell, weights=values, minlength=len(cells))
+        return cls(cells, counts, sums, values, np.r_[0, np.cumsum(sizes)])
+
+    def select(self, start=None, end=None, **filters):
+        return select_cells(self.cells, start, end, **filters)
+
+    def count(self, mask):
+        return int(self.offsets[1:][mask].sum() - self.offsets[:-1][mask].sum())
+
+    def _merged(self, mask):
+        return np.asarray(mask, dtype=np.float64) @ self.counts
+
+    def mean(self, mask):
+        n = self.count(mask)
+        return float(self.sums[mask].sum() / n) if n else float('nan')
+
+    def _raw(self, mask):
+        idx = np.flatnonzero(mask)
+        return np.concatenate([self.values[self.offsets[i]:self.offsets[i + 1]] for i in idx]) if len(idx) else self.values[:0]
+
+    def quantiles(self, mask, qs):
+        """Kuantil ``qs`` untuk sel ``mask`` sebagai list ``Estimate`` (galat 0 bila persis)."""
+        n = self.count(mask)
+        if n == 0:
+            return [Estimate(float('nan'), 0.0) for _ in qs]
+        if n <= EXACT_LIMIT:
+            return [Estimate(float(v), 0.0) for v in np.quantile(self._raw(mask), qs)]
+        cumulative = np.cumsum(self._merged(mask))
+        buckets = np.searchsorted(cumulative, np.asarray(qs) * (n - 1), side='right')
+        return [Estimate(float(v), float(ALPHA * v)) for v in _bucket_value(buckets)]
+
+    def quantile(self, mask, q=0.5):
+        return self.quantiles(mask, [q])[0]
+
+    def histogram(self, mask):
+        """Frame ``Hari``/``Jumlah`` per bucket terisi (untuk histogram tanpa data mentah)."""
+        counts = self._merged(mask)
+        buckets = np.flatnonzero(counts)
+        return pd.DataFrame({'Hari': _bucket_value(buckets), 'Jumlah': counts[buckets].astype(np.int64)})
+
+
+def _month(dates):
+    return pd.DatetimeIndex(dates).to_period('M').start_time
+
+
+def build_sketches(df):
+    """Sketch ``jeda``, ``siklus``, dan ``transisi`` dari seluruh log kunjungan."""
+    ordered = df[DIMENSI + ['ID_Customer', 'Tanggal']].sort_values(['ID_Customer', 'Tanggal'], kind='stable')
+    customer = pd.factorize(ordered['ID_Customer'])[0]
+    tanggal = ordered['Tanggal'].to_numpy()
+    keys = ordered[DIMENSI].assign(Bulan=_month(tanggal))
+
+    # Jeda: selisih dengan kunjungan sebelumnya bila customer sama
+    same = np.r_[False, customer[1:] == customer[:-1]]
+    gaps = (tanggal[1:] - tanggal[:-1]) / np.timedelta64(1, 'D')
+    jeda = DurationSketch.build(keys[same].reset_index(drop=True), gaps[same[1:]])
+
+    # Siklus: kontak pertama -> aktivitas terakhir, atribut kunjungan terakhir
+    first = np.flatnonzero(~same)
+    last = np.r_[first[1:] - 1, len(customer) - 1] if len(first) else first
+    siklus = DurationSketch.build(
+        keys.iloc[last].reset_index(drop=True),
+        (tanggal[last] - tanggal[first]) / np.timedelta64(1, 'D'),
+    )
+
+    # Transisi: tanggal pertama tiap tahap funnel per customer, lalu selisih tahap berurutan
+    reached = (ordered.assign(Customer=customer)[ordered['Progress'].isin(TAHAPAN_FUNNEL)]
+               .groupby(['Customer', 'Progress'], observed=True)['Tanggal'].min()
+               .unstack().reindex(columns=TAHAPAN_FUNNEL))
+    last_keys = keys.iloc[last].reset_index(drop=True)
+    pieces, days = [], []
+    for prev, nxt in zip(TAHAPAN_FUNNEL, TAHAPAN_FUNNEL[1:]):
+        pair = reached[[prev, nxt]].dropna()
+        piece = last_keys.iloc[pair.index.to_numpy()].reset_index(drop=True)
+        piece['Progress'] = nxt
+        piece['Bulan'] = _month(pair[nxt])
+        pieces.append(piece)
+        days.append(((pair[nxt] - pair[prev]).dt.days).to_numpy())
+    transisi = DurationSketch.build(
+        pd.concat(pieces, ignore_index=True), np.concatenate(days) if days else np.empty(0)
+    )
+    return {'jeda': jeda, 'siklus': siklus, 'transisi': transisi}
+
+
+def duration_sketches(df, version):
+    """Sketch durasi seluruh data untuk versi ini (dibangun sekali)."""
+    return memoize('quantile_sketches', version, None, build_sketches, df)
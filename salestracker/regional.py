@@ -0,0 +1,181 @@
+"""Pemuatan paralel banyak CSV ekspor regional menjadi satu dataset kunjungan.
+
+Setiap region mengekspor CSV dengan kolom yang sama. ``DATA_PATH`` boleh
+berupa direktori berisi ``*.csv`` atau pola glob (``exports/*.csv``):
+
+- File diparse bersamaan di process pool (satu tugas per file, jumlah worker =
+  jumlah CPU) langsung dengan pembaca CSV Arrow ke skema ``ingest.SCHEMA``, lalu
+  dikirim balik sebagai tabel Arrow (tanpa DataFrame perantara).
+- Dictionary kategori (Nama_Sales, Segmen, ...) yang berbeda per file disatukan
+  dengan ``unify_dictionaries`` sebelum tabel digabung.
+- Baris dengan ``ID_Kunjungan`` sama hanya disimpan sekali; file yang urutan
+  namanya lebih akhir menang (ekspor ulang menggantikan yang lama).
+- File yang rusak (gagal diparse / kolom tidak cocok) dilewati dan dicatat di
+  ``LoadReport.failed``; file lain tetap dimuat.
+
+Pemakaian::
+
+    python -m salestracker.regional "exports/*.csv" --snapshot
+"""
+import argparse
+import glob
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
+
+from .data import PROGRESS_MAP
+from .ingest import DATE_FORMAT, SCHEMA
+from .store import MANIFEST, decode_frame
+
+PATTERN_CHARS = '*?['
+
+
+@dataclass
+class LoadReport:
+    """Ringkasan satu kali pemuatan banyak file."""
+    files: int = 0
+    rows: int = 0
+    duplicates: int = 0
+    seconds: float = 0.0
+    failed: dict = field(default_factory=dict)   # path -> pesan galat
+
+    def __str__(self):
+        text = (f"{self.files} file, {self.rows:,} kunjungan unik ({self.duplicates:,} duplikat dibuang), "
+                f"{self.seconds:.2f} s")
+        if self.failed:
+            text += f"; {len(self.failed)} file gagal: {', '.join(map(os.path.basename, self.failed))}"
+        return text
+
+
+def is_csv_source(path):
+    """True bila ``path`` pola glob atau direktori CSV (bukan store Parquet)."""
+    if not isinstance(path, str):
+        return False
+    if any(c in path for c in PATTERN_CHARS):
+        return True
+    return (os.path.isdir(path) and not os.path.exists(os.path.join(path, MANIFEST))
+            and bool(glob.glob(os.path.join(path, '*.csv'))))
+
+
+def expand_sources(path):
+    """Daftar file CSV (terurut nama) dari direktori atau pola glob."""
+    pattern = os.path.join(path, '*.csv') if os.path.isdir(path) else path
+    return sorted(p for p in glob.glob(pattern) if os.path.isfile(p))
+
+
+def sources_token(path):
+    """Penanda perubahan kumpulan file: (nama, ukuran, mtime) setiap CSV."""
+    return tuple((p, os.path.getsize(p), os.path.getmtime(p)) for p in expand_sources(path))
+
+
+def read_file(path):
+    """Parse satu CSV regional menjadi tabel Arrow ``SCHEMA`` (dijalankan di worker).
+
+    Dibaca langsung dengan pembaca CSV Arrow (tipe kolom dan format tanggal
+    dari ``ingest``) tanpa melewati pandas; kolom yang hilang memicu galat.
+    """
+    columns = [name for name in SCHEMA.names if name != 'Progress_Score']
+    table = pacsv.read_csv(path, convert_options=pacsv.ConvertOptions(
+        column_types={name: SCHEMA.field(name).type for name in columns},
+        timestamp_parsers=[DATE_FORMAT],
+        include_columns=columns,
+        strings_can_be_null=True,
+    ))
+    progress = table['Progress'].combine_chunks()
+    scores = pa.array([PROGRESS_MAP.get(v) for v in progress.dictionary.to_pylist()], pa.float64())
+    return table.append_column('Progress_Score', scores.take(progress.indices)).cast(SCHEMA)
+
+
+def load_files(path, workers=None, report=None, decode=True, cache=None):
+    """Gabungkan semua CSV di ``path`` menjadi satu DataFrame urut (Tanggal, ID_Kunjungan).
+
+    ``report`` (``LoadReport``) diisi bila diberikan. ``decode=False``
+    mempertahankan kolom kategori sebagai ``category`` dengan dictionary bersama.
+    ``cache`` (dict, dipakai ulang antar panggilan) menyimpan tabel per file
+    beserta ukuran/mtime-nya, sehingga hanya file baru atau berubah yang diparse.
+    """
+    report = LoadReport() if report is None else report
+    begin = time.perf_counter()
+    files = expand_sources(path)
+    if not files:
+        raise FileNotFoundError(f"tidak ada file CSV di {path}")
+
+    tables, stats = {}, {}
+    if cache is not None:
+        for file in files:
+            stats[file] = (os.path.getsize(file), os.path.getmtime(file))
+            if file in cache and cache[file][0] == stats[file]:
+                tables[file] = cache[file][1]
+    pending = [file for file in files if file not in tables]
+    if len(pending) <= 1 or workers == 1:
+        for file in pending:
+            try:
+                tables[file] = read_file(file)
+            except Exception as exc:
+                report.failed[file] = f"{type(exc).__name__}: {exc}"
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(pending))) as pool:
+            futures = {pool.submit(read_file, file): file for file in pending}
+            for future in as_completed(futures):
+                file = futures[future]
+                try:
+                    tables[file] = future.result()
+                except Exception as exc:
+                    report.failed[file] = f"{type(exc).__name__}: {exc}"
+    if cache is not None:
+        cache.clear()
+        cache.update({file: (stats[file], table) for file, table in tables.items()})
+    if not tables:
+        raise ValueError(f"semua file CSV di {path} gagal dimuat: {report.failed}")
+
+    # Urutan nama file menentukan prioritas saat ID_Kunjungan bentrok
+    table = pa.concat_tables([tables[f] for f in files if f in tables]).unify_dictionaries().combine_chunks()
+    total = table.num_rows
+    if pc.count_distinct(table['ID_Kunjungan']).as_py() < total:
+        keep = ~pd.Series(table['ID_Kunjungan'].to_numpy(zero_copy_only=False)).duplicated(keep='last').to_numpy()
+        table = table.filter(pa.array(keep))
+    table = table.take(pc.sort_indices(table, [('Tanggal', 'ascending'), ('ID_Kunjungan', 'ascending')]))
+    if decode:
+        # Kategori -> teks, sama dengan ``store.decode_frame`` tetapi dikerjakan di Arrow
+        table = table.cast(pa.schema([
+            pa.field(f.name, pa.string()) if pa.types.is_dictionary(f.type) else f for f in table.schema
+        ]))
+
+    report.files = len(tables)
+    report.rows = table.num_rows
+    report.duplicates = total - table.num_rows
+    frame = decode_frame(table.to_pandas()) if decode else table.to_pandas()
+    report.seconds = time.perf_counter() - begin
+    if report.failed:
+        warnings.warn(f"{len(report.failed)} file CSV dilewati: {report.failed}", stacklevel=2)
+    return frame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Muat dan gabungkan CSV kunjungan regional secara paralel.")
+    parser.add_argument("path", help="direktori berisi *.csv atau pola glob")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses worker (default: jumlah CPU)")
+    parser.add_argument("--snapshot", action="store_true", help="tulis snapshot Arrow bersama (shared_data/)")
+    args = parser.parse_args(argv)
+    report = LoadReport()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        frame = load_files(args.path, args.workers, report)
+    print(report)
+    for file, error in report.failed.items():
+        print(f"  gagal {file}: {error}")
+    if args.snapshot:
+        from . import shared
+        from .data import data_version
+        print(shared.write_snapshot(frame, data_version(frame)))
+
+
+if __name__ == "__main__":
+    main()
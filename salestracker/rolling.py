@@ -0,0 +1,108 @@
+"""KPI jendela bergulir (7/30/90 hari atau ukuran bebas) per sales atau segmen.
+
+Kunjungan diringkas sekali menjadi kubus harian ``(grup, hari)`` untuk tiap
+ukuran yang bisa dijumlah, lalu disimpan sebagai prefix sum di sepanjang sumbu
+hari (dengan kolom nol di depan). Jumlah jendela ``w`` hari yang berakhir di
+hari ``d`` untuk grup mana pun cukup ``P[g, d + 1] - P[g, d + 1 - w]``: O(1)
+setelah satu kali precompute O(hari × grup), berapa pun ukuran jendelanya.
+
+Ukuran:
+
+- ``Kunjungan``     jumlah kunjungan
+- ``Customer_Baru`` customer yang kunjungan pertamanya (di frame) jatuh di hari itu
+- ``Deal``          customer yang pertama kali mencapai 'Paska Deal' di hari itu
+- ``Revenue``       ``Nilai_Kontrak`` deal tersebut
+- ``Konversi``      ``Deal / Kunjungan`` dalam jendela yang sama (%), rasio dari dua jumlah di atas
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+WINDOWS = (7, 30, 90)
+MEASURES = ['Kunjungan', 'Customer_Baru', 'Deal', 'Revenue']
+KPI = MEASURES + ['Konversi']
+
+
+@dataclass
+class RollingCube:
+    """Prefix sum harian per grup; ``prefix[ukuran]`` berbentuk (grup, hari + 1)."""
+    by: str
+    groups: pd.Index
+    days: pd.DatetimeIndex
+    prefix: dict
+
+    @classmethod
+    def build(cls, df, by):
+        dates = df['Tanggal'].to_numpy().astype('datetime64[D]')
+        days = pd.date_range(dates.min(), dates.max(), freq='D') if len(dates) else pd.DatetimeIndex([])
+        codes, groups = pd.factorize(df[by], sort=True)
+        day = (dates - dates.min()).astype(np.int64) if len(dates) else np.zeros(0, dtype=np.int64)
+
+        # Kejadian "pertama kali" per customer ditentukan dari urutan tanggal (stabil = urutan file)
+        order = np.argsort(dates, kind='stable')
+        customer = pd.factorize(df['ID_Customer'])[0][order]
+        is_new = np.zeros(len(df), dtype=bool)
+        is_new[order] = ~pd.Series(customer).duplicated().to_numpy()
+        in_deal = (df['Progress'] == 'Paska Deal').to_numpy(dtype=bool, na_value=False)[order]
+        is_deal = np.zeros(len(df), dtype=bool)
+        is_deal[order[in_deal]] = ~pd.Series(customer[in_deal]).duplicated().to_numpy()
+
+        weights = {
+            'Kunjungan': None,
+            'Customer_Baru': is_new.astype(np.float64),
+            'Deal': is_deal.astype(np.float64),
+            'Revenue': np.where(is_deal, df['Nilai_Kontrak'].fillna(0).to_numpy(dtype=np.float64), 0.0),
+        }
+        valid = codes >= 0
+        flat = codes[valid].astype(np.int64) * len(days) + day[valid]
+        size = len(groups) * len(days)
+        prefix = {}
+        for name, weight in weights.items():
+            cube = np.bincount(flat, None if weight is None else weight[valid], minlength=size)
+            cube = cube.reshape(len(groups), len(days))
+            prefix[name] = np.concatenate([np.zeros((len(groups), 1)), np.cumsum(cube, axis=1)], axis=1)
+        return cls(by, pd.Index(groups, name=by), days, prefix)
+
+    def _end(self, end):
+        if end is None:
+            return len(self.days)
+        return int(np.clip(self.days.searchsorted(pd.Timestamp(end).normalize(), side='right'), 0, len(self.days)))
+
+    def window(self, size, end=None, total=True):
+        """KPI jendela ``size`` hari yang berakhir di ``end`` (default hari terakhir), satu baris per grup.
+
+        ``total`` menambahkan baris 'Total' (jumlah semua grup, karena ukurannya aditif).
+        """
+        stop = self._end(end)
+        start = max(0, stop - size)
+        frame = pd.DataFrame({name: p[:, stop] - p[:, start] for name, p in self.prefix.items()}, index=self.groups)
+        if total:
+            frame.loc['Total'] = frame.sum()
+        return _with_conversion(frame)
+
+    def series(self, size, measure):
+        """Nilai ``measure`` bergulir untuk setiap hari (baris) dan grup (kolom)."""
+        stop = np.arange(1, len(self.days) + 1)
+        start = np.maximum(stop - size, 0)
+        if measure == 'Konversi':
+            deal, visits = (self.prefix[m][:, stop] - self.prefix[m][:, start] for m in ('Deal', 'Kunjungan'))
+            values = np.divide(deal * 100, visits, out=np.zeros_like(deal), where=visits > 0)
+        else:
+            values = self.prefix[measure][:, stop] - self.prefix[measure][:, start]
+        return pd.DataFrame(values.T, index=self.days.rename('Tanggal'), columns=self.groups)
+
+
+def _with_conversion(frame):
+    frame['Konversi'] = (frame['Deal'] / frame['Kunjungan'] * 100).where(frame['Kunjungan'] > 0, 0.0)
+    return frame[KPI]
+
+
+def rolling_cube(df, by):
+    """Kubus prefix sum harian frame ini per ``by`` (Nama_Sales atau Segmen)."""
+    return RollingCube.build(df, by)
+
+
+def standard_windows(cube, end=None, windows=WINDOWS):
+    """KPI tim untuk jendela standar 7/30/90 hari (satu baris per jendela)."""
+    return pd.DataFrame({f"{w} hari": cube.window(w, end).loc['Total'] for w in windows}).T
@@ -0,0 +1,171 @@
+"""Mode sampel: dashboard dihitung dari sampel customer berstrata, lalu diperhalus.
+
+Customer dibagi ke strata ``(Nama_Sales, Segmen)`` dari kunjungan pertamanya;
+dari setiap stratum diambil ``fraction`` customer (minimal ``MIN_PER_STRATUM``)
+secara deterministik lewat hash ``ID_Customer``. Seluruh kunjungan customer
+terpilih ikut masuk, jadi perjalanan funnel tetap utuh.
+
+KPI diestimasi dengan estimator total berstrata (bobot ``N_h / n_h``) dan
+estimator rasio untuk konversi; galat 95% memakai varians berstrata dengan
+koreksi populasi hingga. Hasil persis untuk kunci filter yang sama dihitung di
+background; setelah selesai halaman bisa beralih ke data lengkap.
+"""
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .cache import shared_cache
+from .executor import submit_once
+from .features import TAHAPAN_FUNNEL
+from .sketches import Z_95, Estimate
+
+SAMPLE_FRACTION = 0.1
+FRACTIONS = (0.02, 0.05, 0.1, 0.2, 0.5)
+MIN_PER_STRATUM = 5
+STRATA = ['Nama_Sales', 'Segmen']
+
+
+@dataclass
+class CustomerSample:
+    """Sampel customer: posisi baris kunjungannya dan ukuran tiap stratum."""
+    rows: np.ndarray           # posisi baris di frame asal, terurut naik
+    customers: pd.DataFrame    # ID_Customer, Stratum (customer terpilih)
+    strata: pd.DataFrame       # index Stratum, kolom N (populasi) dan n (sampel)
+    fraction: float
+
+
+def draw_sample(df, fraction=SAMPLE_FRACTION, seed=0):
+    """Ambil sampel customer berstrata dari ``df`` (deterministik untuk ``seed`` yang sama)."""
+    codes, ids = pd.factorize(df['ID_Customer'])
+    first = pd.Series(np.arange(len(codes))).groupby(codes).first().to_numpy()
+    stratum = df[STRATA].iloc[first].groupby(STRATA, observed=True).ngroup().to_numpy()
+
+    # Urutan acak per customer dari hash ID, stabil antar proses
+    u = pd.util.hash_array(np.asarray(ids, dtype=object), hash_key=f"{seed:016d}"[-16:])
+    population = np.bincount(stratum)
+    size = np.minimum(population, np.maximum(MIN_PER_STRATUM, np.ceil(fraction * population))).astype(np.int64)
+    rank = pd.Series(u).groupby(stratum).rank(method='first').to_numpy() - 1
+    chosen = rank < size[stratum]
+
+    customers = pd.DataFrame({'ID_Customer': np.asarray(ids)[chosen], 'Stratum': stratum[chosen]})
+    strata = pd.DataFrame({'N': population, 'n': size}).rename_axis('Stratum')
+    return CustomerSample(np.flatnonzero(chosen[codes]), customers, strata, fraction)
+
+
+def sample_rows(sample, filter_rows):
+    """Posisi baris yang lolos filter dan termasuk sampel."""
+    return np.intersect1d(filter_rows, sample.rows, assume_unique=True)
+
+
+def _per_customer(sample, values):
+    """Nilai per customer sampel (urut ``sample.customers``); 0 bila tidak ada di filter."""
+    return values.reindex(sample.customers['ID_Customer']).fillna(0).to_numpy(dtype=np.float64)
+
+
+def _total_and_variance(sample, y):
+    grouped = pd.Series(y).groupby(sample.customers['Stratum'].to_numpy())
+    strata = sample.strata.assign(
+        Sum=grouped.sum(), Var=grouped.var(ddof=1)
+    ).fillna({'Sum': 0.0, 'Var': 0.0})
+    weight = strata['N'] / strata['n']
+    total = float((weight * strata['Sum']).sum())
+    variance = float((strata['N'] ** 2 * (1 - strata['n'] / strata['N']) * strata['Var'] / strata['n']).sum())
+    return total, variance
+
+
+def estimate_total(sample, values):
+    """Total populasi dari ``values`` (Series per ID_Customer) beserta galat 95%."""
+    total, variance = _total_and_variance(sample, _per_customer(sample, values))
+    return Estimate(total, Z_95 * np.sqrt(variance))
+
+
+def estimate_ratio(sample, numerator, denominator):
+    """Rasio dua total (mis. konversi) dengan varians linearisasi; galat 95%."""
+    y = _per_customer(sample, numerator)
+    x = _per_customer(sample, denominator)
+    total_y, _ = _total_and_variance(sample, y)
+    total_x, _ = _total_and_variance(sample, x)
+    if total_x == 0:
+        return Estimate(0.0, 0.0)
+    ratio = total_y / total_x
+    _, variance = _total_and_variance(sample, y - ratio * x)
+    return Estimate(ratio, Z_95 * np.sqrt(variance) / total_x)
+
+
+def _customer_frame(frame):
+    """Indikator/jumlah per customer yang dipakai KPI."""
+    by_customer = frame.groupby('ID_Customer', observed=True)
+    reached = pd.crosstab(frame['ID_Customer'], frame['Progress']).reindex(columns=TAHAPAN_FUNNEL, fill_value=0) > 0
+    return pd.DataFrame({
+        'Aktif': 1.0,
+        'Kunjungan': by_customer.size(),
+        'Nilai_Kontrak': by_customer['Nilai_Kontrak'].sum(),
+    }).join(reached.astype(float))
+
+
+def kpi_estimates(sample, frame):
+    """KPI ringkasan dari frame sampel terfilter: ``{nama: Estimate}``."""
+    per_customer = _customer_frame(frame)
+    kpi = {
+        'customers': estimate_total(sample, per_customer['Aktif']),
+        'visits': estimate_total(sample, per_customer['Kunjungan']),
+        'kontrak': estimate_total(sample, per_customer['Nilai_Kontrak']),
+        'deal_rate': estimate_ratio(sample, per_customer['Paska Deal'], per_customer['Aktif']),
+    }
+    kpi['funnel'] = {tahap: estimate_total(sample, per_customer[tahap]) for tahap in TAHAPAN_FUNNEL}
+    kpi['conversion'] = {
+        f"{now} → {nxt}": estimate_ratio(sample, per_customer[nxt], per_customer[now])
+        for now, nxt in zip(TAHAPAN_FUNNEL, TAHAPAN_FUNNEL[1:])
+    }
+    return kpi
+
+
+def _exact(value):
+    return Estimate(float(value), 0.0)
+
+
+def kpi_summary(frame):
+    """KPI yang sama dengan ``kpi_estimates`` tetapi persis (galat 0)."""
+    per_customer = _customer_frame(frame)
+    n_customers = len(per_customer)
+    kpi = {
+        'customers': _exact(n_customers),
+        'visits': _exact(per_customer['Kunjungan'].sum()),
+        'kontrak': _exact(per_customer['Nilai_Kontrak'].sum()),
+        'deal_rate': _exact(per_customer['Paska Deal'].sum() / n_customers if n_customers else 0),
+    }
+    kpi['funnel'] = {tahap: _exact(per_customer[tahap].sum()) for tahap in TAHAPAN_FUNNEL}
+    kpi['conversion'] = {}
+    for now, nxt in zip(TAHAPAN_FUNNEL, TAHAPAN_FUNNEL[1:]):
+        base = per_customer[now].sum()
+        kpi['conversion'][f"{now} → {nxt}"] = _exact(per_customer[nxt].sum() / base if base else 0)
+    return kpi
+
+
+def _exact_and_store(cache_key, build_frame):
+    result = kpi_summary(build_frame())
+    shared_cache.set(cache_key, result)
+    return result
+
+
+def is_refined(version, key):
+    """True bila KPI persis untuk versi + filter ini sudah ada di cache."""
+    return ('exact_kpi', version, key) in shared_cache
+
+
+def refine(version, key, build_frame, wait=0.0):
+    """KPI persis untuk versi + filter ini, dihitung sekali di background.
+
+    ``build_frame()`` membuat frame terfilter lengkap. Mengembalikan
+    ``(kpi, siap)``; bila belum siap halaman tetap memakai sampel.
+    """
+    cache_key = ('exact_kpi', version, key)
+    if cache_key in shared_cache:
+        return shared_cache.get(cache_key), True
+    future = submit_once(cache_key, _exact_and_store, cache_key, build_frame)
+    try:
+        return future.result(timeout=wait), True
+    except FutureTimeout:
+        return None, False
@@ -0,0 +1,207 @@
+"""Model prediksi deal: training di background, skor batch untuk customer terbuka.
+
+Model disimpan sebagai pickle berversi ``models/deal_model_<data_version>.pkl``.
+Bila versi data belum punya model, training dijalankan di proses terpisah
+(sekali per versi) dan model terakhir yang ada tetap dipakai sampai selesai.
+"""
+import glob
+import multiprocessing
+import os
+import pickle
+import time
+
+import numpy as np
+
+from .cache import memoize
+from .features import build_customer_features, feature_store, model_columns
+from .shared import open_snapshot, snapshot_path
+
+MODEL_DIR = "models"
+STATUS_SELESAI = ['Deal', 'Cancel', 'Batal']
+RETRY_SECONDS = 60.0
+
+_training = {}
+_retry_after = {}
+
+
+def model_path(version, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f"deal_model_{version}.pkl")
+
+
+def _design_matrix(feats, columns=None):
+    X = feats[model_columns(feats)].astype(float).fillna(0.0)
+    if columns is not None:
+        X = X.reindex(columns=columns, fill_value=0.0)
+    return X
+
+
+def training_features(df, feats):
+    """Baris training per customer: fitur dari kunjungan sebelum deal-nya closing.
+
+    Kunjungan closing (``Status_Kontrak`` 'Deal' / tahap 'Paska Deal') dan
+    sesudahnya tidak ikut, sehingga fitur customer deal setara dengan yang
+    dilihat model saat menskor customer yang masih terbuka. Customer lain
+    memakai seluruh kunjungannya. Label tetap status kontrak akhir dari
+    feature store (``feats``).
+    """
+    closing = (df['Status_Kontrak'] == 'Deal') | (df['Progress'] == 'Paska Deal')
+    closed_at = df['Tanggal'].where(closing).groupby(df['ID_Customer'], observed=True).min()
+    cutoff = df['ID_Customer'].map(closed_at)
+    before = df[(cutoff.isna() | (df['Tanggal'] < cutoff)).to_numpy(dtype=bool)]
+    train = build_customer_features(before)
+    labels = feats.set_index('ID_Customer')[['Status_Kontrak_Akhir', 'Is_Deal']]
+    return train.drop(columns=labels.columns).join(labels, on='ID_Customer')
+
+
+def train_model(feats, version):
+    """Latih LogisticRegression dan RandomForest, pilih AUC tertinggi (seperti notebook).
+
+    ``feats`` adalah baris training per customer (lihat ``training_features``);
+    customer yang sudah selesai (Deal/Cancel/Batal) dipakai bila kedua kelas tersedia.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import train_test_split
+
+    resolved = feats[feats['Status_Kontrak_Akhir'].isin(STATUS_SELESAI)]
+    train = resolved if resolved['Is_Deal'].nunique() > 1 else feats
+    X = _design_matrix(train)
+    y = train['Is_Deal'].astype(int)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    candidates = {
+        'Logistic Regression': LogisticRegression(max_iter=1000),
+        'Random Forest': RandomForestClassifier(n_estimators=100, class_weight='balanced', random_state=42),
+    }
+    auc_scores = {}
+    for name, model in candidates.items():
+        model.fit(X_train, y_train)
+        if y_test.nunique() > 1:
+            auc_scores[name] = roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+        else:
+            auc_scores[name] = float('nan')
+    best_name = max(auc_scores, key=lambda k: np.nan_to_num(auc_scores[k], nan=-1))
+    return {
+        'model': candidates[best_name],
+        'model_name': best_name,
+        'auc': auc_scores[best_name],
+        'columns': list(X.columns),
+        'data_version': version,
+        'trained_at': time.time(),
+    }
+
+
+def _train_and_save(df, version, model_dir):
+    if isinstance(df, str):
+        # Path snapshot bersama: dibuka lewat mmap, tidak di-pickle dari proses induk
+        df = open_snapshot(df)
+    bundle = train_model(training_features(df, feature_store(df, version)), version)
+    os.makedirs(model_dir, exist_ok=True)
+    tmp_path = model_path(version, model_dir) + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(bundle, f)
+    os.replace(tmp_path, model_path(version, model_dir))
+
+
+def _latest_model_file(model_dir):
+    files = glob.glob(os.path.join(model_dir, "deal_model_*.pkl"))
+    return max(files, key=os.path.getmtime) if files else None
+
+
+def _load(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _cached_model(path):
+    """Model dari ``path``, di-unpickle sekali per file (versi data diambil dari nama file)."""
+    version = os.path.basename(path)[len("deal_model_"):-len(".pkl")]
+    return memoize('deal_model', version, path, _load, path)
+
+
+def ensure_model(df, version, model_dir=MODEL_DIR):
+    """Model untuk versi data ini; jika belum ada, mulai training background.
+
+    Mengembalikan ``(bundle, is_current)``; ``bundle`` bisa model versi lama
+    atau ``None`` bila belum pernah ada model sama sekali.
+    """
+    path = model_path(version, model_dir)
+    if os.path.exists(path):
+        return _cached_model(path), True
+
+    # Satu proses training per versi data. Proses yang berhenti tanpa menulis model
+    # (gagal / exit non-zero) dilepas agar dicoba lagi setelah ``RETRY_SECONDS``
+    proc = _training.get(version)
+    if proc is not None and proc.exitcode is not None:
+        del _training[version]
+        _retry_after[version] = time.time() + RETRY_SECONDS
+    if version not in _training and time.time() >= _retry_after.get(version, 0.0):
+        snapshot = snapshot_path(version)
+        source = snapshot if os.path.exists(snapshot) else df
+        proc = multiprocessing.get_context('spawn').Process(
+            target=_train_and_save, args=(source, version, model_dir), daemon=True
+        )
+        proc.start()
+        _training[version] = proc
+
+    previous = _latest_model_file(model_dir)
+    return (_cached_model(previous) if previous else None), False
+
+
+def _prioritas(prob):
+    return np.select(
+        [prob >= 0.8, prob >= 0.6, prob >= 0.4],
+        ["🔥 Prioritas Tinggi", "⚠️ Perlu Follow-up Segera", "🧊 Potensi Rendah"],
+        default="❌ Tidak Disarankan"
+    )
+
+
+def _strategi(progress, prob):
+    high, mid = prob >= 0.8, (prob >= 0.6) & (prob < 0.8)
+    return np.select(
+        [
+            high & (progress == 'Negosiasi'),
+            high & (progress == 'Penawaran Harga'),
+            high & (progress == 'Presentasi'),
+            high,
+            mid & (progress == 'Negosiasi'),
+            mid & (progress == 'Penawaran Harga'),
+            mid & (progress == 'Presentasi'),
+            mid,
+            prob >= 0.4,
+        ],
+        [
+            'Segera follow-up untuk closing!',
+            'Dorong ke tahap negosiasi, tawarkan benefit tambahan.',
+            'Pastikan kebutuhan customer terjawab, lanjutkan ke penawaran.',
+            'Bangun hubungan, gali kebutuhan customer.',
+            'Perkuat value proposition, atasi keberatan.',
+            'Tawarkan promo atau diskon khusus.',
+            'Tingkatkan engagement, follow-up presentasi.',
+            'Lakukan pendekatan lebih personal.',
+            'Identifikasi hambatan, lakukan pendekatan ulang.',
+        ],
+        default='Evaluasi prospek, fokus ke customer lain.'
+    )
+
+
+def score_open_customers(feats, bundle):
+    """Skor semua customer terbuka dalam satu batch ``predict_proba``."""
+    is_open = (feats['Status_Kontrak_Akhir'] == 'Berpotensi Deal') & (feats['Progress_Akhir'] != 'Paska Deal')
+    latest = feats[is_open]
+
+    X = _design_matrix(latest, bundle['columns'])
+    prob = bundle['model'].predict_proba(X)[:, 1] if len(X) else np.array([])
+    scores = latest[['ID_Customer', 'Nama_Customer', 'Nama_Sales', 'Segmen', 'Progress_Akhir', 'Nilai_Kontrak']]
+    scores = scores.rename(columns={'Progress_Akhir': 'Progress'})
+    scores['Prob_Deal'] = prob
+    scores['Prioritas'] = _prioritas(prob)
+    scores['Rekomendasi_Strategi'] = _strategi(scores['Progress'].to_numpy(), prob)
+    return scores.sort_values('Prob_Deal', ascending=False).reset_index(drop=True)
+
+
+def cached_scores(df, version, bundle):
+    """Skor per versi data dan versi model (tidak dihitung ulang per rerun/filter)."""
+    return memoize('deal_scores', version, bundle['data_version'],
+                   score_open_customers, feature_store(df, version), bundle)
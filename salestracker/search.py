@@ -0,0 +1,163 @@
+"""Pencarian teks penuh atas ``Catatan`` dan ``Nama_Customer`` (inverted index).
+
+Posting list per kata berisi posisi baris (terurut naik) dan frekuensi kata.
+Kosakata disimpan terurut sehingga query prefix cukup dua ``bisect``. Baris
+baru ditambahkan lewat ``SearchIndex.add`` tanpa membangun ulang indeks;
+posisi baris selalu melanjutkan posisi terakhir sehingga posting tetap terurut.
+Saat data hanya bertambah, ``watcher`` menyalin indeks versi lama dan
+menambahkan baris baru ke salinan itu untuk versi baru.
+"""
+import bisect
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+from .notes import normalize, words
+
+FIELDS = ['Catatan', 'Nama_Customer']
+# Parameter BM25
+_K1, _B = 1.2, 0.75
+_QUERY_TOKEN = re.compile(r'(\w+)(\*?)')
+
+
+class SearchIndex:
+    """Inverted index dengan skor BM25 dan filter bitmap per baris."""
+
+    def __init__(self):
+        self.terms = []      # kosakata terurut
+        self.postings = {}   # kata -> (rows int64, tf float32)
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self.tanggal = np.zeros(0, dtype='datetime64[ns]')
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def copy(self):
+        """Salinan dangkal: ``add`` pada salinan tidak mengubah indeks asal (array tidak diubah di tempat)."""
+        clone = SearchIndex()
+        with self._lock:
+            clone.terms = list(self.terms)
+            clone.postings = dict(self.postings)
+            clone.doc_len, clone.tanggal = self.doc_len, self.tanggal
+        return clone
+
+    def add(self, frame):
+        """Indeks baris ``frame`` sebagai posisi ``len(self) ..`` berikutnya."""
+        n = len(frame)
+        if n == 0:
+            return self
+        field_terms, field_rows = [], []
+        for field in FIELDS:
+            # Tokenisasi hanya sekali per nilai unik, lalu diperluas ke baris secara vektor
+            codes, uniques = pd.factorize(frame[field].fillna('').astype(str))
+            tokens = [words(u) for u in uniques]
+            n_tokens = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=len(tokens))
+            flat = np.array([w for t in tokens for w in t], dtype=object)
+            token_start = np.r_[0, np.cumsum(n_tokens)[:-1]] if len(tokens) else n_tokens
+            per_row = n_tokens[codes]
+            row_ids = np.repeat(np.arange(n), per_row)
+            within = np.arange(per_row.sum()) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+            field_terms.append(flat[np.repeat(token_start[codes], per_row) + within])
+            field_rows.append(row_ids)
+        term_codes, term_names = pd.factorize(np.concatenate(field_terms), sort=True)
+        pair_keys, tf = np.unique(term_codes.astype(np.int64) * n + np.concatenate(field_rows), return_counts=True)
+        term_idx, row_pos = np.divmod(pair_keys, n)
+        counts = tf.astype(np.float32)
+        bounds = np.flatnonzero(np.diff(term_idx)) + 1
+        starts = np.r_[0, bounds] if len(pair_keys) else np.array([], dtype=np.int64)
+        ends = np.r_[bounds, len(pair_keys)] if len(pair_keys) else np.array([], dtype=np.int64)
+        term_keys = np.asarray(term_names, dtype=object)[term_idx]
+
+        with self._lock:
+            offset = len(self)
+            for lo, hi in zip(starts, ends):
+                term = term_keys[lo]
+                new_rows, new_tf = row_pos[lo:hi] + offset, counts[lo:hi]
+                if term in self.postings:
+                    old_rows, old_tf = self.postings[term]
+                    self.postings[term] = (np.concatenate([old_rows, new_rows]), np.concatenate([old_tf, new_tf]))
+                else:
+                    bisect.insort(self.terms, term)
+                    self.postings[term] = (new_rows, new_tf)
+            self.doc_len = np.concatenate([
+                self.doc_len, np.bincount(row_pos, weights=counts, minlength=n).astype(np.float32)
+            ])
+            self.tanggal = np.concatenate([self.tanggal, frame['Tanggal'].to_numpy(dtype='datetime64[ns]')])
+        return self
+
+    def _expand(self, token, prefix):
+        if not prefix:
+            return [token] if token in self.postings else []
+        lo = bisect.bisect_left(self.terms, token)
+        hi = bisect.bisect_left(self.terms, token + '\uffff')
+        return self.terms[lo:hi]
+
+    def _token_scores(self, matched, avg_len):
+        """Skor BM25 per baris untuk satu token (gabungan semua kata yang cocok)."""
+        n_docs = len(self)
+        rows, scores = [], []
+        for term in matched:
+            term_rows, tf = self.postings[term]
+            idf = np.log1p((n_docs - len(term_rows) + 0.5) / (len(term_rows) + 0.5))
+            norm = _K1 * (1 - _B + _B * self.doc_len[term_rows] / avg_len)
+            rows.append(term_rows)
+            scores.append(idf * tf * (_K1 + 1) / (tf + norm))
+        rows = np.concatenate(rows)
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        return unique_rows, np.bincount(inverse, weights=np.concatenate(scores))
+
+    def search(self, query, mask=None, limit=50, prefix_last=True):
+        """Baris yang memuat semua kata query, urut skor lalu tanggal terbaru.
+
+        Kata berakhiran ``*`` dicocokkan sebagai prefix; dengan ``prefix_last``
+        kata terakhir juga (untuk pencarian sambil mengetik). ``mask`` adalah
+        bitmap boolean sepanjang indeks. Mengembalikan ``(rows, scores)``.
+        """
+        tokens = _QUERY_TOKEN.findall(normalize(query))
+        empty = np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+        if not tokens:
+            return empty
+
+        with self._lock:
+            avg_len = max(float(self.doc_len.mean()), 1.0) if len(self) else 1.0
+            rows = scores = None
+            for i, (token, star) in enumerate(tokens):
+                is_prefix = bool(star) or (prefix_last and i == len(tokens) - 1)
+                matched = self._expand(token, is_prefix)
+                if not matched:
+                    return empty
+                token_rows, token_scores = self._token_scores(matched, avg_len)
+                if rows is None:
+                    rows, scores = token_rows, token_scores
+                else:
+                    rows, left, right = np.intersect1d(rows, token_rows, assume_unique=True, return_indices=True)
+                    scores = scores[left] + token_scores[right]
+                if mask is not None:
+                    keep = mask[rows]
+                    rows, scores = rows[keep], scores[keep]
+                if not len(rows):
+                    return empty
+            tanggal = self.tanggal[rows].astype(np.int64)
+
+        order = np.lexsort((-tanggal, -scores))[:limit]
+        return rows[order], scores[order]
+
+
+def build_index(df):
+    return SearchIndex().add(df)
+
+
+def search_index(df, version):
+    """Indeks pencarian seluruh data untuk versi ini (dibangun sekali)."""
+    return memoize('search', version, None, build_index, df)
+
+
+def filter_mask(n_rows, rows):
+    """Bitmap sepanjang ``n_rows`` dari posisi baris yang lolos filter sidebar."""
+    mask = np.zeros(n_rows, dtype=bool)
+    mask[rows] = True
+    return mask
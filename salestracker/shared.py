@@ -0,0 +1,162 @@
+"""Snapshot dataset bersama berbasis memory-mapped Arrow IPC.
+
+Dataset kanonik ditulis sekali per versi data ke
+``shared_data/visits_<data_version>.arrow`` (Arrow IPC tanpa kompresi). Setiap
+proses (server Streamlit, worker process pool, proses training) membuka file
+yang sama dengan ``memory_map``; kolom angka/tanggal dan string Arrow dibungkus
+pandas tanpa disalin, sehingga halaman memori dibagi lewat page cache OS.
+Kolom string dibuka sebagai string berbasis Arrow (``types_mapper``), bukan
+array objek Python yang akan disalin ke setiap proses (default pandas 2.x).
+
+Filter menghasilkan array posisi baris. Halaman masih bekerja dengan DataFrame,
+jadi ``filtered_frame`` mengambil baris itu sekali per kunci filter dan
+menyimpannya di cache bersama: satu salinan per filter berbeda, bukan per
+sesi, dan filter tanpa pembatasan memakai frame ter-mmap itu sendiri. Cache
+frame dibatasi total byte (``FRAME_CACHE_BYTES``, termasuk buffer string),
+bukan jumlah entri, karena tiap entri bisa berukuran hampir sebesar dataset.
+
+Di samping snapshot, ``source_<hash>.json`` mencatat token sumber dan versi
+data terakhir; server yang restart tanpa perubahan sumber langsung memetakan
+snapshot itu tanpa mem-parse ulang CSV (``boot_snapshot``).
+"""
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .cache import VersionedCache
+
+SNAPSHOT_DIR = "shared_data"
+KEEP_PREVIOUS = 1
+FRAME_CACHE_BYTES = int(os.environ.get("SALESTRACKER_FRAME_CACHE_MB", "512")) * 2**20
+
+
+def snapshot_path(version, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, f"visits_{version}.arrow")
+
+
+def write_snapshot(df, version, snapshot_dir=SNAPSHOT_DIR):
+    """Tulis ``df`` sebagai Arrow IPC (satu chunk per kolom); dilewati bila sudah ada."""
+    path = snapshot_path(version, snapshot_dir)
+    if os.path.exists(path):
+        return path
+    os.makedirs(snapshot_dir, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _string_dtype():
+    # String berbasis Arrow dengan semantik NaN (perbandingan tetap menghasilkan bool numpy)
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except TypeError:   # pandas < 2.3
+        return pd.StringDtype("pyarrow_numpy")
+
+
+def _arrow_types(arrow_type):
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return _string_dtype()
+    return None
+
+
+def open_snapshot(path):
+    """DataFrame read-only yang buffernya langsung menunjuk ke file ter-mmap."""
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(split_blocks=True, types_mapper=_arrow_types)
+
+
+def remove_stale(version, snapshot_dir=SNAPSHOT_DIR, keep_previous=KEEP_PREVIOUS):
+    """Hapus snapshot versi lama kecuali ``keep_previous`` versi terbaru sebelum ``version``.
+
+    Proses yang sudah memetakan file tetap aman setelah unlink, tetapi exporter/API
+    yang baru akan membuka versi sebelumnya lewat path-nya belum tentu sudah
+    pindah ke versi baru; versi N-1 baru dihapus saat versi N+1 terbit.
+    """
+    current = snapshot_path(version, snapshot_dir)
+    older = [path for path in glob.glob(os.path.join(snapshot_dir, "visits_*.arrow")) if path != current]
+    older.sort(key=_mtime, reverse=True)
+    for path in older[keep_previous:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:   # sudah dihapus proses lain
+        return 0.0
+
+
+def shared_frame(df, version, snapshot_dir=SNAPSHOT_DIR):
+    """Ganti ``df`` dengan versi memory-mapped dari snapshot bersama."""
+    path = write_snapshot(df, version, snapshot_dir)
+    remove_stale(version, snapshot_dir)
+    return open_snapshot(path)
+
+
+def _source_meta_path(source, snapshot_dir=SNAPSHOT_DIR):
+    digest = hashlib.sha1(str(source).encode()).hexdigest()[:12]
+    return os.path.join(snapshot_dir, f"source_{digest}.json")
+
+
+def write_source_meta(source, token, version, snapshot_dir=SNAPSHOT_DIR):
+    """Catat bahwa sumber ``source`` dengan ``token`` ini menghasilkan snapshot ``version``."""
+    path = _source_meta_path(source, snapshot_dir)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"source": str(source), "token": json.dumps(token), "version": version}, f)
+    os.replace(tmp_path, path)
+
+
+def boot_snapshot(source, token, snapshot_dir=SNAPSHOT_DIR):
+    """``(df, versi)`` dari snapshot terakhir bila token sumber belum berubah; selain itu None."""
+    try:
+        with open(_source_meta_path(source, snapshot_dir)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    path = snapshot_path(meta["version"], snapshot_dir)
+    if meta.get("token") != json.dumps(token) or not os.path.exists(path):
+        return None
+    return open_snapshot(path), meta["version"]
+
+
+def filter_rows(df, date_rows, nama_sales, segmen, status_cust):
+    """Posisi baris yang lolos filter sidebar, dari posisi rentang tanggal."""
+    date_rows = np.asarray(date_rows)
+    # Hanya tiga kolom filter yang diambil untuk baris di rentang, bukan seluruh frame
+    keep = np.ones(len(date_rows), dtype=bool)
+    for column, selected in (('Nama_Sales', nama_sales), ('Segmen', segmen), ('Status_Customer', status_cust)):
+        keep &= df[column].take(date_rows).isin(selected).to_numpy()
+    return date_rows[keep]
+
+
+def _frame_nbytes(frame):
+    # deep=True: kolom Arrow dihitung dari ukuran buffernya, kolom objek (bila ada) per string
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+_frames = VersionedCache(maxsize=256, maxbytes=FRAME_CACHE_BYTES, sizeof=_frame_nbytes)
+
+
+def filtered_frame(df, version, key, rows):
+    """Frame hasil filter yang dipakai bersama oleh semua sesi dengan kunci filter sama.
+
+    Bila filter meloloskan semua baris dalam urutan aslinya, frame ter-mmap
+    dikembalikan apa adanya tanpa salinan.
+    """
+    rows = np.asarray(rows)
+    if len(rows) == len(df) and np.array_equal(rows, np.arange(len(df))):
+        return df
+    return _frames.get_or_compute(('filtered', version, key), df.take, rows)
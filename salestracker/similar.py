@@ -0,0 +1,154 @@
+"""Pencarian customer serupa (nearest neighbour) dari feature store dan catatan.
+
+Setiap customer menjadi satu vektor ternormalisasi: fitur numerik (segmen,
+status, nilai kontrak, ritme kunjungan, durasi tahap) yang distandarkan, ditambah
+TF-IDF kata catatan yang di-hash ke dimensi tetap. Kemiripan = cosine.
+Data kecil memakai brute force per batch; data besar memakai LSH (random
+hyperplane) untuk menyaring kandidat terlebih dahulu.
+"""
+import zlib
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+from .features import feature_store
+from .notes import tokenize
+
+STATUS_SELESAI = ['Deal', 'Cancel', 'Batal']
+FITUR_NUMERIK = ['Jumlah_Kunjungan', 'Jeda_Rata2', 'Jeda_Max', 'Rentang_Hari', 'Rasio_Kontrak_vs_Target']
+PREFIX_KATEGORI = ('Segmen_', 'Status_Customer_', 'Porsi_')
+TEXT_DIM = 64
+TEXT_WEIGHT = 0.5
+
+BRUTE_FORCE_LIMIT = 50_000
+_BATCH_ROWS = 65_536
+_LSH_TABLES = 4
+_LSH_BITS = 12
+META = ['ID_Customer', 'Nama_Customer', 'Nama_Sales', 'Segmen', 'Status_Kontrak_Akhir', 'Progress_Akhir', 'Nilai_Kontrak']
+
+
+def _zscore(values):
+    values = np.nan_to_num(values.astype(np.float64))
+    std = values.std(axis=0)
+    return (values - values.mean(axis=0)) / np.where(std > 0, std, 1.0)
+
+
+def _text_vectors(df, customer_ids):
+    """TF-IDF catatan per customer, di-hash ke ``TEXT_DIM`` kolom."""
+    notes = df[['ID_Customer', 'Catatan']].dropna()
+    codes, uniques = pd.factorize(notes['Catatan'].astype(str))
+    # Tokenisasi sekali per catatan unik -> bucket hash tiap kata
+    buckets = [[zlib.crc32(w.encode()) % TEXT_DIM for w in tokenize(u)] for u in uniques]
+    per_note = np.fromiter((len(b) for b in buckets), dtype=np.int64, count=len(buckets))
+    flat = np.fromiter((b for bs in buckets for b in bs), dtype=np.int64, count=int(per_note.sum()))
+    starts = np.r_[0, np.cumsum(per_note)[:-1]] if len(buckets) else per_note
+
+    cust = pd.Index(customer_ids).get_indexer(notes['ID_Customer'])
+    per_row = per_note[codes]
+    within = np.arange(per_row.sum()) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+    cols = flat[np.repeat(starts[codes], per_row) + within]
+    rows = np.repeat(cust, per_row)
+    keep = rows >= 0
+
+    tf = np.zeros((len(customer_ids), TEXT_DIM))
+    np.add.at(tf, (rows[keep], cols[keep]), 1.0)
+    idf = np.log((1 + len(customer_ids)) / (1 + (tf > 0).sum(axis=0))) + 1
+    tfidf = tf * idf
+    norm = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    return np.divide(tfidf, norm, out=np.zeros_like(tfidf), where=norm > 0)
+
+
+@dataclass
+class SimilarityIndex:
+    """Vektor customer ternormalisasi L2 dan (opsional) tabel LSH."""
+    meta: pd.DataFrame
+    vectors: np.ndarray                      # (n, d) float32
+    resolved: np.ndarray                     # (n,) customer yang sudah selesai
+    planes: np.ndarray = None                # (tables, bits, d) hyperplane LSH
+    tables: list = field(default_factory=list)
+
+    def __post_init__(self):
+        self.position = pd.Index(self.meta['ID_Customer'])
+
+    def _signatures(self, vectors):
+        bits = np.einsum('tbd,nd->ntb', self.planes, vectors) > 0
+        return bits @ (1 << np.arange(_LSH_BITS))
+
+    def _candidates(self, query):
+        if self.planes is None:
+            return None
+        signature = self._signatures(query[None, :])[0]
+        found = [self.tables[t].get(int(sig), ()) for t, sig in enumerate(signature)]
+        return np.unique(np.concatenate([np.asarray(f, dtype=np.int64) for f in found]))
+
+    def neighbours(self, customer_id, k=5, resolved_only=True):
+        """``k`` customer paling mirip (tanpa customer itu sendiri), dengan kolom ``Similarity``."""
+        i = self.position.get_loc(customer_id)
+        query = self.vectors[i]
+        allowed = self.resolved if resolved_only else np.ones(len(self.meta), dtype=bool)
+
+        candidates = self._candidates(query)
+        if candidates is not None:
+            candidates = candidates[allowed[candidates] & (candidates != i)]
+        if candidates is not None and len(candidates) >= k:
+            sims = self.vectors[candidates] @ query
+            rows = candidates
+        else:
+            # Brute force per batch agar memori tetap kecil
+            best_rows, best_sims = [], []
+            for start in range(0, len(self.vectors), _BATCH_ROWS):
+                batch = self.vectors[start:start + _BATCH_ROWS] @ query
+                ok = allowed[start:start + _BATCH_ROWS].copy()
+                if start <= i < start + _BATCH_ROWS:
+                    ok[i - start] = False
+                idx = np.flatnonzero(ok)
+                top = idx[np.argsort(-batch[idx], kind='stable')[:k]]
+                best_rows.append(top + start)
+                best_sims.append(batch[top])
+            rows, sims = np.concatenate(best_rows), np.concatenate(best_sims)
+
+        order = np.argsort(-sims, kind='stable')[:k]
+        result = self.meta.iloc[rows[order]].reset_index(drop=True)
+        result.insert(0, 'Similarity', sims[order])
+        return result
+
+
+def build_index(df, feats, lsh_threshold=BRUTE_FORCE_LIMIT, seed=0):
+    """Bangun ``SimilarityIndex`` dari log kunjungan dan tabel fitur customer."""
+    kategori = [c for c in feats.columns if c.startswith(PREFIX_KATEGORI)]
+    durasi = [c for c in feats.columns if c.startswith('Durasi_')]
+    numeric = feats[FITUR_NUMERIK + durasi].to_numpy(dtype=np.float64)
+    numeric = np.column_stack([numeric, np.log1p(feats['Nilai_Kontrak'].to_numpy(dtype=np.float64))])
+    parts = [
+        _zscore(numeric) / np.sqrt(numeric.shape[1]),
+        feats[kategori].fillna(0).to_numpy(dtype=np.float64),
+        TEXT_WEIGHT * _text_vectors(df, feats['ID_Customer']),
+    ]
+    vectors = np.hstack(parts)
+    norm = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norm, out=np.zeros_like(vectors), where=norm > 0).astype(np.float32)
+
+    index = SimilarityIndex(
+        meta=feats[META].reset_index(drop=True),
+        vectors=vectors,
+        resolved=feats['Status_Kontrak_Akhir'].isin(STATUS_SELESAI).to_numpy(),
+    )
+    if len(vectors) > lsh_threshold:
+        rng = np.random.default_rng(seed)
+        index.planes = rng.standard_normal((_LSH_TABLES, _LSH_BITS, vectors.shape[1])).astype(np.float32)
+        signatures = np.concatenate([
+            index._signatures(vectors[start:start + _BATCH_ROWS])
+            for start in range(0, len(vectors), _BATCH_ROWS)
+        ])
+        for t in range(_LSH_TABLES):
+            order = np.argsort(signatures[:, t], kind='stable')
+            keys, starts = np.unique(signatures[order, t], return_index=True)
+            index.tables.append({int(key): rows for key, rows in zip(keys, np.split(order, starts[1:]))})
+    return index
+
+
+def similarity_index(df, version):
+    """Indeks kemiripan seluruh customer untuk versi data ini."""
+    return memoize('similar', version, None, build_index, df, feature_store(df, version))
@@ -0,0 +1,134 @@
+"""Hitung customer unik secara perkiraan dengan sketch HyperLogLog yang bisa digabung.
+
+Satu sketch (``M`` register uint8) disimpan untuk setiap sel
+``(Nama_Sales, Segmen, Status_Customer, Progress, Bulan)``. Kombinasi filter
+apa pun dijawab dengan menggabungkan (max per register) sketch sel yang cocok,
+tanpa menyentuh log kunjungan. Galat relatif standar ``1.04 / sqrt(M)``.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+
+P = 11
+M = 1 << P
+REL_ERROR = 1.04 / np.sqrt(M)
+Z_95 = 1.96
+_ALPHA = 0.7213 / (1 + 1.079 / M)
+_REST_BITS = 64 - P
+
+DIMENSI = ['Nama_Sales', 'Segmen', 'Status_Customer', 'Progress']
+
+
+@dataclass
+class Estimate:
+    """Nilai perkiraan dan batas galat 95% (absolut)."""
+    value: float
+    error: float
+
+    def __str__(self):
+        return f"{self.value:,.0f} ± {self.error:,.0f}"
+
+
+def _hash_ids(ids):
+    """Hash 64-bit per baris; hashing hanya sekali per ID unik."""
+    codes, uniques = pd.factorize(ids)
+    return pd.util.hash_array(np.asarray(uniques, dtype=object))[codes]
+
+
+def _register_rank(hashes):
+    """Indeks register (P bit teratas) dan rank = posisi bit 1 pertama di sisa bit."""
+    register = (hashes >> np.uint64(_REST_BITS)).astype(np.int64)
+    rest = hashes & np.uint64((1 << _REST_BITS) - 1)
+    # frexp memberi panjang bit secara tepat karena rest < 2**53
+    _, bit_length = np.frexp(rest.astype(np.float64))
+    rank = (_REST_BITS - bit_length + 1).astype(np.uint8)
+    return register, rank
+
+
+def _estimate(registers):
+    raw = _ALPHA * M * M / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * M and zeros:
+        # Koreksi rentang kecil (linear counting)
+        return M * np.log(M / zeros)
+    return raw
+
+
+def select_cells(cells, start=None, end=None, **filters):
+    """Mask sel untuk filter dimensi; rentang tanggal dibulatkan ke bulan yang beririsan."""
+    mask = np.ones(len(cells), dtype=bool)
+    if start is not None:
+        mask &= (cells['Bulan'] >= pd.Timestamp(start).to_period('M').start_time).to_numpy()
+    if end is not None:
+        mask &= (cells['Bulan'] <= pd.Timestamp(end)).to_numpy()
+    for column, values in filters.items():
+        if values is None:
+            continue
+        values = [values] if isinstance(values, str) else list(values)
+        mask &= cells[column].isin(values).to_numpy()
+    return mask
+
+
+def cell_codes(keys):
+    """Kode sel per baris dan tabel sel unik (terurut) dari frame ``DIMENSI + ['Bulan']``."""
+    grouped = keys.groupby(DIMENSI + ['Bulan'], sort=True, observed=True)
+    return grouped.ngroup().to_numpy(), grouped.size().reset_index()[DIMENSI + ['Bulan']]
+
+
+class CustomerSketches:
+    """Sketch HLL per sel dimensi x bulan."""
+
+    def __init__(self, cells, registers):
+        self.cells = cells            # DataFrame DIMENSI + 'Bulan' (Timestamp awal bulan)
+        self.registers = registers    # (n_cells, M) uint8
+
+    @classmethod
+    def build(cls, df):
+        month = df['Tanggal'].dt.to_period('M').dt.start_time
+        keys = df[DIMENSI].assign(Bulan=month)
+        cell, cells = cell_codes(keys)
+
+        register, rank = _register_rank(_hash_ids(df['ID_Customer']))
+        flat = cell.astype(np.int64) * M + register
+        order = np.argsort(flat, kind='stable')
+        flat_sorted = flat[order]
+        starts = np.flatnonzero(np.r_[True, flat_sorted[1:] != flat_sorted[:-1]]) if len(flat) else flat
+        registers = np.zeros((len(cells), M), dtype=np.uint8)
+        if len(flat):
+            registers.ravel()[flat_sorted[starts]] = np.maximum.reduceat(rank[order], starts)
+        return cls(cells, registers)
+
+    def merge(self, other):
+        """Gabungkan dua kumpulan sketch (mis. batch ingest baru) menjadi satu."""
+        cells = pd.concat([self.cells, other.cells], ignore_index=True)
+        codes = cells.groupby(DIMENSI + ['Bulan'], sort=True, observed=True).ngroup().to_numpy()
+        merged = np.zeros((codes.max() + 1 if len(codes) else 0, M), dtype=np.uint8)
+        np.maximum.at(merged, codes, np.vstack([self.registers, other.registers]))
+        first = pd.Series(np.arange(len(codes))).groupby(codes).first().to_numpy()
+        return CustomerSketches(cells.iloc[first].reset_index(drop=True), merged)
+
+    def select(self, start=None, end=None, **filters):
+        return select_cells(self.cells, start, end, **filters)
+
+    def distinct(self, mask):
+        """Perkiraan customer unik pada sel ``mask``."""
+        if not mask.any():
+            return Estimate(0.0, 0.0)
+        value = _estimate(self.registers[mask].max(axis=0))
+        return Estimate(float(value), float(Z_95 * REL_ERROR * value))
+
+    def distinct_by(self, mask, column):
+        """Perkiraan customer unik per nilai ``column`` (DataFrame Nilai/Galat)."""
+        rows = {}
+        for value, idx in self.cells[mask].groupby(column, sort=False, observed=True).groups.items():
+            est = self.distinct(np.isin(np.arange(len(self.cells)), idx))
+            rows[value] = (est.value, est.error)
+        return pd.DataFrame.from_dict(rows, orient='index', columns=['Nilai', 'Galat'])
+
+
+def customer_sketches(df, version):
+    """Sketch seluruh data untuk versi ini (dibangun sekali)."""
+    return memoize('hll', version, None, CustomerSketches.build, df)
@@ -0,0 +1,269 @@
+"""Sumber data kunjungan dari tabel SQL (SQLite bawaan; Postgres bila ``psycopg`` terpasang).
+
+``DATA_PATH`` / ``SALESTRACKER_DATA`` berbentuk URL::
+
+    sqlite:///visits.db                      (tabel default ``visits``)
+    sqlite:///visits.db?table=kunjungan
+    postgresql://user@host/db?table=visits
+
+- Koneksi diambil dari pool kecil (``POOL_SIZE``) yang dibagi thread dashboard dan API.
+- Filter tanggal/sales/segmen/status didorong ke klausa ``WHERE`` (``SqlSource.query``).
+- Tarikan inkremental: salinan lokal tabel (juga di ``shared_data/sql_*.arrow``,
+  bertahan antar restart) urut ``(Tanggal, ID_Kunjungan)``; watermark-nya
+  ``Tanggal`` terbesar. ``snapshot()`` hanya mengambil baris dengan
+  ``Tanggal >= watermark`` dan menggantikan baris ber-``ID_Kunjungan`` sama.
+  Bila jumlah baris lokal tidak sama dengan ``COUNT(*)`` server (baris dihapus
+  atau disisipkan dengan tanggal lama), tabel dimuat ulang penuh.
+
+Kolom ``Tanggal`` disimpan sebagai teks ISO ``YYYY-MM-DD`` agar perbandingan di
+SQL benar. Mengisi tabel dari CSV::
+
+    python -m salestracker.sqlsource sales_visits.csv sqlite:///visits.db
+"""
+import argparse
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pyarrow as pa
+
+from .data import PROGRESS_MAP
+from .shared import SNAPSHOT_DIR, open_snapshot
+
+SCHEMES = ('sqlite', 'postgresql', 'postgres')
+DEFAULT_TABLE = 'visits'
+POOL_SIZE = 4
+DATE_FORMAT = '%m/%d/%Y'
+ORDER = ['Tanggal', 'ID_Kunjungan']
+FILTER_COLUMNS = {'nama_sales': 'Nama_Sales', 'segmen': 'Segmen', 'status_cust': 'Status_Customer'}
+
+_sources = {}
+_sources_lock = threading.Lock()
+
+
+def is_sql_url(path):
+    return isinstance(path, str) and path.split(':', 1)[0] in SCHEMES and '://' in path
+
+
+def _identifier(name):
+    if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', name):
+        raise ValueError(f"nama tabel/kolom tidak valid: {name!r}")
+    return name
+
+
+def parse_url(url):
+    """``(connect, placeholder, table)`` dari URL sumber SQL."""
+    parts = urlsplit(url)
+    table = _identifier(parse_qs(parts.query).get('table', [DEFAULT_TABLE])[0])
+    if parts.scheme == 'sqlite':
+        path = parts.path[1:] if parts.path.startswith('/') else parts.path
+        path = path or ':memory:'
+        return (lambda: sqlite3.connect(path, check_same_thread=False)), '?', table
+    try:
+        import psycopg
+    except ImportError:
+        raise RuntimeError("sumber Postgres butuh paket psycopg") from None
+    dsn = url.split('?', 1)[0].replace('postgres://', 'postgresql://', 1)
+    return (lambda: psycopg.connect(dsn)), '%s', table
+
+
+class ConnectionPool:
+    """Pool koneksi DB-API berukuran tetap; koneksi dibuat saat pertama dibutuhkan."""
+
+    def __init__(self, connect, size=POOL_SIZE):
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            except Exception:
+                conn.close()
+                raise
+            else:
+                self._idle.put(conn)
+
+
+def _finish(frame):
+    """Tipe kolom yang sama dengan ``data.load_visits`` (CSV)."""
+    frame['Tanggal'] = pd.to_datetime(frame['Tanggal'])
+    if 'Progress' in frame.columns:
+        frame['Progress_Score'] = frame['Progress'].map(PROGRESS_MAP)
+    return frame
+
+
+class SqlSource:
+    """Tabel kunjungan di database SQL, dengan salinan lokal yang diperbarui inkremental.
+
+    Salinan lokal juga ditulis ke ``cache_dir`` (Arrow IPC) sehingga proses baru
+    cukup menarik baris sejak watermark, bukan seluruh tabel.
+    """
+
+    def __init__(self, url, pool_size=POOL_SIZE, cache_dir=SNAPSHOT_DIR):
+        connect, self.placeholder, self.table = parse_url(url)
+        self.pool = ConnectionPool(connect, pool_size)
+        self.cache_path = os.path.join(cache_dir, f"sql_{hashlib.sha1(url.encode()).hexdigest()[:12]}.arrow")
+        self._lock = threading.Lock()
+        self._frame = None
+        self.last_pull_rows = 0
+
+    def _read(self, where='', params=(), columns=None):
+        select = ', '.join(_identifier(c) for c in columns) if columns else '*'
+        order = ', '.join(ORDER)
+        sql = f"SELECT {select} FROM {self.table} {where} ORDER BY {order}"
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+        return _finish(pd.DataFrame.from_records(rows, columns=names))
+
+    def query(self, start=None, end=None, nama_sales=None, segmen=None, status_cust=None, columns=None):
+        """Baris yang lolos filter; semua kondisi dievaluasi di server."""
+        conditions, params = [], []
+        if start is not None:
+            conditions.append(f"Tanggal >= {self.placeholder}")
+            params.append(str(pd.Timestamp(start).date()))
+        if end is not None:
+            conditions.append(f"Tanggal <= {self.placeholder}")
+            params.append(str(pd.Timestamp(end).date()))
+        for arg, column in FILTER_COLUMNS.items():
+            values = locals()[arg]
+            if values is None:
+                continue
+            values = [values] if isinstance(values, str) else list(values)
+            if not values:
+                conditions.append("1 = 0")
+                continue
+            conditions.append(f"{column} IN ({', '.join([self.placeholder] * len(values))})")
+            params.extend(map(str, values))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        read_columns = None if columns is None else list(dict.fromkeys(list(columns) + ORDER))
+        frame = self._read(where, params, read_columns)
+        return frame if columns is None else frame[list(columns)]
+
+    def stats(self):
+        """``(jumlah baris, Tanggal terbesar)`` di server; query murah untuk deteksi perubahan."""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*), MAX(Tanggal) FROM {self.table}")
+            count, latest = cursor.fetchone()
+        return int(count), latest
+
+    def token(self):
+        """Penanda versi sumber; berubah bila ada baris baru/terhapus."""
+        count, latest = self.stats()
+        return f"{count}:{latest}"
+
+    def _cached(self):
+        if self._frame is None and os.path.exists(self.cache_path):
+            self._frame = open_snapshot(self.cache_path)
+        return self._frame
+
+    def _store(self, frame):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, self.cache_path)
+        self._frame = frame
+
+    def snapshot(self):
+        """Seluruh tabel (urut Tanggal, ID_Kunjungan); setelah tarikan pertama hanya baris sejak watermark.
+
+        Frame yang dikembalikan dipakai bersama; jangan diubah di tempat.
+        """
+        with self._lock:
+            count, _ = self.stats()
+            cached = self._cached()
+            if cached is None or cached.empty:
+                frame = delta = self._read()
+            else:
+                # Watermark = Tanggal terbesar salinan lokal; hari itu ditarik ulang
+                # karena bisa ada kunjungan baru di tanggal yang sama.
+                watermark = cached['Tanggal'].iloc[-1]
+                delta = self._read(f"WHERE Tanggal >= {self.placeholder}", (str(watermark.date()),))
+                cut = cached['Tanggal'].searchsorted(watermark, side='left')
+                tail = cached.iloc[cut:].reset_index(drop=True)
+                if len(cached) == count and tail.equals(delta):
+                    frame = cached
+                else:
+                    head = cached.iloc[:cut]
+                    moved = head['ID_Kunjungan'].isin(delta['ID_Kunjungan'])
+                    if moved.any():
+                        head = head[~moved]
+                    frame = pd.concat([head, delta], ignore_index=True)
+                if len(frame) != count:
+                    # Ada baris terhapus atau disisipkan dengan tanggal lama
+                    frame = delta = self._read()
+            self.last_pull_rows = len(delta)
+            if frame is not cached:
+                self._store(frame)
+            return frame
+
+
+def get_source(url):
+    """Satu ``SqlSource`` (pool + salinan lokal) per URL dalam proses ini."""
+    with _sources_lock:
+        if url not in _sources:
+            _sources[url] = SqlSource(url)
+        return _sources[url]
+
+
+def _sql_type(dtype):
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'BIGINT'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'DOUBLE PRECISION'
+    return 'TEXT'
+
+
+def load_csv(csv_path, url, chunksize=100_000, replace=False):
+    """Isi tabel SQL dari CSV kunjungan (tanggal diubah ke ISO); kembalikan jumlah baris."""
+    source = SqlSource(url, pool_size=1)
+    total = 0
+    with source.pool.connection() as conn:
+        cursor = conn.cursor()
+        if replace:
+            cursor.execute(f"DROP TABLE IF EXISTS {source.table}")
+        for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunksize)):
+            chunk['Tanggal'] = pd.to_datetime(chunk['Tanggal'], format=DATE_FORMAT).dt.strftime('%Y-%m-%d')
+            columns = [_identifier(c) for c in chunk.columns]
+            if i == 0:
+                definition = ', '.join(f"{c} {_sql_type(chunk[c].dtype)}" for c in columns)
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {source.table} ({definition})")
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {source.table}_tanggal "
+                               f"ON {source.table} (Tanggal, ID_Kunjungan)")
+            marks = ', '.join([source.placeholder] * len(columns))
+            rows = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+            cursor.executemany(f"INSERT INTO {source.table} ({', '.join(columns)}) VALUES ({marks})", list(rows))
+            total += len(chunk)
+        conn.commit()
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Isi tabel kunjungan SQL dari file CSV.")
+    parser.add_argument("csv", help="path file CSV kunjungan")
+    parser.add_argument("url", help="URL database, mis. sqlite:///visits.db?table=visits")
+    parser.add_argument("--replace", action="store_true", help="hapus tabel lama sebelum mengisi")
+    args = parser.parse_args(argv)
+    print(f"{load_csv(args.csv, args.url, replace=args.replace):,} baris ditulis ke {args.url}")
+
+
+if __name__ == "__main__":
+    main()
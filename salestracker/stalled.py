@@ -0,0 +1,124 @@
+"""Watchlist deal mandek dari indeks kunjungan terakhir per customer.
+
+``LastVisitIndex`` menyimpan satu baris per customer: kunjungan terakhir
+(tanggal, tahap, status kontrak, sales/segmen/status customer) dan jumlah
+kunjungan. Indeks diperbarui inkremental per batch (``update``): hanya baris
+terakhir tiap customer di batch yang dibandingkan dengan status sebelumnya,
+jadi cocok dipakai sebagai ``on_chunk`` di ``ingest.ingest_csv`` dan untuk
+tambahan baris dari ``watcher``::
+
+    index = LastVisitIndex()
+    ingest_csv("sales_visits.csv", on_chunk=index.update)
+
+Customer terbuka (tahap bukan 'Paska Deal', status kontrak 'Berpotensi Deal')
+disimpan terurut per (tahap, tanggal kunjungan terakhir), sehingga watchlist
+dijawab dengan ``searchsorted`` batas tanggal per tahap, bukan sort + groupby
+ulang atas seluruh kunjungan.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+
+# Batas hari tanpa kunjungan sebelum deal dianggap mandek (±P90 jeda antar kunjungan per tahap)
+STAGE_THRESHOLDS = {'Inisiasi': 21, 'Presentasi': 21, 'Penawaran Harga': 28, 'Negosiasi': 21}
+STATUS_TERBUKA = 'Berpotensi Deal'
+KOLOM = ['Tanggal', 'Progress', 'Status_Kontrak', 'Nama_Sales', 'Segmen', 'Status_Customer',
+         'Nama_Customer', 'Nilai_Kontrak']
+
+
+def _plain(frame):
+    """Kolom kategori (batch ingest) -> tipe nilai aslinya agar bisa digabung dengan status lama."""
+    return frame.apply(lambda s: s.astype(s.cat.categories.dtype) if isinstance(s.dtype, pd.CategoricalDtype) else s)
+
+
+class LastVisitIndex:
+    """Kunjungan terakhir per customer, dengan customer terbuka terurut per (tahap, tanggal)."""
+
+    def __init__(self):
+        self.latest = pd.DataFrame(columns=KOLOM + ['Jumlah_Kunjungan'], index=pd.Index([], name='ID_Customer'))
+        self._open = self.latest
+        self._bounds = {}
+        self._dates = np.array([], dtype='datetime64[ns]')
+
+    @classmethod
+    def build(cls, df):
+        return cls().update(df)
+
+    def update(self, chunk):
+        """Masukkan satu batch kunjungan (urutan file); kembalikan ``self``.
+
+        Untuk tanggal yang sama, baris yang datang belakangan menang, sama
+        dengan ``groupby(...).last()`` atas seluruh kunjungan.
+        """
+        if len(chunk) == 0:
+            return self
+        rows = chunk[['ID_Customer'] + KOLOM]
+        order = np.argsort(rows['Tanggal'].to_numpy(), kind='stable')
+        newest = _plain(rows.iloc[order].drop_duplicates('ID_Customer', keep='last').set_index('ID_Customer'))
+        counts = rows['ID_Customer'].value_counts()
+
+        merged = pd.concat([self.latest[KOLOM], newest]) if len(self.latest) else newest
+        merged = merged.iloc[np.argsort(merged['Tanggal'].to_numpy(), kind='stable')]
+        latest = merged[~merged.index.duplicated(keep='last')]
+        visits = self.latest['Jumlah_Kunjungan'].reindex(latest.index, fill_value=0)
+        latest = latest.assign(Jumlah_Kunjungan=visits.add(counts, fill_value=0).astype('int64'))
+        self.latest = latest.sort_index()
+        self._reindex_open()
+        return self
+
+    def merged(self, chunk):
+        """Indeks baru = indeks ini + ``chunk``; indeks ini tidak berubah (dipakai bersama di cache)."""
+        return copy.copy(self).update(chunk)
+
+    def _reindex_open(self):
+        latest = self.latest
+        is_open = (latest['Progress'] != 'Paska Deal') & (latest['Status_Kontrak'] == STATUS_TERBUKA)
+        opened = latest[is_open.to_numpy()].reset_index().sort_values(['Progress', 'Tanggal'], kind='stable')
+        stages = opened['Progress'].to_numpy()
+        starts = np.flatnonzero(np.r_[True, stages[1:] != stages[:-1]]) if len(stages) else []
+        ends = list(starts[1:]) + [len(stages)]
+        self._bounds = {stages[s]: (s, e) for s, e in zip(starts, ends)}
+        self._dates = opened['Tanggal'].to_numpy()
+        self._open = opened.reset_index(drop=True)
+
+    @property
+    def as_of(self):
+        """Tanggal kunjungan terakhir di seluruh data (acuan 'hari ini' untuk watchlist)."""
+        return self.latest['Tanggal'].max() if len(self.latest) else pd.NaT
+
+    def watchlist(self, thresholds=None, as_of=None, **filters):
+        """Customer terbuka yang kunjungan terakhirnya lebih lama dari batas tahapnya.
+
+        ``filters`` (``Nama_Sales=[...]`` dst.) diterapkan pada hasil saja.
+        Diurutkan dari yang paling lama melewati batas.
+        """
+        thresholds = STAGE_THRESHOLDS if thresholds is None else thresholds
+        as_of = pd.Timestamp(self.as_of if as_of is None else as_of)
+        positions, limits = [], []
+        for stage, days in thresholds.items():
+            if stage not in self._bounds:
+                continue
+            start, end = self._bounds[stage]
+            cutoff = np.datetime64(as_of - pd.Timedelta(days=days), 'ns')
+            stop = start + np.searchsorted(self._dates[start:end], cutoff, side='left')
+            positions.append(np.arange(start, stop))
+            limits.append(np.full(stop - start, days))
+        positions = np.concatenate(positions) if positions else np.array([], dtype=np.int64)
+        result = self._open.iloc[positions].assign(
+            Batas_Hari=np.concatenate(limits) if limits else np.array([], dtype=np.int64)
+        )
+        for column, values in filters.items():
+            if values is not None:
+                result = result[result[column].isin([values] if isinstance(values, str) else list(values))]
+        result = result.rename(columns={'Tanggal': 'Kunjungan_Terakhir'})
+        result.insert(3, 'Hari_Tanpa_Kunjungan', (as_of - result['Kunjungan_Terakhir']).dt.days)
+        result['Lewat_Batas'] = result['Hari_Tanpa_Kunjungan'] - result['Batas_Hari']
+        return result.sort_values(['Lewat_Batas', 'Nilai_Kontrak'], ascending=False).reset_index(drop=True)
+
+
+def last_visit_index(df, version):
+    """Indeks kunjungan terakhir seluruh data untuk versi ini (dibangun sekali)."""
+    return memoize('last_visit', version, None, LastVisitIndex.build, df)
@@ -0,0 +1,145 @@
+"""Manifest partisi store Parquet dan pembacaan dengan partition pruning.
+
+Setiap file di store dicatat di ``<store>/_manifest.json`` beserta partisinya,
+jumlah baris, dan statistik min/max (``Tanggal`` dan kolom angka). Query rentang
+tanggal hanya membuka file yang rentangnya beririsan (dibaca dengan memory
+mapping), lalu baris difilter persis di dalam file-file tersebut.
+"""
+import glob
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+MANIFEST = "_manifest.json"
+PARTITION = 'Bulan'
+KATEGORI = ['Nama_Sales', 'Level_Sales', 'Segmen', 'Jenis_Kunjungan',
+            'Status_Customer', 'Status_Kontrak', 'Progress']
+ANGKA = ['Nilai_Kontrak', 'Target_Sales', 'Target_Segmen', 'Kunjungan_Ke']
+STAT_COLUMNS = ['Tanggal'] + ANGKA
+
+_manifest_lock = threading.Lock()
+
+
+def _stat(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value.item() if hasattr(value, 'item') else value
+
+
+def file_entry(store_dir, path, frame, partition):
+    """Entri manifest untuk satu file yang baru ditulis dari ``frame``."""
+    stats = {}
+    for column in STAT_COLUMNS:
+        if column in frame and len(frame):
+            stats[column] = [_stat(frame[column].min()), _stat(frame[column].max())]
+    return {
+        'path': os.path.relpath(path, store_dir),
+        'partition': partition,
+        'rows': int(len(frame)),
+        'stats': stats,
+    }
+
+
+def read_manifest(store_dir):
+    """Daftar entri file; dibangun dari footer Parquet bila manifest belum ada."""
+    path = os.path.join(store_dir, MANIFEST)
+    if not os.path.exists(path):
+        return rebuild_manifest(store_dir)
+    with open(path) as f:
+        return json.load(f)['files']
+
+
+def _write_manifest(store_dir, files):
+    path = os.path.join(store_dir, MANIFEST)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({'files': files}, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def append_manifest(store_dir, entries):
+    """Tambahkan entri file baru ke manifest (atomik)."""
+    with _manifest_lock:
+        files = read_manifest(store_dir) if os.path.exists(os.path.join(store_dir, MANIFEST)) else []
+        files.extend(entries)
+        _write_manifest(store_dir, files)
+
+
+def rebuild_manifest(store_dir):
+    """Susun ulang manifest dari statistik row group di footer setiap file."""
+    files = []
+    for path in sorted(glob.glob(os.path.join(store_dir, f"{PARTITION}=*", "*.parquet"))):
+        meta = pq.ParquetFile(path).metadata
+        stats = {}
+        for column in STAT_COLUMNS:
+            idx = meta.schema.names.index(column) if column in meta.schema.names else None
+            if idx is None:
+                continue
+            col_stats = [meta.row_group(g).column(idx).statistics for g in range(meta.num_row_groups)]
+            if col_stats and all(s is not None and s.has_min_max for s in col_stats):
+                stats[column] = [_stat(pd.Timestamp(v) if column == 'Tanggal' else v)
+                                 for v in (min(s.min for s in col_stats), max(s.max for s in col_stats))]
+        files.append({
+            'path': os.path.relpath(path, store_dir),
+            'partition': os.path.basename(os.path.dirname(path)).split('=', 1)[1],
+            'rows': meta.num_rows,
+            'stats': stats,
+        })
+    if os.path.isdir(store_dir):
+        with _manifest_lock:
+            _write_manifest(store_dir, files)
+    return files
+
+
+def prune(files, start=None, end=None):
+    """Entri file yang rentang ``Tanggal``-nya beririsan dengan ``[start, end]``."""
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    selected = []
+    for entry in files:
+        lo, hi = (pd.Timestamp(v) for v in entry['stats'].get('Tanggal', [pd.Timestamp.min, pd.Timestamp.max]))
+        if (start is None or hi >= start) and (end is None or lo <= end):
+            selected.append(entry)
+    return selected
+
+
+def decode_frame(frame):
+    """Kembalikan kolom kategori/angka ke tipe yang sama dengan ``data.load_visits``."""
+    for column in frame.columns.intersection(KATEGORI):
+        frame[column] = frame[column].astype(str)
+    for column in frame.columns.intersection(ANGKA):
+        if not frame[column].isna().any():
+            frame[column] = frame[column].astype('int64')
+    return frame
+
+
+def load_range(store_dir, start=None, end=None, columns=None, decode=True):
+    """Baca baris dengan ``start <= Tanggal <= end`` hanya dari partisi yang relevan."""
+    selected = prune(read_manifest(store_dir), start, end)
+    if not selected:
+        return pd.DataFrame(columns=columns or [])
+    read_columns = None if columns is None else list(dict.fromkeys(list(columns) + ['Tanggal']))
+    table = pa.concat_tables([
+        pq.read_table(os.path.join(store_dir, entry['path']), columns=read_columns, memory_map=True)
+        for entry in selected
+    ])
+
+    # File di tepi rentang bisa berisi baris di luar rentang -> filter persis
+    tanggal = table['Tanggal']
+    conditions = []
+    if start is not None:
+        conditions.append(pc.greater_equal(tanggal, pa.scalar(pd.Timestamp(start), tanggal.type)))
+    if end is not None:
+        conditions.append(pc.less_equal(tanggal, pa.scalar(pd.Timestamp(end), tanggal.type)))
+    if conditions:
+        mask = conditions[0] if len(conditions) == 1 else pc.and_(*conditions)
+        table = table.filter(mask)
+    if columns is not None:
+        table = table.select(list(columns))
+    frame = table.to_pandas()
+    return decode_frame(frame) if decode else frame
@@ -0,0 +1,59 @@
+"""Perhitungan section halaman Timeline Analysis."""
+import pandas as pd
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def weekly_trend(df):
+    """Tren kunjungan mingguan dan revenue bulanan (nilai terakhir per customer)."""
+    week = df['Tanggal'].dt.to_period('W').rename('Week')
+    month = df['Tanggal'].dt.to_period('M').rename('Month')
+    weekly_visits = df.groupby(week).size()
+    monthly_revenue = (
+        df.groupby([month, df['ID_Customer']])['Nilai_Kontrak'].last()
+        .groupby('Month').sum()
+    )
+    return weekly_visits, monthly_revenue
+
+
+def day_of_week_stats(df):
+    """Kunjungan, deal, dan success rate per hari dalam seminggu."""
+    stats = pd.DataFrame({
+        'DayOfWeek': df['Tanggal'].dt.day_name(),
+        'Total_Visits': 1,
+        'Deals': (df['Progress'] == 'Paska Deal').astype(int),
+        'Nilai_Kontrak': df['Nilai_Kontrak'],
+    }).groupby('DayOfWeek').sum()
+    stats['Success_Rate'] = stats['Deals'] / stats['Total_Visits'] * 100
+    return stats.reindex(DAY_ORDER)
+
+
+def sales_cycles(df):
+    """Durasi siklus (kontak pertama → aktivitas terakhir) dan status akhir per customer."""
+    ordered = df.sort_values(['ID_Customer', 'Tanggal'], kind='stable')
+    cycles_df = ordered.groupby('ID_Customer').agg(
+        First_Contact=('Tanggal', 'min'),
+        Last_Activity=('Tanggal', 'max'),
+        Final_Status=('Progress', 'last'),
+    ).reset_index().rename(columns={'ID_Customer': 'Customer_ID'})
+    cycles_df['Cycle_Duration'] = (cycles_df['Last_Activity'] - cycles_df['First_Contact']).dt.days
+    cycles_df = cycles_df[['Customer_ID', 'Cycle_Duration', 'Final_Status', 'First_Contact', 'Last_Activity']]
+
+    is_success = cycles_df['Final_Status'] == 'Paska Deal'
+    successful_cycles = cycles_df.loc[is_success, 'Cycle_Duration']
+    unsuccessful_cycles = cycles_df.loc[~is_success, 'Cycle_Duration']
+    return cycles_df, successful_cycles, unsuccessful_cycles
+
+
+def monthly_efficiency(df):
+    """Deal dan revenue per customer unik untuk setiap bulan."""
+    month = df['Tanggal'].dt.to_period('M').rename('Month')
+    grouped = df.assign(Deals=(df['Progress'] == 'Paska Deal').astype(int)).groupby(month)
+    monthly_performance = pd.DataFrame({
+        'Unique_Customers': grouped['ID_Customer'].nunique(),
+        'Deals': grouped['Deals'].sum(),
+        'Nilai_Kontrak': grouped['Nilai_Kontrak'].sum(),
+    })
+    monthly_performance['Deals_per_Customer'] = monthly_performance['Deals'] / monthly_performance['Unique_Customers']
+    monthly_performance['Revenue_per_Customer'] = monthly_performance['Nilai_Kontrak'] / monthly_performance['Unique_Customers']
+    return monthly_performance
@@ -0,0 +1,274 @@
+"""Pemanasan cache halaman dashboard untuk filter default, berurutan menurut trafik.
+
+Saat server boot (dan setiap ada versi data baru dari ``watcher``), hasil
+filter default (seluruh rentang tanggal, semua sales/segmen/status) untuk
+ketujuh halaman dihitung di background dan disimpan di ``shared_cache`` dengan
+kunci yang sama persis dengan yang dipakai halaman, sehingga sesi pertama
+langsung mendapat cache hangat.
+
+- Urutan halaman: jumlah kunjungan halaman (``record_view``, disimpan di
+  ``shared_data/page_views.json`` agar bertahan antar restart), seri diurutkan
+  menurut ``PAGE_PRIORITY``.
+- Status per halaman (pending/running/ready/failed + durasi) ditulis atomik ke
+  ``shared_data/warmup.json``. ``ready`` bernilai True setelah ``HOT_PAGES``
+  halaman teratas selesai; health check memakai ``/ready`` di API atau::
+
+      python -m salestracker.warmup --check     # exit 0 bila siap
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from . import (
+    clustering, cohort, factors, features, markov, metrics, notes, pipeline, rolling, sampling, scoring, search,
+    shared, similar, stalled, timeline,
+)
+from .cache import memoize_frame
+from .data import default_filter, filter_key, load_pickle, rows_in_date_range
+from .shared import SNAPSHOT_DIR
+
+# Urutan default bila belum ada data trafik (halaman paling sering dibuka dulu)
+PAGE_PRIORITY = [
+    "Dashboard Utama",
+    "Sales Performance",
+    "Profil Sales",
+    "Segment Analysis",
+    "Progress Analysis",
+    "Timeline Analysis",
+    "Factor Analysis",
+]
+HOT_PAGES = 2
+STATUS_FILE = "warmup.json"
+VIEWS_FILE = "page_views.json"
+VIEWS_FLUSH_SECONDS = 30.0
+
+_views = None
+_views_lock = threading.Lock()
+_views_flushed = 0.0
+
+
+def page_name(label):
+    """Nama halaman tanpa emoji dari label radio sidebar."""
+    return label.split(' ', 1)[1] if ' ' in label else label
+
+
+def _views_path(snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, VIEWS_FILE)
+
+
+def _write_json(path, payload):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def page_views(snapshot_dir=SNAPSHOT_DIR):
+    """Jumlah kunjungan per halaman (dimuat dari disk saat pertama dipakai)."""
+    global _views
+    with _views_lock:
+        if _views is None:
+            _views = Counter(_read_json(_views_path(snapshot_dir)) or {})
+        return Counter(_views)
+
+
+def record_view(label, snapshot_dir=SNAPSHOT_DIR):
+    """Catat satu kunjungan halaman; disimpan ke disk paling sering tiap ``VIEWS_FLUSH_SECONDS``."""
+    global _views_flushed
+    page_views(snapshot_dir)
+    with _views_lock:
+        _views[page_name(label)] += 1
+        if time.time() - _views_flushed < VIEWS_FLUSH_SECONDS:
+            return
+        _views_flushed = time.time()
+        counts = dict(_views)
+    _write_json(_views_path(snapshot_dir), counts)
+
+
+def page_order(views=None):
+    """Halaman urut trafik menurun; seri mengikuti ``PAGE_PRIORITY``."""
+    views = page_views() if views is None else views
+    return sorted(PAGE_PRIORITY, key=lambda page: (-views.get(page, 0), PAGE_PRIORITY.index(page)))
+
+
+# --- Tugas per halaman: panggilan yang sama dengan halaman dashboard untuk filter default ---
+
+def _warm_pickle(path):
+    try:
+        load_pickle(path)
+    except OSError:   # ringkasan opsional; halaman memakai perhitungan cadangan
+        pass
+
+
+def _warm_utama(ctx):
+    _warm_pickle("overview_metrics.pkl")
+    memoize_frame(metrics.overview, ctx['frame'], ctx['version'], ctx['key'])
+    stalled.last_visit_index(ctx['df'], ctx['version'])
+
+
+def _warm_segment(ctx):
+    frame, version, key = ctx['frame'], ctx['version'], ctx['key']
+    memoize_frame(metrics.segment_report, frame, version, key)
+    memoize_frame(metrics.funnel_counts, frame, version, key, 'Segmen')
+
+
+def _warm_sales_performance(ctx):
+    df, frame, version, key = ctx['df'], ctx['frame'], ctx['version'], ctx['key']
+    _warm_pickle("performa_sales.pkl")
+    memoize_frame(metrics.funnel_counts, frame, version, key, 'Nama_Sales')
+    memoize_frame(metrics.sales_leaderboard, frame, version, key)
+    memoize_frame(pipeline.pipeline_by_stage, frame, version, key)
+    memoize_frame(metrics.segment_targets, frame, version, key)
+    memoize_frame(metrics.stage_transitions, frame, version, key, ('Nama_Sales',))
+    memoize_frame(metrics.process_duration, frame, version, key)
+    markov.funnel_chain(frame, version, key)
+    clustering.rep_clusters(features.features_for_filter(df, frame, version, key), version, key, wait=None)
+    model, current = scoring.ensure_model(df, version)
+    if model is not None and current:
+        scoring.cached_scores(df, version, model)
+
+
+def _warm_progress(ctx):
+    for by in (None, 'Nama_Sales', 'Segmen'):
+        markov.funnel_chain(ctx['frame'], ctx['version'], ctx['key'], by=by)
+    for func in (metrics.stage_transitions, metrics.journey_patterns, cohort.cohort_matrix):
+        memoize_frame(func, ctx['frame'], ctx['version'], ctx['key'])
+
+
+def _warm_factor(ctx):
+    feats = features.features_for_filter(ctx['df'], ctx['frame'], ctx['version'], ctx['key'])
+    for func in (factors.customer_profile_factors, factors.activity_factors, factors.team_factors):
+        memoize_frame(func, feats, ctx['version'], ctx['key'])
+
+
+def _warm_timeline(ctx):
+    for func in (timeline.weekly_trend, timeline.day_of_week_stats, timeline.sales_cycles,
+                 timeline.monthly_efficiency):
+        memoize_frame(func, ctx['frame'], ctx['version'], ctx['key'])
+    memoize_frame(rolling.rolling_cube, ctx['frame'], ctx['version'], ctx['key'], 'Nama_Sales')
+
+
+def _warm_profil(ctx):
+    df, frame, version, key = ctx['df'], ctx['frame'], ctx['version'], ctx['key']
+    if frame.empty:
+        return
+    sales = frame['Nama_Sales'].iloc[0]   # pilihan awal selectbox = sales pertama di frame
+    memoize_frame(metrics.team_metrics, frame, version, key)
+    memoize_frame(metrics.rep_profile, frame, version, key, sales)
+    similar.similarity_index(df, version)
+    index = notes.notes_for_filter(df, frame, version, key)
+    notes.wordcloud_image(index, version, key, Status_Kontrak=None, Nama_Sales=sales,
+                          Segmen=ctx['segmen'], Status_Customer=ctx['status_cust'])
+
+
+PAGE_TASKS = {
+    "Dashboard Utama": _warm_utama,
+    "Segment Analysis": _warm_segment,
+    "Sales Performance": _warm_sales_performance,
+    "Progress Analysis": _warm_progress,
+    "Factor Analysis": _warm_factor,
+    "Timeline Analysis": _warm_timeline,
+    "Profil Sales": _warm_profil,
+}
+
+
+class WarmupStatus:
+    """Status pemanasan satu versi data, ditulis ke ``shared_data/warmup.json`` setiap berubah."""
+
+    def __init__(self, version, order, snapshot_dir=SNAPSHOT_DIR, serving=None):
+        self.path = os.path.join(snapshot_dir, STATUS_FILE)
+        self.version = version
+        # Versi lama yang sudah hangat tetap dilayani selama versi baru dipanaskan
+        self.serving = serving
+        self.order = list(order)
+        self.started = time.time()
+        self.pages = {page: {'state': 'pending'} for page in self.order}
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        """True bila ``HOT_PAGES`` halaman teratas sudah selesai (gagal tidak menahan trafik)."""
+        return all(self.pages[page]['state'] in ('ready', 'failed') for page in self.order[:HOT_PAGES])
+
+    def update(self, page, state, **extra):
+        with self._lock:
+            self.pages[page] = {'state': state, **extra}
+            _write_json(self.path, self.to_dict())
+
+    def to_dict(self):
+        return {
+            'data_version': self.version,
+            'ready': self.ready or self.serving is not None,
+            'serving_version': self.version if self.ready else self.serving,
+            'started': self.started,
+            'order': self.order,
+            'pages': self.pages,
+        }
+
+
+def warm_pages(df, version, index, order=None, previous=None, snapshot_dir=SNAPSHOT_DIR):
+    """Panaskan cache filter default semua halaman secara berurutan; kembalikan ``WarmupStatus``.
+
+    ``previous`` (status versi yang sedang dilayani) membuat ``ready`` tetap True
+    selama versi baru dipanaskan, sehingga pembaruan data tidak mengeluarkan
+    server dari rotasi health check.
+    """
+    order = page_order() if order is None else order
+    serving = previous.version if previous is not None and previous.ready else None
+    status = WarmupStatus(version, order, snapshot_dir, serving)
+    _write_json(status.path, status.to_dict())
+
+    date_range, nama_sales, segmen, status_cust = default_filter(df)
+    key = filter_key(date_range, nama_sales, segmen, status_cust)
+    rows = shared.filter_rows(df, rows_in_date_range(index, *date_range), nama_sales, segmen, status_cust)
+    frame = shared.filtered_frame(df, version, key, rows)
+    # Nilai multiselect default di sidebar adalah list str; kunci cache word cloud memakai str() nilainya
+    ctx = {'df': df, 'frame': frame, 'version': version, 'key': key,
+           'segmen': [str(v) for v in segmen], 'status_cust': [str(v) for v in status_cust]}
+    sampling.refine(version, key, lambda: frame, wait=None)
+    search.search_index(df, version)
+
+    for page in order:
+        status.update(page, 'running')
+        begin = time.perf_counter()
+        try:
+            PAGE_TASKS[page](ctx)
+        except Exception as exc:
+            status.update(page, 'failed', error=f"{type(exc).__name__}: {exc}",
+                          seconds=round(time.perf_counter() - begin, 3))
+        else:
+            status.update(page, 'ready', seconds=round(time.perf_counter() - begin, 3))
+    return status
+
+
+def read_status(snapshot_dir=SNAPSHOT_DIR):
+    """Isi ``warmup.json`` terakhir (None bila belum ada pemanasan)."""
+    return _read_json(os.path.join(snapshot_dir, STATUS_FILE))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Status pemanasan cache dashboard.")
+    parser.add_argument("--check", action="store_true", help="exit 1 bila halaman utama belum hangat")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="direktori shared_data (default: %(default)s)")
+    args = parser.parse_args(argv)
+    status = read_status(args.dir)
+    print(json.dumps(status, indent=1) if status else "belum ada pemanasan")
+    if args.check and not (status and status.get('ready')):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Pemantau sumber data: muat inkremental, naikkan versi data, panaskan cache.
+
+``SourceWatcher`` berjalan di satu thread background per proses. Setiap
+``POLL_SECONDS`` (atau segera setelah event ``watchdog`` bila paket itu
+terpasang) token sumber (``data.source_token``) dibandingkan; bila berubah:
+
+1. data dimuat ulang secara inkremental:
+   - CSV tunggal yang hanya ditambah di akhir: hanya byte baru yang diparse
+     (file yang diganti/dipotong dimuat penuh);
+   - direktori/glob CSV regional: hanya file baru atau berubah yang diparse;
+   - tabel SQL: tarikan sejak watermark (``sqlsource``);
+   - store Parquet: dibaca ulang (hanya partisi, tanpa parse CSV);
+2. versi data dihitung; bila isinya sama, tidak ada yang dipublikasikan;
+3. untuk data yang hanya bertambah, sketch HLL, indeks kunjungan terakhir
+   (``stalled``) dan indeks pencarian ``Catatan`` (``search``) digabung dari
+   versi lama + baris baru, tanpa dibangun ulang;
+4. cache bersama ketujuh halaman untuk filter default (seluruh rentang, semua
+   pilihan) dipanaskan berurutan menurut trafik (``warmup``);
+5. baru kemudian ``(df, versi, indeks)`` baru dipublikasikan, sehingga sesi
+   yang memakai versi baru pada rerun berikutnya langsung mendapat cache hangat.
+
+Saat boot, bila token sumber sama dengan yang tercatat bersama snapshot
+terakhir (``shared.boot_snapshot``), snapshot itu langsung dipetakan tanpa
+parse ulang; pemanasan awal berjalan di thread pemantau.
+"""
+import io
+import os
+import threading
+import time
+
+import pandas as pd
+
+from . import shared, warmup
+from .cache import shared_cache
+from .data import DATA_PATH, data_version, date_index, load_visits, read_visits_csv, source_token
+from .regional import expand_sources, is_csv_source, load_files
+from .sketches import CustomerSketches
+from .sqlsource import is_sql_url
+
+POLL_SECONDS = 2.0
+DEBOUNCE_SECONDS = 0.5
+SETTLE_SECONDS = 2.0
+# Byte terakhir sebelum offset yang dibandingkan untuk memastikan file hanya ditambah
+MARK_BYTES = 256
+
+
+class CsvTail:
+    """Pembaca CSV tunggal yang hanya mem-parse baris baru bila file ditambah di akhir."""
+
+    def __init__(self, path):
+        self.path = path
+        self.frame = None
+        self._inode = None
+        self._offset = 0      # byte setelah baris lengkap terakhir yang sudah dibaca
+        self._header = b''
+        self._mark = b''
+
+    def _appended(self, stat):
+        if self.frame is None or stat.st_ino != self._inode or stat.st_size < self._offset:
+            return False
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset - len(self._mark))
+            return f.read(len(self._mark)) == self._mark
+
+    def read(self):
+        """``(frame, tambahan)``; ``tambahan`` None bila file dimuat penuh."""
+        stat = os.stat(self.path)
+        appended = self._appended(stat)
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset if appended else 0)
+            data = f.read()
+        # Baris terakhir tanpa newline bisa saja belum selesai ditulis; diambil
+        # hanya bila file sudah tidak berubah selama ``SETTLE_SECONDS``
+        complete = data[:data.rfind(b'\n') + 1]
+        if len(complete) < len(data) and time.time() - stat.st_mtime > SETTLE_SECONDS:
+            complete = data
+        if appended:
+            tail = read_visits_csv(io.BytesIO(self._header + complete)) if complete else self.frame.iloc[:0]
+            tail = tail.astype(self.frame.dtypes.to_dict(), errors='ignore')
+            tail.index = pd.RangeIndex(len(self.frame), len(self.frame) + len(tail))
+            frame = pd.concat([self.frame, tail])
+            offset = self._offset + len(complete)
+        else:
+            frame, tail = read_visits_csv(io.BytesIO(complete)), None
+            self._header = complete[:complete.find(b'\n') + 1]
+            offset = len(complete)
+        with open(self.path, 'rb') as f:
+            f.seek(max(0, offset - MARK_BYTES))
+            self._mark = f.read(offset - max(0, offset - MARK_BYTES))
+        self.frame, self._inode, self._offset = frame, stat.st_ino, offset
+        return frame, tail
+
+
+class SourceWatcher:
+    """Dataset terkini satu sumber data, diperbarui di background."""
+
+    def __init__(self, path=DATA_PATH, interval=POLL_SECONDS, warm=True):
+        self.path = path
+        self.interval = interval
+        self.warm = warm
+        self.refreshes = 0
+        self.last_error = None
+        self.warmup = None    # ``warmup.WarmupStatus`` versi terakhir yang dipanaskan
+        single_csv = not (is_sql_url(path) or is_csv_source(path) or os.path.isdir(path))
+        self._csv = CsvTail(path) if single_csv else None
+        self._tables = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._token = None
+        self._state = None
+        self._thread = None
+        self._observer = None
+
+    @property
+    def version(self):
+        state = self._state
+        return state[1] if state is not None else None
+
+    def current(self):
+        """``(df, versi, indeks tanggal)`` terakhir yang dipublikasikan (dimuat bila belum ada)."""
+        if self._state is None:
+            self._boot() or self.refresh(warm=False)
+        return self._state
+
+    def _boot(self):
+        """Pakai snapshot terakhir bila sumber belum berubah sejak ditulis; True bila berhasil."""
+        with self._refresh_lock:
+            if self._state is not None:
+                return True
+            token = source_token(self.path)
+            booted = shared.boot_snapshot(self.path, token)
+            if booted is None:
+                return False
+            df, version = booted
+            with self._lock:
+                # CsvTail/cache tabel regional masih kosong: perubahan pertama dimuat penuh
+                self._state, self._token = (df, version, date_index(df)), token
+            return True
+
+    def _warm(self, state):
+        self.warmup = warmup.warm_pages(*state, previous=self.warmup)
+
+    def _load(self):
+        """``(df, tambahan)``; ``tambahan`` hanya ada bila data lama tidak berubah posisi."""
+        if self._csv is not None:
+            return self._csv.read()
+        if is_csv_source(self.path):
+            return load_files(self.path, cache=self._tables), None
+        return load_visits(self.path), None
+
+    def refresh(self, warm=None):
+        """Muat ulang bila token sumber berubah; True bila versi baru dipublikasikan."""
+        with self._refresh_lock:
+            token = source_token(self.path)
+            if self._state is not None and token == self._token:
+                return False
+            df, tail = self._load()
+            version = data_version(df)
+            previous = self._state
+            if previous is not None and version == previous[1]:
+                self._token = token
+                return False
+            df = shared.shared_frame(df, version)
+            shared.write_source_meta(self.path, token, version)
+            if self._csv is not None:
+                self._csv.frame = df   # tambahan berikutnya digabung ke frame ter-mmap, bukan salinan kedua
+            state = (df, version, date_index(df))
+            if tail is not None and previous is not None:
+                self._extend_indexes(previous[1], version, tail)
+            if self.warm if warm is None else warm:
+                self._warm(state)
+            with self._lock:
+                self._state, self._token = state, token
+                self.refreshes += 1
+            return True
+
+    def _extend_indexes(self, old_version, version, tail):
+        if not len(tail):
+            return
+        old = shared_cache.get(('hll', old_version, None))
+        if old is not None:
+            shared_cache.set(('hll', version, None), old.merge(CustomerSketches.build(tail)))
+        old = shared_cache.get(('last_visit', old_version, None))
+        if old is not None:
+            shared_cache.set(('last_visit', version, None), old.merged(tail))
+        old = shared_cache.get(('search', old_version, None))
+        # Posisi baris baru harus tepat melanjutkan indeks lama
+        if old is not None and len(old) == tail.index[0]:
+            shared_cache.set(('search', version, None), old.copy().add(tail))
+
+    def _watch_paths(self):
+        if is_sql_url(self.path):
+            return []
+        if os.path.isdir(self.path):
+            return [(self.path, True)]
+        if is_csv_source(self.path):
+            return sorted({(os.path.dirname(p) or '.', False) for p in expand_sources(self.path)})
+        return [(os.path.dirname(os.path.abspath(self.path)), False)]
+
+    def _start_observer(self):
+        """Bangunkan thread polling lewat event filesystem bila ``watchdog`` terpasang."""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+        wake = self._wake
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                wake.set()
+
+        observer = Observer()
+        for path, recursive in self._watch_paths():
+            observer.schedule(Handler(), path, recursive=recursive)
+        observer.daemon = True
+        observer.start()
+        return observer
+
+    def _run(self):
+        if self.warm and self._state is not None:
+            try:
+                self._warm(self._state)
+            except Exception as exc:
+                self.last_error = exc
+        while not self._stop.is_set():
+            if self._wake.wait(self.interval):
+                # Tunggu sebentar: penulisan file biasanya datang beruntun
+                self._stop.wait(DEBOUNCE_SECONDS)
+                self._wake.clear()
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as exc:  # sumber sedang ditulis / sementara tidak terbaca
+                self.last_error = exc
+
+    def start(self):
+        """Mulai thread pemantau (idempoten); kembalikan ``self``."""
+        self.current()
+        with self._lock:
+            if self._thread is None:
+                self._observer = self._start_observer()
+                self._thread = threading.Thread(target=self._run, name="source-watcher", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
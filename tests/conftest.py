@@ -0,0 +1,16 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def make_visits():
+    """Log kunjungan minimal dari tuple (ID_Customer, Tanggal, Progress[, Status_Kontrak])."""
+    def make(rows):
+        rows = [row if len(row) == 4 else row + ('Berpotensi Deal',) for row in rows]
+        df = pd.DataFrame(rows, columns=['ID_Customer', 'Tanggal', 'Progress', 'Status_Kontrak'])
+        return df.assign(
+            Tanggal=pd.to_datetime(df['Tanggal']), Nama_Customer='PT Contoh', Nama_Sales='Budi', Level_Sales='AM',
+            Segmen='SOE', Status_Customer='Baru', Nilai_Kontrak=100.0, Target_Sales=1000.0,
+            Jenis_Kunjungan='Kunjungan Tindak Lanjut',
+        )
+    return make
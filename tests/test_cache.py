@@ -0,0 +1,14 @@
+from salestracker.cache import VersionedCache
+
+
+def test_byte_bound_evicts_oldest_and_keeps_newest():
+    cache = VersionedCache(maxbytes=10, sizeof=len)
+    cache.set('a', 'xxxx')
+    cache.set('b', 'xxxx')
+    cache.set('c', 'xxxx')
+    assert 'a' not in cache and 'b' in cache and 'c' in cache
+    assert cache.nbytes == 8
+
+    cache.set('big', 'x' * 50)   # lebih besar dari batas: tetap disimpan sendirian
+    assert 'big' in cache and 'c' not in cache
+    assert cache.nbytes == 50
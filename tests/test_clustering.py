@@ -0,0 +1,30 @@
+import pandas as pd
+
+from salestracker import clustering
+
+
+def _feats(sales):
+    return pd.DataFrame({
+        'Nama_Sales': sales, 'Nilai_Kontrak': 100.0, 'Is_Deal': 1, 'Is_Success': 1,
+        'Jumlah_Kunjungan': 3, 'Jeda_Rata2': 7.0, 'Tahap_Maks': 5,
+    })
+
+
+def test_fit_skips_k_with_too_few_distinct_reps():
+    # Empat sales dengan metrik identik: tidak ada k yang menghasilkan >= 2 label
+    assert clustering.fit_clusters(_feats(['A', 'B', 'C', 'D'])) is None
+
+
+def test_failed_fit_is_cached_as_failure(monkeypatch):
+    calls = []
+
+    def broken(feats):
+        calls.append(1)
+        raise ValueError("silhouette gagal")
+    monkeypatch.setattr(clustering, 'fit_clusters', broken)
+
+    for _ in range(2):
+        result, ready = clustering.rep_clusters(_feats(['A', 'B', 'C']), 'v-gagal', 'semua', wait=None)
+        assert ready and isinstance(result, clustering.ClusterFailure)
+    assert 'silhouette gagal' in result.error
+    assert len(calls) == 1
@@ -0,0 +1,18 @@
+from salestracker.features import TAHAPAN_FUNNEL, build_customer_features
+
+
+def test_durasi_with_missing_stage(make_visits):
+    # Sub-rentang tanpa kunjungan 'Inisiasi' maupun 'Paska Deal'
+    df = make_visits([
+        ('C1', '2025-05-02', 'Presentasi'),
+        ('C1', '2025-05-09', 'Penawaran Harga'),
+        ('C1', '2025-05-20', 'Negosiasi'),
+        ('C2', '2025-05-05', 'Presentasi'),
+    ])
+    feats = build_customer_features(df).set_index('ID_Customer')
+
+    assert feats.at['C1', 'Durasi_Presentasi'] == 7
+    assert feats.at['C1', 'Durasi_Penawaran Harga'] == 11
+    for stage in ('Inisiasi', 'Negosiasi'):
+        assert feats[f'Durasi_{stage}'].isna().all()
+    assert [f'Durasi_{s}' for s in TAHAPAN_FUNNEL[:-1]] == list(feats.filter(like='Durasi_').columns)
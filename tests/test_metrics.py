@@ -0,0 +1,50 @@
+from salestracker.metrics import (
+    journey_patterns, journey_success, process_duration, rep_profile, stage_gaps, stage_transitions,
+)
+
+
+def test_stage_transitions_use_first_visit_per_stage(make_visits):
+    df = make_visits([
+        ('C1', '2025-01-01', 'Inisiasi'),
+        ('C1', '2025-01-05', 'Presentasi'),
+        ('C1', '2025-01-03', 'Inisiasi'),
+        ('C1', '2025-01-12', 'Negosiasi'),
+        ('C2', '2025-01-02', 'Inisiasi'),
+    ])
+    transitions = stage_transitions(df)
+
+    assert transitions[['From_Stage', 'To_Stage', 'Days']].values.tolist() == [
+        ['Inisiasi', 'Presentasi', 4], ['Presentasi', 'Negosiasi', 7],
+    ]
+
+
+def test_journey_patterns_and_process_duration(make_visits):
+    df = make_visits([
+        ('C1', '2025-01-01', 'Inisiasi'),
+        ('C1', '2025-01-11', 'Paska Deal'),
+        ('C2', '2025-01-02', 'Inisiasi'),
+        ('C3', '2025-01-03', 'Inisiasi'),
+    ])
+    patterns = journey_patterns(df)
+
+    assert patterns.values.tolist() == [[False, 'Inisiasi', 2], [True, 'Inisiasi → Paska Deal', 1]]
+    assert process_duration(df).to_dict() == {'Budi': 10}
+
+
+def test_journey_success_and_stage_gaps(make_visits):
+    df = make_visits([
+        ('C1', '2025-01-01', 'Inisiasi'),
+        ('C1', '2025-01-04', 'Inisiasi'),
+        ('C1', '2025-01-06', 'Presentasi'),
+        ('C1', '2025-01-20', 'Paska Deal'),
+        ('C2', '2025-01-02', 'Inisiasi'),
+        ('C2', '2025-01-09', 'Presentasi'),
+    ])
+    journeys = journey_success(df)
+
+    assert journeys.values.tolist() == [
+        ['Inisiasi → Presentasi → Paska Deal', 1, 1, 100.0], ['Inisiasi → Presentasi', 1, 0, 0.0],
+    ]
+    # Negosiasi tidak pernah dikunjungi: Presentasi -> Paska Deal tidak dihitung sebagai satu celah
+    assert stage_gaps(df).values.tolist() == [['C1', 'Inisiasi', 'Presentasi', 5], ['C2', 'Inisiasi', 'Presentasi', 7]]
+    assert rep_profile(df, 'Budi')['journey'].equals(journeys)
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from salestracker.quantiles import ALPHA, EXACT_LIMIT, DurationSketch, _bucket
+
+
+def _keys(n):
+    return pd.DataFrame({'Nama_Sales': 'Budi', 'Segmen': 'SOE', 'Status_Customer': 'Baru',
+                         'Progress': 'Presentasi', 'Bulan': pd.Period('2025-05', freq='M')}, index=range(n))
+
+
+def test_fractional_days_bucket_at_one_day():
+    assert _bucket(np.array([0.0, 0.01, 0.5, 1.0])).tolist() == [0, 1, 1, 1]
+
+
+def test_sketch_quantiles_with_fractional_values():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.uniform(0.01, 0.99, EXACT_LIMIT), rng.uniform(1, 30, EXACT_LIMIT)])
+    sketch = DurationSketch.build(_keys(len(values)), values)
+    mask = np.ones(len(sketch.cells), dtype=bool)
+
+    assert sketch.counts.sum() == len(values)
+    low, median, high = sketch.quantiles(mask, [0.1, 0.5, 0.9])
+    assert 0 < low.value <= 1
+    assert abs(median.value - np.quantile(values, 0.5)) <= 2 * ALPHA * median.value + 1
+    assert abs(high.value - np.quantile(values, 0.9)) <= 2 * ALPHA * high.value
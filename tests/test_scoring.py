@@ -0,0 +1,35 @@
+import pandas as pd
+
+from salestracker.features import build_customer_features, model_columns
+from salestracker.scoring import training_features
+
+JOURNEY = [
+    ('C1', '2025-04-01', 'Inisiasi'),
+    ('C1', '2025-04-08', 'Presentasi'),
+    ('C1', '2025-04-20', 'Negosiasi'),
+    ('C1', '2025-05-02', 'Paska Deal', 'Deal'),
+    ('C2', '2025-04-03', 'Inisiasi', 'Batal'),
+    ('C2', '2025-04-10', 'Presentasi', 'Batal'),
+]
+
+
+def test_model_inputs_not_derived_from_stage(make_visits):
+    df = make_visits(JOURNEY)
+    feats = build_customer_features(df)
+    # Tahap yang dicapai customer tidak boleh mengubah input model sama sekali
+    flat = build_customer_features(df.assign(Progress='Inisiasi'))
+    columns = model_columns(feats)
+
+    assert not {'Tahap_Akhir', 'Tahap_Maks', 'Progress_Akhir', 'Is_Deal', 'Is_Success'} & set(columns)
+    assert not [c for c in columns if c.startswith('Durasi_')]
+    pd.testing.assert_frame_equal(feats[columns], flat[model_columns(flat)])
+
+
+def test_training_rows_stop_before_close(make_visits):
+    df = make_visits(JOURNEY)
+    train = training_features(df, build_customer_features(df)).set_index('ID_Customer')
+
+    assert train.at['C1', 'Jumlah_Kunjungan'] == 3
+    assert train.at['C1', 'Tanggal_Terakhir'] == pd.Timestamp('2025-04-20')
+    assert train.at['C2', 'Jumlah_Kunjungan'] == 2
+    assert train['Is_Deal'].to_dict() == {'C1': 1, 'C2': 0}
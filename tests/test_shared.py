@@ -0,0 +1,37 @@
+import os
+
+import numpy as np
+import pyarrow as pa
+from pandas.arrays import ArrowStringArray
+
+from salestracker.shared import _frame_nbytes, filtered_frame, open_snapshot, remove_stale, snapshot_path, write_snapshot
+
+
+def test_remove_stale_keeps_previous_version(tmp_path):
+    for age, version in enumerate(['v3', 'v2', 'v1']):
+        path = snapshot_path(version, tmp_path)
+        open(path, 'wb').close()
+        os.utime(path, (1000 - age, 1000 - age))
+
+    remove_stale('v3', tmp_path)
+
+    assert sorted(os.listdir(tmp_path)) == ['visits_v2.arrow', 'visits_v3.arrow']
+
+
+def test_snapshot_strings_stay_arrow_backed(tmp_path, make_visits):
+    df = make_visits([('C1', '2025-01-01', 'Inisiasi'), ('C2', '2025-01-02', None)])
+    frame = open_snapshot(write_snapshot(df, 'v1', tmp_path))
+
+    for column in ('ID_Customer', 'Progress', 'Nama_Sales'):
+        assert isinstance(frame[column].array, ArrowStringArray)
+    assert (frame['Progress'] == 'Inisiasi').dtype == bool
+    # Buffer string ikut dihitung, bukan hanya pointer 8 byte per baris
+    strings = pa.array(frame['Nama_Customer']).nbytes
+    assert _frame_nbytes(frame[['Nama_Customer']]) >= strings > 0
+
+
+def test_filtered_frame_without_restriction_is_not_copied(make_visits):
+    df = make_visits([('C1', '2025-01-01', 'Inisiasi'), ('C2', '2025-01-02', 'Presentasi')])
+
+    assert filtered_frame(df, 'v1', 'semua', np.arange(2)) is df
+    assert filtered_frame(df, 'v1', 'C2', np.array([1]))['ID_Customer'].tolist() == ['C2']
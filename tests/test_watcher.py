@@ -0,0 +1,29 @@
+import os
+
+from salestracker import search
+from salestracker.watcher import SourceWatcher
+
+
+def test_appended_row_is_searchable_without_rebuild(tmp_path, monkeypatch, make_visits):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'visits.csv'
+    df = make_visits([('C1', '2025-01-01', 'Inisiasi'), ('C2', '2025-01-02', 'Presentasi')])
+    df.assign(Catatan=['perkenalan layanan', 'presentasi produk']).to_csv(path, index=False)
+    watcher = SourceWatcher(str(path), warm=False)
+    old_df, old_version, _ = watcher.current()
+    assert len(search.search_index(old_df, old_version)) == 2
+
+    with open(path, 'a') as f:
+        f.write(df.iloc[[1]].assign(ID_Customer='C3', Catatan='negosiasi harga').to_csv(header=False, index=False))
+    os.utime(path, (os.path.getmtime(path) + 5,) * 2)
+    assert watcher.refresh(warm=False)
+
+    def rebuild(frame):
+        raise AssertionError("indeks dibangun ulang")
+    monkeypatch.setattr(search, 'build_index', rebuild)
+    new_df, version, _ = watcher.current()
+    index = search.search_index(new_df, version)
+    rows, _ = index.search('negosiasi')
+    assert new_df['ID_Customer'].take(rows).tolist() == ['C3']
+    assert index.search('presentasi')[0].tolist() == [1]
+    assert len(search.search_index(old_df, old_version)) == 2